@@ -0,0 +1,92 @@
+class Arena:
+    """Dense list of entities with generation-tagged handles.
+
+    add() returns a handle (slot, generation) and also stores it on the item
+    as item.handle. Removing an item bumps its slot's generation, so stale
+    handles resolve to None instead of to whatever reuses the slot.
+    Items are removed in batches with remove_many(), which keeps the
+    survivors in insertion order (the simulation relies on that to process
+    entities in a deterministic order). A batch costs one pass over the
+    items from the first removed one onward, so removing near the end of
+    the list is cheap and removing near the front is O(n).
+    Iterating or indexing walks the dense list, so an Arena can replace a
+    plain entity list.
+    """
+
+    def __init__(self):
+        self.items = [] # Dense storage, in insertion order
+        self._dense_slots = [] # Dense index -> slot
+        self._slot_dense = [] # Slot -> dense index (-1 when free)
+        self._slot_generations = [] # Slot -> generation
+        self._free_slots = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def add(self, item):
+        """Stores item and returns its handle."""
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = len(self._slot_dense)
+            self._slot_dense.append(-1)
+            self._slot_generations.append(0)
+        self._slot_dense[slot] = len(self.items)
+        self.items.append(item)
+        self._dense_slots.append(slot)
+        handle = (slot, self._slot_generations[slot])
+        item.handle = handle
+        return handle
+
+    append = add # Lets towers add projectiles the same way they did to a list
+
+    def get(self, handle):
+        """Returns the item for handle, or None if it has been removed."""
+        if handle is None:
+            return None
+        slot, generation = handle
+        if slot >= len(self._slot_generations) or self._slot_generations[slot] != generation:
+            return None
+        dense_index = self._slot_dense[slot]
+        return self.items[dense_index] if dense_index >= 0 else None
+
+    def _retire(self, item):
+        # Old handles no longer match the slot's generation
+        slot = item.handle[0]
+        self._slot_dense[slot] = -1
+        self._slot_generations[slot] += 1
+        self._free_slots.append(slot)
+        item.handle = None
+
+    def remove_many(self, items):
+        """Removes every item in items, keeping the remaining items in order.
+
+        Returns the dense index of the first removed item: everything from
+        there on has shifted down (len(self) if nothing was removed).
+        """
+        if not items:
+            return len(self.items)
+        slot_dense = self._slot_dense
+        first = min(slot_dense[item.handle[0]] for item in items)
+        for item in items:
+            self._retire(item)
+        # Only the tail from the first removed item moves; shift it down in place
+        dense_items = self.items # EnemyPool.enemies shares this list
+        dense_slots = self._dense_slots
+        write = first
+        for read in range(first, len(dense_items)):
+            slot = dense_slots[read]
+            if slot_dense[slot] >= 0:
+                dense_items[write] = dense_items[read]
+                dense_slots[write] = slot
+                slot_dense[slot] = write
+                write += 1
+        del dense_items[write:]
+        del dense_slots[write:]
+        return first
@@ -0,0 +1,74 @@
+import pygame
+
+class BackgroundCache:
+    """Pre-renders the static layers so each frame costs one full-screen blit.
+
+    game_layer() bakes the tiled grass, the path and the coop for one map and
+    is only rebuilt when the path (or the coop position) changes.
+    tiled_layer() is the plain grass used behind the menu and game over screens.
+    """
+
+    def __init__(self, background_tile, screen_size, playable_height, path_color,
+                 path_tile=None, path_width=40, below_playable_color=(40, 40, 60)):
+        self.background_tile = background_tile
+        self.screen_size = screen_size
+        self.playable_height = playable_height
+        self.path_color = path_color
+        self.path_tile = path_tile # Optional dirt texture for the path instead of a flat color
+        self.path_width = path_width
+        self.below_playable_color = below_playable_color # Opaque fill behind the translucent bottom bar
+        self._tiled_layer = None
+        self._game_layer = None
+        self._game_layer_key = None
+        self.rebuilds = 0
+
+    def _tile(self, surface, tile, height):
+        """Tiles tile across surface from the top down to height (partial last row)."""
+        tile_w, tile_h = tile.get_size()
+        for y in range(0, height, tile_h):
+            for x in range(0, surface.get_width(), tile_w):
+                surface.blit(tile, (x, y), (0, 0, tile_w, min(tile_h, height - y)))
+
+    def _new_layer(self):
+        layer = pygame.Surface(self.screen_size)
+        # Match the display's pixel format so the per-frame blit is a plain copy
+        return layer.convert() if pygame.display.get_surface() else layer
+
+    def tiled_layer(self):
+        if self._tiled_layer is None:
+            self._tiled_layer = self._new_layer()
+            self._tile(self._tiled_layer, self.background_tile, self.screen_size[1])
+        return self._tiled_layer
+
+    def game_layer(self, path, coop_image=None, coop_rect=None):
+        """Returns the baked grass + path + coop surface, rebuilding it only for a new map."""
+        # Holds the path itself: an id() could be reused by the next game's path once this one is freed
+        key = (path, tuple(coop_rect.topleft) if coop_rect else None)
+        if self._game_layer is None or key != self._game_layer_key:
+            self._game_layer = self._build_game_layer(path, coop_image, coop_rect)
+            self._game_layer_key = key
+            self.rebuilds += 1
+        return self._game_layer
+
+    def _build_game_layer(self, path, coop_image, coop_rect):
+        layer = self._new_layer()
+        layer.fill(self.below_playable_color)
+        # Grass only within the playable area
+        self._tile(layer, self.background_tile, self.playable_height)
+
+        # Path (path points are already constrained to playable area)
+        if len(path) > 1:
+            if self.path_tile:
+                # Draw the path shape as a mask and let the dirt texture show through it
+                mask = pygame.Surface(self.screen_size, pygame.SRCALPHA)
+                pygame.draw.lines(mask, (255, 255, 255, 255), False, path, self.path_width)
+                dirt = pygame.Surface(self.screen_size, pygame.SRCALPHA)
+                self._tile(dirt, self.path_tile, self.playable_height)
+                dirt.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+                layer.blit(dirt, (0, 0))
+            else:
+                pygame.draw.lines(layer, self.path_color, False, path, self.path_width)
+
+        if coop_image and coop_rect:
+            layer.blit(coop_image, coop_rect)
+        return layer
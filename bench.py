@@ -0,0 +1,210 @@
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy') # Benchmarks never open a window
+
+import argparse
+import json
+import platform
+import sys
+import time
+import pygame
+from enemy import Enemy
+from background import BackgroundCache
+from simulation import Simulation, SIM_PHASES, TARGETING_MODES
+from render_queue import RenderQueue
+
+BENCH_VERSION = 1
+DEFAULT_OUTPUT = 'bench_results.json'
+DEFAULT_THRESHOLD = 0.10 # Flag a section as regressed when it gets >10% slower
+TOWER_TYPES = ['basic', 'bomb', 'fire', 'minigun']
+
+# --- Scenarios --- #
+def _place_towers(sim, tower_types, count, rng):
+    """Places count towers (cycling through tower_types) at random valid spots, ignoring cost."""
+    placed = 0
+    for attempt in range(count * 50):
+        if placed == count: break
+        sim.player_gold = 10**9
+        if sim.place_tower(rng.randint(50, sim.width - 50), rng.randint(50, sim.playable_height - 50), tower_types[placed % len(tower_types)]):
+            placed += 1
+    sim.player_gold = 0
+    return placed
+
+def _jump_to_wave(sim, wave_number):
+    sim.wave_number = wave_number - 1
+    sim.start_next_wave()
+    sim.wave_timer = 0
+    sim.player_health = 10**9 # Leaks never end the run, so every run times the same number of ticks
+
+def setup_wave25_mixed(sim):
+    """Wave 25 (double spawn) against 40 mixed towers."""
+    _place_towers(sim, TOWER_TYPES, 40, sim.rng)
+    _jump_to_wave(sim, 25)
+
+def setup_boss_fire(sim):
+    """Wave 30 boss cat against 10 fire towers (DoT-heavy)."""
+    _place_towers(sim, ['fire'], 10, sim.rng)
+    _jump_to_wave(sim, 30)
+
+STRESS_ENEMIES = 1000
+
+def setup_endless_stress(sim):
+    """1,000 enemies spread along the path, topped up every tick, against 20 mixed towers."""
+    _place_towers(sim, TOWER_TYPES, 20, sim.rng)
+    _jump_to_wave(sim, 20)
+    for i in range(STRESS_ENEMIES):
+        enemy = _spawn_stress_enemy(sim)
+        enemy.distance = sim.path.length * i / STRESS_ENEMIES
+
+def _spawn_stress_enemy(sim):
+    enemy_type = 'raccoon' if sim.rng.random() < 0.7 else 'cat'
+    return Enemy(sim.path, sim.wave_number, sim.images[enemy_type], enemy_type=enemy_type, pool=sim.enemies)
+
+def before_tick_endless_stress(sim):
+    while len(sim.enemies) < STRESS_ENEMIES:
+        _spawn_stress_enemy(sim)
+
+# name -> (seed, ticks, setup, before_tick)
+SCENARIOS = {
+    'wave25_mixed40': (25, 3000, setup_wave25_mixed, None),
+    'boss_fire10': (30, 3000, setup_boss_fire, None),
+    'endless_stress_1000': (1000, 600, setup_endless_stress, before_tick_endless_stress),
+}
+
+# --- Measuring --- #
+def _percentile(sorted_values, fraction):
+    if not sorted_values: return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def _summarize(samples_ns):
+    """Per-tick timings (ns) -> mean/percentiles in microseconds."""
+    values = sorted(samples_ns)
+    total = sum(values)
+    return {
+        'total_ms': total / 1e6,
+        'mean_us': total / len(values) / 1e3 if values else 0.0,
+        'p50_us': _percentile(values, 0.50) / 1e3,
+        'p95_us': _percentile(values, 0.95) / 1e3,
+        'p99_us': _percentile(values, 0.99) / 1e3,
+        'max_us': values[-1] / 1e3 if values else 0.0,
+    }
+
+def _draw(screen, background, sim, queue):
+    """Draws the game layer and every entity the way the main loop does (UI panels excluded)."""
+    screen.blit(background.game_layer(sim.path), (0, 0))
+    for tower in sim.towers:
+        tower.queue_draw(queue)
+    for enemy in sim.enemies:
+        enemy.queue_draw(queue)
+    for proj in sim.projectiles:
+        proj.queue_draw(queue)
+    sim.effects.queue_draw(queue)
+    queue.flush(screen)
+
+def run_scenario(name, ticks=None, targeting='coverage'):
+    """Runs one named scenario and returns its timing results."""
+    seed, default_ticks, setup, before_tick = SCENARIOS[name]
+    ticks = ticks or default_ticks
+    sim = Simulation(seed=seed, targeting=targeting)
+    setup(sim)
+
+    # Sections: the simulation's own phase timers (waves, enemies = EnemyPool.update,
+    # towers = targeting/firing, projectiles = move/handle_impact and the lazy AoE grid rebuild),
+    # plus the whole tick and the draw pass
+    samples = {section: [] for section in SIM_PHASES}
+    samples['tick'] = []
+    samples['draw'] = []
+
+    screen = pygame.Surface((sim.width, sim.playable_height))
+    background = BackgroundCache(pygame.Surface((64, 64)), screen.get_size(), sim.playable_height, (101, 67, 33))
+    queue = RenderQueue()
+    perf_counter_ns = time.perf_counter_ns
+    ticks_run = 0
+    wall_start = time.perf_counter()
+    sim.reset_phase_times()
+    for _ in range(ticks):
+        if before_tick: before_tick(sim)
+        start = perf_counter_ns()
+        if not sim.step(1): break
+        samples['tick'].append(perf_counter_ns() - start)
+        for section, ns in sim.reset_phase_times().items():
+            samples[section].append(ns)
+        start = perf_counter_ns()
+        _draw(screen, background, sim, queue)
+        samples['draw'].append(perf_counter_ns() - start)
+        ticks_run += 1
+    wall = time.perf_counter() - wall_start
+
+    tick_seconds = sum(samples['tick']) / 1e9
+    return {
+        'seed': seed,
+        'targeting': targeting,
+        'ticks': ticks_run,
+        'ticks_per_second': ticks_run / tick_seconds if tick_seconds else 0.0,
+        'frames_per_second': ticks_run / wall if wall else 0.0, # Ticks plus drawing
+        'final_wave': sim.wave_number,
+        'enemies_at_end': len(sim.enemies),
+        'sections': {section: _summarize(values) for section, values in samples.items()},
+    }
+
+# --- Baselines --- #
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, metric='p50_us'):
+    """Returns (scenario, section, baseline value, new value, ratio) for every section that got slower than threshold."""
+    regressions = []
+    for name, result in results['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base: continue
+        for section, stats in result['sections'].items():
+            old = base['sections'].get(section, {}).get(metric)
+            new = stats[metric]
+            if old and new > old * (1 + threshold):
+                regressions.append((name, section, old, new, new / old))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Times the simulation hot paths on fixed, seeded scenarios.")
+    parser.add_argument('scenarios', nargs='*', help=f"Scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('--ticks', type=int, default=None, help="Override the number of ticks per scenario")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Where to write the JSON results")
+    parser.add_argument('--baseline', help="Earlier results file to compare against; exits with 1 on a regression")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown before a section counts as regressed (0.10 = 10%%)")
+    parser.add_argument('--targeting', default='coverage', choices=TARGETING_MODES, help="Tower targeting implementation to time")
+    parser.add_argument('--metric', default='p50_us', choices=['mean_us', 'p50_us', 'p95_us', 'p99_us'], help="Statistic compared against the baseline")
+    options = parser.parse_args(argv)
+
+    unknown = [name for name in options.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    pygame.init()
+    results = {
+        'version': BENCH_VERSION,
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'scenarios': {},
+    }
+    for name in options.scenarios or SCENARIOS:
+        result = run_scenario(name, options.ticks, options.targeting)
+        results['scenarios'][name] = result
+        print(f"{name}: {result['ticks']} ticks, {result['ticks_per_second']:.0f} ticks/s, {result['frames_per_second']:.0f} frames/s")
+        for section, stats in result['sections'].items():
+            print(f"  {section:<12} p50 {stats['p50_us']:8.1f}us  p95 {stats['p95_us']:8.1f}us  p99 {stats['p99_us']:8.1f}us  max {stats['max_us']:9.1f}us")
+
+    with open(options.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {options.output}")
+
+    if options.baseline:
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, options.threshold, options.metric)
+        for name, section, old, new, ratio in regressions:
+            print(f"REGRESSION {name}/{section}: {options.metric} {old:.1f}us -> {new:.1f}us ({(ratio - 1) * 100:+.0f}%)")
+        if regressions:
+            return 1
+        print(f"No regressions against {options.baseline} (threshold {options.threshold:.0%}).")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+import pygame
+
+FULL_UPDATE_FRACTION = 0.5 # Past this share of the screen, one flip is cheaper than updating the rects
+
+class DirtyRectRenderer:
+    """Restores and presents only the screen regions drawn over since the last frame.
+
+    Everything drawn during a frame is recorded with add() or extend()
+    (RenderQueue.flush returns the entity rects, and blit/draw calls return
+    theirs). begin() restores the previous frame's regions from the static
+    base layer instead of blitting the whole background. present() then
+    passes the previous and current regions to pygame.display.update, so
+    a quiet frame between waves touches only a few small rectangles. After
+    invalidate() (new screen, map or base layer), the next frame is drawn
+    and flipped in full.
+    """
+
+    def __init__(self, screen_size, enabled=True):
+        self.screen_rect = pygame.Rect((0, 0), screen_size)
+        self.enabled = enabled
+        self.rects = [] # Drawn this frame
+        self._previous = [] # Drawn last frame; begin() restores these
+        self._full = True
+        self.full_frames = 0
+        self.partial_frames = 0
+        self.last_update_area = 0 # Pixels presented by the last frame
+
+    def invalidate(self):
+        """Makes the next frame a full redraw and flip."""
+        self._full = True
+
+    def begin(self, screen, base):
+        """Puts the base layer back wherever the last frame drew (everywhere after invalidate())."""
+        if self._full:
+            screen.blit(base, (0, 0))
+            return
+        blit = screen.blit
+        for rect in self._previous:
+            blit(base, rect, rect)
+
+    def add(self, rect):
+        if rect: # Zero-size rects (nothing drawn) are falsy
+            self.rects.append(rect)
+        return rect
+
+    def extend(self, rects):
+        self.rects.extend(rects)
+
+    def present(self):
+        """Shows this frame and starts recording the next one."""
+        screen_rect = self.screen_rect
+        if not self._full:
+            rects = [rect.clip(screen_rect) for rect in self._previous + self.rects]
+            area = sum(rect.width * rect.height for rect in rects)
+            if area <= screen_rect.width * screen_rect.height * FULL_UPDATE_FRACTION:
+                pygame.display.update(rects)
+                self.partial_frames += 1
+                self.last_update_area = area
+                self._previous, self.rects = self.rects, []
+                return
+        pygame.display.flip()
+        self.full_frames += 1
+        self.last_update_area = screen_rect.width * screen_rect.height
+        self._previous, self.rects = self.rects, []
+        self._full = False
+
+    def summary_line(self):
+        """One line for the F3 overlay."""
+        share = self.last_update_area / (self.screen_rect.width * self.screen_rect.height)
+        return f"dirty rects: {len(self._previous)} drawn, {share:.0%} of screen updated ({self.partial_frames} partial / {self.full_frames} full)"
@@ -0,0 +1,113 @@
+import numpy as np
+import pygame
+from lru import LRUCache
+from render_queue import draw_now
+
+EXPLOSION_DURATION = 8 # Game-speed units (at BASE_GAME_SPEED 5 per tick, about two ticks)
+EXPLOSION_STEPS = 8 # Pre-rendered frames per explosion; with duration 8 every whole-unit age has its own frame
+EXPLOSION_COLOR = (255, 150, 0)
+EXPLOSION_MAX_ALPHA = 200
+RADIUS_STEP = 4 # Radii are rounded to this, so nearby AoE sizes share frames
+MAX_FRAME_SETS = 16 # Frame sets kept; large radii cost a few MB each
+
+class EffectsLayer:
+    """Short-lived visual effects (bomb explosions), kept apart from projectiles.
+
+    A bomb's projectile is released as soon as it hits; only the explosion
+    lives on here, as a row in a few preallocated arrays (position, age,
+    duration) plus a reference to its frame set. Frames are rendered once
+    per (rounded radius, duration) and shared through an LRU, so drawing an
+    explosion is one cached blit instead of allocating a SRCALPHA surface
+    every frame. Effects age with game time in update(), in step with the
+    simulation.
+    """
+
+    def __init__(self, capacity=64, max_frame_sets=MAX_FRAME_SETS):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.age = np.zeros(capacity)
+        self.duration = np.zeros(capacity)
+        self.frame_sets = [None] * capacity # Row -> list of (surface, radius) or None per step
+        self.frames = LRUCache(max_frame_sets)
+        self.spawned = 0
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self):
+        self.capacity *= 2
+        for name in ('x', 'y', 'age', 'duration'):
+            old = getattr(self, name)
+            new = np.zeros(self.capacity)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        self.frame_sets.extend([None] * (self.capacity - len(self.frame_sets)))
+
+    def _explosion_frames(self, radius, duration):
+        radius = max(RADIUS_STEP, int(round(radius / RADIUS_STEP)) * RADIUS_STEP)
+        def build():
+            frames = []
+            for step in range(EXPLOSION_STEPS):
+                progress = step / EXPLOSION_STEPS
+                current_radius = int(radius * progress)
+                alpha = int(EXPLOSION_MAX_ALPHA * (1.0 - progress)) # Fade out
+                if current_radius <= 0 or alpha <= 0:
+                    frames.append(None)
+                    continue
+                surface = pygame.Surface((current_radius * 2, current_radius * 2), pygame.SRCALPHA)
+                pygame.draw.circle(surface, EXPLOSION_COLOR + (alpha,), (current_radius, current_radius), current_radius)
+                frames.append((surface, current_radius))
+            return frames
+        return self.frames.get(('explosion', radius, duration), build)
+
+    def spawn_explosion(self, x, y, radius, duration=EXPLOSION_DURATION):
+        """Starts an expanding, fading explosion centered on (x, y)."""
+        if self.count == self.capacity:
+            self._grow()
+        row = self.count
+        self.x[row] = x
+        self.y[row] = y
+        self.age[row] = 0
+        self.duration[row] = duration
+        self.frame_sets[row] = self._explosion_frames(radius, duration)
+        self.count += 1
+        self.spawned += 1
+
+    def update(self, time_scale):
+        """Ages every effect by time_scale and drops the finished ones (keeping order)."""
+        n = self.count
+        if n == 0: return
+        self.age[:n] += time_scale
+        alive = self.age[:n] < self.duration[:n]
+        if alive.all(): return
+        keep = np.flatnonzero(alive)
+        kept = len(keep)
+        for name in ('x', 'y', 'age', 'duration'):
+            values = getattr(self, name)
+            values[:kept] = values[keep]
+        frame_sets = self.frame_sets
+        frame_sets[:kept] = [frame_sets[i] for i in keep.tolist()]
+        frame_sets[kept:n] = [None] * (n - kept) # Don't keep dropped frame sets alive
+        self.count = kept
+
+    def draw(self, screen):
+        draw_now(screen, self)
+
+    def queue_draw(self, queue):
+        """Pushes the current frame of every active effect onto a RenderQueue."""
+        n = self.count
+        if n == 0: return
+        steps = (self.age[:n] / self.duration[:n] * EXPLOSION_STEPS).astype(np.int64).tolist()
+        entries = []
+        for x, y, step, frame_set in zip(self.x[:n].tolist(), self.y[:n].tolist(), steps, self.frame_sets):
+            frame = frame_set[min(step, EXPLOSION_STEPS - 1)]
+            if frame is None: continue
+            surface, radius = frame
+            entries.append((surface, (x - radius, y - radius)))
+        queue.extend('effects', entries)
+
+    def clear(self):
+        self.frame_sets[:self.count] = [None] * self.count
+        self.count = 0
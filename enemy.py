@@ -1,15 +1,30 @@
 import pygame
 import os
+from map import Path
+from enemy_pool import EnemyPool, DetachedRow
+from game_log import get_logger
+from sprite_cache import sprite_cache
+from render_queue import draw_now
+
+log = get_logger('enemy')
+asset_log = get_logger('assets')
+
+BURN_TINT = (255, 100, 0, 150)
+FLASH_TINT = (255, 255, 255, 100)
+HEALTH_BAR_HEIGHT = 5
+HEALTH_BAR_BACK = (255, 0, 0)
+HEALTH_BAR_FRONT = (0, 255, 0)
 
 # Helper to load enemy images (similar to main.py)
 ASSETS_DIR = "assets"
 def load_enemy_image(filename):
     path = os.path.join(ASSETS_DIR, filename)
     try:
-        image = pygame.image.load(path).convert_alpha()
-        return image
+        image = pygame.image.load(path)
+        # Headless runs import this before any display exists; convert only when we can
+        return image.convert_alpha() if pygame.display.get_surface() else image
     except pygame.error as e:
-        print(f"Error loading enemy image '{path}': {e}. Using fallback.")
+        asset_log.warning("Error loading enemy image '%s': %s. Using fallback.", path, e)
         placeholder = pygame.Surface((30, 30))
         placeholder.fill((100, 100, 100)) # Gray fallback
         return placeholder
@@ -20,12 +35,38 @@ ENEMY_IMAGES = {
     'cat': load_enemy_image("cat.png")
 }
 
+def _pool_field(name):
+    """Property that reads/writes this enemy's row of the pool array called name."""
+    def fget(self):
+        return getattr(self.pool, name)[self.slot]
+    def fset(self, value):
+        getattr(self.pool, name)[self.slot] = value
+    return property(fget, fset)
+
 class Enemy:
-    def __init__(self, path, wave_number, image, enemy_type='unknown', scale=1.0, health_multiplier=1.0):
-        self.path = path
+    """Thin view of one row of an EnemyPool, plus the sprite and reward info.
+
+    Position, health, speed and DoT state live in the pool's arrays, and
+    EnemyPool.update is the only code that moves and burns enemies; an
+    enemy created without a pool gets a private one.
+    """
+    float_x = _pool_field('float_x')
+    float_y = _pool_field('float_y')
+    distance = _pool_field('distance') # Arc length travelled along the path
+    speed = _pool_field('speed')
+    health = _pool_field('health')
+    max_health = _pool_field('max_health')
+    dot_dps = _pool_field('dot_dps')
+    dot_remaining = _pool_field('dot_remaining') # Seconds left on the active DoT
+    damage_taken_timer = _pool_field('damage_taken_timer')
+    is_dead = _pool_field('is_dead')
+    is_boss = _pool_field('is_boss')
+
+    def __init__(self, path, wave_number, image, enemy_type='unknown', scale=1.0, health_multiplier=1.0, pool=None):
+        self.path = path if isinstance(path, Path) else Path(path)
         original_image = image
         self.enemy_type = enemy_type
-        self.float_x, self.float_y = path[0]
+        start_x, start_y = self.path[0]
 
         # Scale image if needed
         if scale != 1.0:
@@ -35,12 +76,12 @@ class Enemy:
             try:
                 self.image = pygame.transform.smoothscale(original_image, (new_width, new_height))
             except Exception as e:
-                print(f"Warning: Could not scale enemy image: {e}. Using original.")
+                log.warning("Could not scale enemy image: %s. Using original.", e)
                 self.image = original_image # Fallback to original
         else:
             self.image = original_image
 
-        self.rect = self.image.get_rect(center=(self.float_x, self.float_y))
+        self.rect = self.image.get_rect(center=(start_x, start_y))
 
         # Determine base health (always use raccoon as reference for multiplier)
         raccoon_base_max_health = 90 # Keep this reference
@@ -55,8 +96,7 @@ class Enemy:
         scaled_max_health = base_max_health + (wave_number - 1) * 15
 
         # Apply boss multiplier
-        self.max_health = int(scaled_max_health * health_multiplier)
-        self.health = self.max_health
+        max_health = int(scaled_max_health * health_multiplier)
 
         # --- Speed and Reward (Keep original logic based on type) ---
         raccoon_base_speed = 0.5
@@ -73,109 +113,41 @@ class Enemy:
         # --- End Speed/Reward ---
 
         # Apply wave scaling to speed
-        self.speed = self.base_speed + (wave_number - 1) * 0.03
+        speed = self.base_speed + (wave_number - 1) * 0.03
 
-        # Other initializations (path index, flags, etc.)
-        self.path_index = 0
-        self.is_dead = False
-        self.damage_taken_timer = 0
         self.damage_flash_duration = 10
         # Apply wave-based reward/point increase AFTER base values are set
         self.reward += (wave_number // 5)
         self.points_value += (wave_number - 1)
 
-        # Status Effects
-        self.dot_effects = [] # List of tuples: (damage_per_second, remaining_seconds, original_duration)
-        self.is_burning = False # For visual indicator
+        # Claim a row in the pool; status effects (DoT) start empty
+        self.pool = pool if pool is not None else EnemyPool(self.path, capacity=1)
+        self.slot = self.pool.add(self, float_x=start_x, float_y=start_y, speed=speed,
+                                  health=max_health, max_health=max_health,
+                                  is_boss=(health_multiplier > 1.0))
 
-        # Add is_boss flag
-        self.is_boss = (health_multiplier > 1.0)
+    @property
+    def is_burning(self):
+        return self.dot_remaining > 0 # For visual indicator
+
+    def detach(self):
+        """Copies this enemy's row out of its pool so it stays readable after removal."""
+        self.pool = DetachedRow(self.pool.row(self.slot))
+        self.slot = 0
 
     def apply_dot(self, damage_per_second, duration_seconds):
-        """Adds a new DoT effect or refreshes the strongest one."""
-        # Find if an existing effect has the same source/type (optional)
-        # For now, just add or refresh based on damage strength
-
-        # Check if there's an existing stronger or equal DoT
-        # if any(existing_dps >= damage_per_second for existing_dps, _, _ in self.dot_effects):
-        #     print("  Existing stronger DoT effect present, not applying new one.")
-        #     return # Don't apply weaker or equal DoT
-
-        # Simple approach: Add new effect, let update handle it (allows stacking)
-        # OR: Keep only the strongest (prevents stacking)
-        # Let's try keeping the strongest for simplicity:
-        if not self.dot_effects or damage_per_second > self.dot_effects[0][0]:
-            self.dot_effects = [(damage_per_second, duration_seconds, duration_seconds)]
-            self.is_burning = True
-            print(f"  Applying new strongest DoT ({damage_per_second:.1f} dps)")
-        elif damage_per_second == self.dot_effects[0][0]:
+        """Applies a DoT if it is the strongest, or refreshes an equally strong one."""
+        # Keep only the strongest effect (prevents stacking)
+        if not self.is_burning or damage_per_second > self.dot_dps:
+            self.dot_dps = damage_per_second
+            self.dot_remaining = duration_seconds
+            log.debug("Applying new strongest DoT (%.1f dps)", damage_per_second)
+        elif damage_per_second == self.dot_dps:
             # Refresh duration of the current strongest effect
-            self.dot_effects[0] = (damage_per_second, duration_seconds, duration_seconds)
-            self.is_burning = True
-            print(f"  Refreshing DoT duration ({damage_per_second:.1f} dps)")
+            self.dot_remaining = duration_seconds
+            log.debug("Refreshing DoT duration (%.1f dps)", damage_per_second)
         # Else: Weaker DoT, ignore
 
-    def update_effects(self, dt_seconds):
-        """Updates timers and applies damage for active DoT effects."""
-        if not self.dot_effects:
-            self.is_burning = False
-            return
-
-        remaining_effects = []
-        total_dot_this_frame = 0
-
-        for dps, remaining_sec, original_dur in self.dot_effects:
-            damage_this_tick = dps * dt_seconds
-            total_dot_this_frame += damage_this_tick
-            new_remaining_sec = remaining_sec - dt_seconds
-
-            if new_remaining_sec > 0:
-                remaining_effects.append((dps, new_remaining_sec, original_dur))
-            # else: Effect expired
-
-        self.dot_effects = remaining_effects
-        self.is_burning = bool(self.dot_effects)
-
-        if total_dot_this_frame > 0:
-            # Apply damage as float
-            self.health -= total_dot_this_frame
-            if self.health <= 0:
-                self.is_dead = True
-
-    def move(self, time_scale=1.0):
-        # Call update_effects first
-        self.update_effects((1/60) * time_scale)
-        if self.is_dead: return False # Check if DoT killed it
-
-        # Damage flash timer
-        if self.damage_taken_timer > 0:
-            self.damage_taken_timer -= 1 # Flash always ticks at normal rate?
-
-        reached_end = False
-        move_distance = self.speed * time_scale
-
-        if self.path_index < len(self.path) - 1:
-            target_x, target_y = self.path[self.path_index + 1]
-            direction_x = target_x - self.float_x
-            direction_y = target_y - self.float_y
-            distance_to_target = (direction_x ** 2 + direction_y ** 2) ** 0.5
-
-            if distance_to_target < move_distance:
-                self.float_x, self.float_y = target_x, target_y
-                self.path_index += 1
-                if self.path_index == len(self.path) - 1:
-                    reached_end = True
-            elif distance_to_target > 0:
-                self.float_x += move_distance * direction_x / distance_to_target
-                self.float_y += move_distance * direction_y / distance_to_target
-            self.rect.center = (self.float_x, self.float_y)
-        else:
-             reached_end = True
-
-        if reached_end:
-            self.die(killed_by_player=False)
-        return reached_end
-
     def take_damage(self, damage):
         if self.is_dead: return
         self.health -= damage
@@ -186,29 +158,30 @@ class Enemy:
     def die(self, killed_by_player=True):
         if not self.is_dead:
             self.is_dead = True
-            self.is_burning = False # Stop burning effect on death
-            self.dot_effects.clear() # Clear DoTs on death
+            # Clear DoTs on death (also stops the burning effect)
+            self.dot_dps = 0
+            self.dot_remaining = 0
             if killed_by_player:
-                print(f"{self.enemy_type.capitalize()} defeated! (Wave Scaled)")
+                log.debug("%s defeated! (Wave Scaled)", self.enemy_type.capitalize())
 
     def draw(self, screen):
-        screen.blit(self.image, self.rect.topleft)
-        # Draw health bar
-        health_bar_width = self.rect.width
-        health_bar_height = 5
-        health_bar_x = self.rect.x
-        health_bar_y = self.rect.y - health_bar_height - 2
-        current_health_ratio = max(0, self.health / self.max_health)
-        pygame.draw.rect(screen, (255,0,0), (health_bar_x, health_bar_y, health_bar_width, health_bar_height))
-        pygame.draw.rect(screen, (0,255,0), (health_bar_x, health_bar_y, int(health_bar_width * current_health_ratio), health_bar_height))
+        draw_now(screen, self)
 
+    def queue_draw(self, queue):
+        """Pushes the sprite (plus any tint) and the health bar onto a RenderQueue."""
+        topleft = self.rect.topleft
+        queue.push('enemies', self.image, topleft)
         # Draw burning effect if applicable
         if self.is_burning:
             # Simple tint: Make the enemy orange-ish
-            burn_surface = self.image.copy()
-            burn_surface.fill((255, 100, 0, 150), special_flags=pygame.BLEND_RGBA_MULT)
-            screen.blit(burn_surface, self.rect.topleft)
+            queue.push('enemies', sprite_cache.tinted(self.image, BURN_TINT), topleft)
         elif self.damage_taken_timer > 0:
-            flash_surface = self.image.copy()
-            flash_surface.fill((255, 255, 255, 100), special_flags=pygame.BLEND_RGBA_MULT)
-            screen.blit(flash_surface, self.rect.topleft) 
\ No newline at end of file
+            queue.push('enemies', sprite_cache.tinted(self.image, FLASH_TINT), topleft)
+
+        # Draw health bar: the full red bar, then as much of the green one as health remains
+        health_bar_width = self.rect.width
+        health_bar_pos = (self.rect.x, self.rect.y - HEALTH_BAR_HEIGHT - 2)
+        current_health_ratio = max(0, self.health / self.max_health)
+        queue.push('health_bars', sprite_cache.solid(health_bar_width, HEALTH_BAR_HEIGHT, HEALTH_BAR_BACK), health_bar_pos)
+        queue.push('health_bars', sprite_cache.solid(health_bar_width, HEALTH_BAR_HEIGHT, HEALTH_BAR_FRONT), health_bar_pos,
+                   (0, 0, int(health_bar_width * current_health_ratio), HEALTH_BAR_HEIGHT)) 
\ No newline at end of file
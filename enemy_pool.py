@@ -0,0 +1,164 @@
+import numpy as np
+from arena import Arena
+
+DOT_SECONDS_PER_TICK = 1 / 60 # DoT timers count in seconds of game time
+
+# Per-enemy fields stored as contiguous arrays; Enemy exposes each as a property of the same name
+FLOAT_FIELDS = ('float_x', 'float_y', 'distance', 'speed', 'health', 'max_health',
+                'dot_dps', 'dot_remaining', 'damage_taken_timer')
+BOOL_FIELDS = ('is_dead', 'is_boss')
+FIELDS = FLOAT_FIELDS + BOOL_FIELDS
+
+class EnemyPool:
+    """Struct-of-arrays store for enemies sharing one path.
+
+    Row i belongs to enemies[i]. update() moves, burns and culls every enemy
+    with a handful of array operations instead of a Python call per enemy.
+    Iterating or indexing the pool yields the Enemy views, so it can stand in
+    for the old enemies list. Rows and views are kept in an Arena, so
+    enemy.handle can be resolved with get(). update() culls dead rows in
+    one order-preserving pass, so enemies keep their spawn order.
+    """
+
+    def __init__(self, path, capacity=64):
+        self.path = path
+        self.capacity = max(1, capacity)
+        self.count = 0
+        self.arena = Arena()
+        self.enemies = self.arena.items # Same list object; the arena updates it in place
+        for name in FLOAT_FIELDS:
+            setattr(self, name, np.zeros(self.capacity, dtype=np.float64))
+        for name in BOOL_FIELDS:
+            setattr(self, name, np.zeros(self.capacity, dtype=bool))
+        self._path_tables = None # Built on first update(); detached single-enemy pools never need them
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.enemies)
+
+    def __getitem__(self, index):
+        return self.enemies[index]
+
+    def _grow(self):
+        self.capacity *= 2
+        for name in FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(self.capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add(self, enemy, **values):
+        """Appends a row for enemy, filled from values (field name -> value). Returns the slot."""
+        if self.count == self.capacity:
+            self._grow()
+        slot = self.count
+        for name in FIELDS:
+            getattr(self, name)[slot] = values.get(name, 0)
+        self.arena.add(enemy) # Sets enemy.handle
+        self.count += 1
+        return slot
+
+    def get(self, handle):
+        """Resolves an enemy handle; None once that enemy has been removed."""
+        return self.arena.get(handle)
+
+    def _compact(self, keep, removed):
+        """Drops the rows where keep is False, preserving order (so targeting ties break the same way).
+
+        Rows before the first removed one stay put; only the tail is copied
+        down and renumbered.
+        """
+        for enemy in removed:
+            enemy.detach() # Copy its row out before it is overwritten
+        n = self.count
+        first = self.arena.remove_many(removed)
+        kept = len(self.enemies)
+        tail_keep = keep[first:n]
+        for name in FIELDS:
+            array = getattr(self, name)
+            array[first:kept] = array[first:n][tail_keep]
+        enemies = self.enemies
+        for slot in range(first, kept):
+            enemies[slot].slot = slot
+        self.count = kept
+
+    def row(self, slot):
+        """Copies one enemy's fields out as a dict (used when detaching it)."""
+        return {name: getattr(self, name)[slot] for name in FIELDS}
+
+    def _get_path_tables(self):
+        if self._path_tables is None:
+            starts = np.array(self.path.waypoints, dtype=np.float64).reshape(-1, 2)
+            directions = np.zeros_like(starts) # Last waypoint has no outgoing segment
+            if len(self.path.directions):
+                directions[:-1] = self.path.directions
+            cumulative = np.array(self.path.cumulative_lengths, dtype=np.float64)
+            self._path_tables = (starts, directions, cumulative)
+        return self._path_tables
+
+    def update(self, time_scale=1.0, frame_fraction=1.0):
+        """Advances every enemy one tick and removes the ones that died or reached the end.
+
+        frame_fraction is the share of a rendered frame one tick spans (1 /
+        the speed multiplier); the hit flash counts down in frames, so it
+        stays the same length on screen at any speed.
+
+        Returns a list of (enemy, reached_end) for the removed enemies, in pool order.
+        """
+        n = self.count
+        if n == 0:
+            return []
+        dt_seconds = DOT_SECONDS_PER_TICK * time_scale
+        health = self.health[:n]
+        dot_dps = self.dot_dps[:n]
+        dot_remaining = self.dot_remaining[:n]
+        is_dead = self.is_dead[:n]
+
+        # --- Damage over time (dead enemies had their DoT cleared in die()) --- #
+        burning = dot_remaining > 0
+        health -= np.where(burning, dot_dps * dt_seconds, 0.0)
+        dot_remaining -= np.where(burning, dt_seconds, 0.0)
+        expired = burning & (dot_remaining <= 0)
+        dot_dps[expired] = 0.0
+        dot_remaining[expired] = 0.0
+        is_dead |= burning & (health <= 0)
+
+        # --- Movement along the path --- #
+        moving = ~is_dead
+        timer = self.damage_taken_timer[:n]
+        timer -= np.where(moving & (timer > 0), frame_fraction, 0.0) # Flash always ticks at normal rate
+        distance = self.distance[:n]
+        distance += np.where(moving, self.speed[:n] * time_scale, 0.0)
+        path_length = self.path.length
+        reached_end = moving & (distance >= path_length)
+        distance[reached_end] = path_length
+
+        starts, directions, cumulative = self._get_path_tables()
+        segment = np.clip(np.searchsorted(cumulative, distance, side='right') - 1, 0, len(starts) - 1)
+        along = distance - cumulative[segment]
+        self.float_x[:n] = np.where(moving, starts[segment, 0] + directions[segment, 0] * along, self.float_x[:n])
+        self.float_y[:n] = np.where(moving, starts[segment, 1] + directions[segment, 1] * along, self.float_y[:n])
+
+        # --- Death detection and removal --- #
+        is_dead |= reached_end
+        dot_dps[reached_end] = 0.0
+        dot_remaining[reached_end] = 0.0
+        removed = []
+        if is_dead.any():
+            for slot in np.flatnonzero(is_dead).tolist():
+                removed.append((self.enemies[slot], bool(reached_end[slot])))
+            self._compact(~is_dead, [enemy for enemy, _ in removed])
+
+        # Keep pygame rects in sync for drawing and range checks
+        for enemy, x, y in zip(self.enemies, self.float_x[:self.count].tolist(), self.float_y[:self.count].tolist()):
+            enemy.rect.center = (x, y)
+        return removed
+
+class DetachedRow:
+    """Single-row stand-in for a pool, holding a removed enemy's last values."""
+
+    def __init__(self, values):
+        for name, value in values.items():
+            setattr(self, name, [value])
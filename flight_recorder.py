@@ -0,0 +1,130 @@
+import gc
+import os
+import queue
+import threading
+import time
+import numpy as np
+from game_log import get_logger
+
+log = get_logger('profiling')
+
+DEFAULT_CAPACITY = 600 # Frames kept (10 seconds at 60 FPS)
+DEFAULT_BUDGET_NS = 2 * 1_000_000_000 // 60 # Twice the 60 FPS frame time
+DEFAULT_OUTPUT_DIR = 'spikes'
+
+# Columns besides the per-phase timings, in file order
+HEAD_COLUMNS = ['frame', 'tick', 'wave', 'ticks_run']
+TAIL_COLUMNS = ['frame_ns', 'enemies', 'projectiles', 'towers', 'spawned', 'killed', 'leaked',
+                'gc_gen0', 'gc_gen1', 'gc_gen2', 'gc_ns']
+
+class FlightRecorder:
+    """Keeps the last few hundred frames of timings and counts; dumps them when a frame spikes.
+
+    Every column lives in one preallocated int64 array that record() writes
+    in place, so recording doesn't grow or allocate anything per frame. When
+    a frame's measured work (the sum of its phase times) exceeds budget_ns,
+    the buffer is copied and handed to a background thread that writes it to
+    output_dir as CSV, so the dump itself doesn't add another hitch.
+    GC collections (per generation) and their pause time are counted
+    through gc.callbacks.
+    """
+
+    def __init__(self, phases, capacity=DEFAULT_CAPACITY, budget_ns=DEFAULT_BUDGET_NS, output_dir=DEFAULT_OUTPUT_DIR):
+        self.phases = list(phases)
+        self.columns = HEAD_COLUMNS + [f"{phase}_ns" for phase in self.phases] + TAIL_COLUMNS
+        self.capacity = capacity
+        self.budget_ns = budget_ns
+        self.output_dir = output_dir
+        self.cooldown_frames = capacity // 2 # Spikes close together end up in one dump
+        self.data = np.zeros((capacity, len(self.columns)), dtype=np.int64)
+        self.index = 0
+        self.frames = 0
+        self.dumps = 0
+        self._last_dump_frame = -capacity
+        self._col = {name: i for i, name in enumerate(self.columns)}
+        self._first_phase_col = len(HEAD_COLUMNS)
+        self._last_totals = [0, 0, 0] # Spawned, killed, leaked at the previous frame
+
+        self._gc_frame = np.zeros(4, dtype=np.int64) # gen0, gen1, gen2, pause ns since the last frame
+        self._gc_start = 0
+        gc.callbacks.append(self._on_gc)
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_dumps, name='flight-recorder', daemon=True)
+        self._writer.start()
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self._gc_start = time.perf_counter_ns()
+        else:
+            self._gc_frame[min(info['generation'], 2)] += 1
+            self._gc_frame[3] += time.perf_counter_ns() - self._gc_start
+
+    def record(self, phase_ns, sim, ticks_run):
+        """Writes one frame (phase -> ns, plus the simulation's counts) into the ring buffer."""
+        data = self.data
+        row = self.index
+        col = self._col
+        data[row, 0] = self.frames
+        data[row, 1] = sim.tick_count
+        data[row, 2] = sim.wave_number
+        data[row, 3] = ticks_run
+        total = 0
+        column = self._first_phase_col
+        for phase in self.phases:
+            ns = phase_ns[phase]
+            data[row, column] = ns
+            total += ns
+            column += 1
+        data[row, col['frame_ns']] = total
+        data[row, col['enemies']] = len(sim.enemies)
+        data[row, col['projectiles']] = len(sim.projectiles)
+        data[row, col['towers']] = len(sim.towers)
+
+        last = self._last_totals
+        data[row, col['spawned']] = sim.enemies_spawned_total - last[0]
+        data[row, col['killed']] = sim.enemies_killed_total - last[1]
+        data[row, col['leaked']] = sim.enemies_leaked_total - last[2]
+        last[0] = sim.enemies_spawned_total
+        last[1] = sim.enemies_killed_total
+        last[2] = sim.enemies_leaked_total
+
+        data[row, col['gc_gen0']:col['gc_ns'] + 1] = self._gc_frame
+        self._gc_frame[:] = 0
+
+        self.index = (row + 1) % self.capacity
+        self.frames += 1
+        if total > self.budget_ns and self.frames - self._last_dump_frame > self.cooldown_frames:
+            self._dump(sim, total)
+
+    def _dump(self, sim, frame_ns):
+        self._last_dump_frame = self.frames
+        self.dumps += 1
+        if self.frames < self.capacity:
+            rows = self.data[:self.index].copy()
+        else:
+            rows = np.concatenate((self.data[self.index:], self.data[:self.index])) # Oldest first
+        filename = os.path.join(self.output_dir, f"spike_seed{sim.seed}_wave{sim.wave_number}_tick{sim.tick_count}.csv")
+        header = (f"# Frame {self.frames - 1} took {frame_ns / 1e6:.1f} ms (budget {self.budget_ns / 1e6:.1f} ms); "
+                  f"seed {sim.seed}, wave {sim.wave_number}, tick {sim.tick_count}\n" + ','.join(self.columns))
+        log.warning("Frame spike: %.1f ms at wave %d (tick %d); writing the last %d frames to %s",
+                    frame_ns / 1e6, sim.wave_number, sim.tick_count, len(rows), filename)
+        self._queue.put((filename, header, rows))
+
+    def _write_dumps(self):
+        while True:
+            job = self._queue.get()
+            if job is None: break
+            filename, header, rows = job
+            try:
+                os.makedirs(self.output_dir, exist_ok=True)
+                np.savetxt(filename, rows, fmt='%d', delimiter=',', header=header, comments='')
+            except OSError as e:
+                log.warning("Could not write %s: %s", filename, e)
+
+    def close(self):
+        """Finishes pending dumps and stops watching the GC."""
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        self._queue.put(None)
+        self._writer.join(timeout=5.0)
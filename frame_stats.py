@@ -0,0 +1,127 @@
+import time
+import pygame
+from text_cache import render_text
+
+DEFAULT_WINDOW = 240 # Frames kept per phase (4 seconds at 60 FPS)
+SUMMARY_INTERVAL = 15 # Frames between overlay text refreshes
+FRAME_BUDGET_NS = 1_000_000_000 // 60
+HEADER = f"{'phase':<12} {'avg ms':>8} {'p99 ms':>8}"
+
+PHASE_COLORS = [
+    (255, 99, 71), (255, 215, 0), (124, 252, 0), (0, 191, 255),
+    (186, 85, 211), (255, 140, 0), (64, 224, 208), (255, 105, 180),
+    (200, 200, 200), (160, 82, 45),
+]
+
+class FrameStats:
+    """Per-phase frame timers over a rolling window, built on perf_counter_ns.
+
+    Recording is one clock read and a dict add per phase, so it stays on all
+    the time. Sorting for percentiles only happens when summary() is asked
+    for, i.e. while the overlay is visible.
+    """
+
+    def __init__(self, phases, window=DEFAULT_WINDOW):
+        self.phases = list(phases)
+        self.window = window
+        self.samples = {phase: [0] * window for phase in self.phases} # Ring buffers of per-frame ns
+        self.totals = [0] * window
+        self.current = dict.fromkeys(self.phases, 0)
+        self.index = 0
+        self.frames = 0
+
+    def mark(self, phase, start_ns):
+        """Charges the time since start_ns to phase. Returns now, to start the next phase from."""
+        now = time.perf_counter_ns()
+        self.current[phase] += now - start_ns
+        return now
+
+    def add(self, phases_ns):
+        """Adds already-measured times (phase -> ns), e.g. Simulation.phase_ns."""
+        current = self.current
+        for phase, ns in phases_ns.items():
+            current[phase] += ns
+
+    def end_frame(self):
+        """Commits this frame's phase times to the rolling window."""
+        index = self.index
+        total = 0
+        for phase, ns in self.current.items():
+            self.samples[phase][index] = ns
+            self.current[phase] = 0
+            total += ns
+        self.totals[index] = total
+        self.index = (index + 1) % self.window
+        self.frames += 1
+
+    def recent_totals(self):
+        """Frame totals (ns), oldest first."""
+        if self.frames < self.window:
+            return self.totals[:self.frames]
+        return self.totals[self.index:] + self.totals[:self.index]
+
+    def summary(self):
+        """Returns {phase: (average ms, p99 ms)} over the window."""
+        n = min(self.frames, self.window)
+        result = {}
+        for phase in self.phases:
+            values = sorted(self.samples[phase][:n]) if n < self.window else sorted(self.samples[phase])
+            if not values:
+                result[phase] = (0.0, 0.0)
+                continue
+            p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+            result[phase] = (sum(values) / len(values) / 1e6, p99 / 1e6)
+        return result
+
+class FrameStatsOverlay:
+    """Draws a FrameStats summary: a frame-time graph, per-phase avg/p99 and extra info lines."""
+
+    def __init__(self, stats, font, pos=(10, 10), graph_size=(240, 60)):
+        self.stats = stats
+        self.font = font
+        self.pos = pos
+        self.graph_size = graph_size
+        self.visible = False
+        self._summary = None
+        self._info_lines = []
+        self._summary_frame = -SUMMARY_INTERVAL
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def draw(self, screen, info_lines=()):
+        """Draws the panel and returns its rect."""
+        if self.stats.frames - self._summary_frame >= SUMMARY_INTERVAL:
+            # Refresh numbers a few times a second; readable and keeps text renders cached
+            self._summary = self.stats.summary()
+            self._info_lines = list(info_lines)
+            self._summary_frame = self.stats.frames
+        x, y = self.pos
+        line_height = self.font.get_linesize()
+        graph_w, graph_h = self.graph_size
+        rows = len(self.stats.phases) + len(self._info_lines) + 1
+        panel = pygame.Rect(x - 5, y - 5, max(graph_w, self.font.size(HEADER)[0]) + 10, graph_h + rows * line_height + 15)
+        pygame.draw.rect(screen, (20, 20, 30), panel)
+
+        # Frame time graph; the line marks the 60 FPS budget
+        totals = self.stats.recent_totals()
+        scale = graph_h / (2 * FRAME_BUDGET_NS) # Graph tops out at two frame budgets
+        budget_y = y + graph_h - int(FRAME_BUDGET_NS * scale)
+        pygame.draw.line(screen, (90, 90, 110), (x, budget_y), (x + graph_w, budget_y))
+        if len(totals) > 1:
+            step = graph_w / (self.stats.window - 1)
+            points = [(x + i * step, y + graph_h - min(graph_h, int(ns * scale))) for i, ns in enumerate(totals)]
+            pygame.draw.lines(screen, (0, 255, 0), False, points)
+        y += graph_h + 5
+
+        screen.blit(render_text(self.font, HEADER, True, (200, 200, 200)), (x, y))
+        y += line_height
+        for i, phase in enumerate(self.stats.phases):
+            avg_ms, p99_ms = self._summary[phase]
+            color = PHASE_COLORS[i % len(PHASE_COLORS)]
+            screen.blit(render_text(self.font, f"{phase:<12} {avg_ms:8.2f} {p99_ms:8.2f}", True, color), (x, y))
+            y += line_height
+        for line in self._info_lines:
+            screen.blit(render_text(self.font, line, True, (255, 255, 255)), (x, y))
+            y += line_height
+        return panel
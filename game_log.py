@@ -0,0 +1,148 @@
+import logging
+import os
+import sys
+import threading
+from collections import deque
+
+ROOT_LOGGER = 'coop'
+DEFAULT_CAPACITY = 4096 # Records held before the oldest are dropped
+DEFAULT_FLUSH_INTERVAL = 0.1 # Seconds between background flushes
+
+# Per-subsystem levels. The hot paths (per-enemy, per-projectile, per-tick) are off by default.
+DEFAULT_LEVELS = {
+    'enemy': logging.WARNING,
+    'projectile': logging.WARNING,
+    'tower': logging.INFO,
+    'waves': logging.INFO,
+    'placement': logging.INFO,
+    'map': logging.INFO,
+    'assets': logging.INFO,
+    'ui': logging.INFO,
+    'replay': logging.INFO,
+    'gc': logging.INFO,
+    'memory': logging.INFO,
+    'profiling': logging.INFO, # Also used by the flight recorder
+}
+
+def get_logger(subsystem):
+    """Logger for one subsystem, e.g. get_logger('enemy') -> 'coop.enemy'."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{subsystem}")
+
+class RingBufferHandler(logging.Handler):
+    """Queues records in a bounded ring buffer; a background thread writes them out.
+
+    emit() never blocks on I/O: it only appends to a deque (dropping the
+    oldest record when full). Formatting and writing happen on the flusher
+    thread, so simulation ticks never wait on stdout. handle() skips the
+    handler lock (the base class keeps its real RLock for everything else),
+    which assumes records are emitted from one thread, the game loop; other
+    threads may still log, but the dropped counter can then undercount. A
+    private drain lock keeps the flusher and explicit flush() or close()
+    calls from interleaving their writes.
+    """
+
+    def __init__(self, stream=None, capacity=DEFAULT_CAPACITY, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        super().__init__()
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer = deque(maxlen=capacity)
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._drain_lock = threading.Lock() # One drainer at a time, so lines stay in order
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='log-flusher', daemon=True)
+        self._thread.start()
+
+    def handle(self, record):
+        # Skips the handler lock: deque.append is atomic, so emit() needs none
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+
+    def emit(self, record):
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1 # Unguarded; exact only while a single thread emits
+        self.buffer.append(record)
+
+    def _drain(self):
+        with self._drain_lock:
+            self._drain_locked()
+
+    def _drain_locked(self):
+        lines = []
+        while True:
+            try:
+                record = self.buffer.popleft()
+            except IndexError:
+                break
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        if lines:
+            try:
+                self.stream.write('\n'.join(lines) + '\n')
+                self.stream.flush()
+            except Exception:
+                pass # Stream closed (e.g. interpreter shutting down)
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+
+    def flush(self):
+        """Writes everything buffered so far (from the calling thread)."""
+        self._drain()
+
+    def close(self):
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout=1.0)
+        self._drain()
+        super().close()
+
+_handler = None
+
+def parse_levels(spec):
+    """Parses 'enemy=DEBUG,waves=WARNING' into {'enemy': 10, 'waves': 30}."""
+    levels = {}
+    for part in spec.split(','):
+        if '=' not in part: continue
+        name, level = part.split('=', 1)
+        levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return levels
+
+def configure_logging(levels=None, stream=None, capacity=DEFAULT_CAPACITY, flush_interval=DEFAULT_FLUSH_INTERVAL):
+    """Installs the ring-buffer handler on the 'coop' logger and sets subsystem levels.
+
+    levels overrides DEFAULT_LEVELS; the COOP_LOG environment variable
+    (e.g. COOP_LOG="enemy=DEBUG,projectile=INFO") overrides both.
+    """
+    global _handler
+    root = logging.getLogger(ROOT_LOGGER)
+    if _handler is not None:
+        root.removeHandler(_handler)
+        _handler.close()
+    _handler = RingBufferHandler(stream, capacity, flush_interval)
+    _handler.setFormatter(logging.Formatter('%(name)s %(levelname)s: %(message)s'))
+    root.addHandler(_handler)
+    root.setLevel(logging.DEBUG)
+    root.propagate = False
+
+    merged = dict(DEFAULT_LEVELS)
+    merged.update(levels or {})
+    merged.update(parse_levels(os.environ.get('COOP_LOG', '')))
+    for subsystem, level in merged.items():
+        get_logger(subsystem).setLevel(level)
+    return _handler
+
+def shutdown_logging():
+    """Stops the flusher thread after writing any buffered records."""
+    global _handler
+    if _handler is not None:
+        logging.getLogger(ROOT_LOGGER).removeHandler(_handler)
+        _handler.close()
+        _handler = None
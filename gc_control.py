@@ -0,0 +1,109 @@
+import gc
+import sys
+import time
+from game_log import get_logger
+
+log = get_logger('gc')
+
+SAFETY_GEN0 = 200_000 # Mid-wave, still collect the young generation once this many objects pile up
+
+class GCScheduler:
+    """Moves garbage collection out of busy waves and records per-wave GC costs.
+
+    With scheduling enabled:
+      - start_game() collects once and gc.freeze()s everything alive (assets,
+        fonts, caches, the new map), so later collections don't rescan it
+      - automatic collection is off while a wave is in progress (except for
+        a young-generation collection if SAFETY_GEN0 objects pile up)
+      - the between-wave pause runs one generation per frame, 0 then 1 then 2,
+        then turns automatic collection back on until the next wave starts
+    Statistics are kept either way: per wave, the number of GC-tracked
+    objects allocated (net of frees between collections), collections per
+    generation, total and worst pause, and the allocated block count.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.wave_stats = [] # One dict per finished wave
+        self.current = None
+        self._in_wave = False
+        self._pending = [] # Generations still to collect in this between-wave window
+        self._last_gen0 = 0
+        self._pause_start = 0
+        gc.callbacks.append(self._on_gc)
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self._count_allocations()
+            self._pause_start = time.perf_counter_ns()
+            return
+        pause = time.perf_counter_ns() - self._pause_start
+        self._last_gen0 = 0 # The collection reset the young generation's count
+        stats = self.current
+        if stats is None: return
+        stats['collections'][info['generation']] += 1
+        stats['pause_ns'] += pause
+        stats['max_pause_ns'] = max(stats['max_pause_ns'], pause)
+
+    def _count_allocations(self):
+        count = gc.get_count()[0]
+        if self.current is not None and count > self._last_gen0:
+            self.current['allocations'] += count - self._last_gen0
+        self._last_gen0 = count
+
+    def start_game(self):
+        if not self.enabled: return
+        gc.unfreeze() # Let the previous game's objects be collected
+        gc.collect()
+        gc.freeze()
+        log.info("Froze %d long-lived objects", gc.get_freeze_count())
+
+    def end_game(self):
+        """Closes the current wave's stats and gives collection back to the interpreter."""
+        self._finish_wave()
+        self._in_wave = False
+        self._pending = []
+        gc.enable()
+
+    def update(self, sim):
+        """Call once per frame while a game is running."""
+        if self.current is None or sim.wave_number != self.current['wave']:
+            self._finish_wave()
+            self.current = {'wave': sim.wave_number, 'allocations': 0, 'collections': [0, 0, 0],
+                            'pause_ns': 0, 'max_pause_ns': 0, 'blocks_start': sys.getallocatedblocks()}
+        self._count_allocations()
+        if not self.enabled: return
+
+        in_wave = sim.is_wave_in_progress
+        if in_wave:
+            if not self._in_wave:
+                gc.disable()
+                self._pending = []
+            if self._last_gen0 > SAFETY_GEN0:
+                gc.collect(0)
+        elif self._in_wave:
+            self._pending = [0, 1, 2] # Wave over: spread a full collection over the next frames
+        elif self._pending:
+            gc.collect(self._pending.pop(0))
+            if not self._pending:
+                gc.enable() # Scheduled sweep done; normal collection until the next wave
+        self._in_wave = in_wave
+
+    def _finish_wave(self):
+        stats = self.current
+        if stats is None: return
+        self._count_allocations()
+        stats['blocks_end'] = sys.getallocatedblocks()
+        self.wave_stats.append(stats)
+        self.current = None
+        log.info("Wave %d GC: %d allocations, collections %s, pauses %.2f ms (max %.2f ms), blocks %+d",
+                 stats['wave'], stats['allocations'], '/'.join(map(str, stats['collections'])),
+                 stats['pause_ns'] / 1e6, stats['max_pause_ns'] / 1e6, stats['blocks_end'] - stats['blocks_start'])
+
+    def summary_line(self):
+        """One line about the current wave, for the F3 overlay."""
+        stats = self.current
+        mode = 'scheduled' if self.enabled else 'auto'
+        if stats is None: return f"GC ({mode})"
+        return (f"GC ({mode}, {'on' if gc.isenabled() else 'off'}): {stats['allocations']} allocs, "
+                f"{sum(stats['collections'])} collections, {stats['pause_ns'] / 1e6:.1f} ms paused")
@@ -0,0 +1,46 @@
+from collections import OrderedDict
+
+class LRUCache:
+    """Bounded least-recently-used cache of built values (rendered text, sprite variants, ...).
+
+    get(key, build) returns the cached value for key, calling build() to
+    make it on a miss; once more than max_entries are held, the least
+    recently used one is evicted. Cached values are shared, so callers must
+    not modify them (e.g. draw onto a returned surface).
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, build):
+        value = self._entries.get(key)
+        if value is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+        self.misses += 1
+        value = build()
+        self._entries[key] = value
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False) # Evict least recently used
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        """Returns hit/miss counters and current size."""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
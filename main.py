@@ -1,18 +1,32 @@
 import pygame
+import argparse
 import sys
+import time
 import os # Needed for path joining
 from tower import Tower
-from enemy import Enemy
-from map import get_path
-from projectile import Projectile
-import random # Needed for path generation call
+from simulation import Simulation, FPS, BASE_GAME_SPEED, SIM_PHASES
+from replay import Replay
+from profiling import WaveProfiler, parse_wave_range
+from background import BackgroundCache
+from text_cache import get_font, render_text
+from sprite_cache import sprite_cache
+from render_queue import RenderQueue
+from dirty_rects import DirtyRectRenderer
+from ui_panels import CachedPanel
+from frame_stats import FrameStats, FrameStatsOverlay
+from flight_recorder import FlightRecorder
+from gc_control import GCScheduler
+from memory_tracker import MemoryTracker
+from game_log import get_logger, configure_logging, shutdown_logging
+
+log = get_logger('ui')
+asset_log = get_logger('assets')
 
 # --- Constants ---
 SCREEN_WIDTH = 1920
 SCREEN_HEIGHT = 1080
-FPS = 60
 ASSETS_DIR = "assets"
-BASE_GAME_SPEED = 5.0 # New constant for overall speed increase
+REPLAY_DIR = "replays" # The last game is saved here; rerun it with: python replay.py replays/last_game.json
 
 # UI Constants
 # # SIDEBAR_WIDTH = 150 # Removed
@@ -23,8 +37,9 @@ BOTTOM_BAR_Y = SCREEN_HEIGHT - BOTTOM_BAR_HEIGHT
 BOTTOM_BAR_COLOR = (40, 40, 60, 220) # Same color as old sidebar
 PLAYABLE_HEIGHT = SCREEN_HEIGHT - BOTTOM_BAR_HEIGHT # Define the area above the bottom bar
 
-UPGRADE_PANEL_WIDTH = 300
-UPGRADE_PANEL_X = SCREEN_WIDTH - UPGRADE_PANEL_WIDTH - 20 # Keep upgrade panel on right
+UPGRADE_PANEL_SIZE = (350, 320) # Increased width from 300
+UPGRADE_PANEL_POS = (SCREEN_WIDTH - UPGRADE_PANEL_SIZE[0] - 20, 20) # Keep upgrade panel on right
+BAR_ICON_SIZE = 70 # The maximum dimension for a build bar icon
 
 # Colors
 WHITE = (255, 255, 255)
@@ -36,6 +51,7 @@ YELLOW = (255, 255, 0)
 CYAN = (0, 255, 255)
 GRAY = (100, 100, 100)
 PATH_COLOR = (101, 67, 33) # Dirt Brown
+USE_PATH_TEXTURE = False # Draw the path with dirt.png instead of PATH_COLOR
 ORANGE = (255, 165, 0) # Added for sell button color
 
 # Define game states
@@ -54,10 +70,10 @@ def load_image(filename, default_color=(200, 200, 200), alpha=True):
              image = image.convert_alpha()
         else:
              image = image.convert()
-        print(f"Loaded image: {path}")
+        asset_log.info("Loaded image: %s", path)
         return image
     except pygame.error as e:
-        print(f"Warning: Could not load image '{path}': {e}")
+        asset_log.warning("Could not load image '%s': %s", path, e)
         # Return a simple colored square as a placeholder
         placeholder = pygame.Surface((30, 30)) # Adjust size as needed
         placeholder.fill(default_color)
@@ -83,18 +99,42 @@ def scale_image_aspect_ratio(image, target_width=None, target_height=None):
         scaled_image = pygame.transform.smoothscale(image, (new_width, new_height))
         return scaled_image
     except Exception as e:
-        print(f"Warning: Could not scale image: {e}. Returning original.")
+        asset_log.warning("Could not scale image: %s. Returning original.", e)
         return image
 
+# --- Command Line ---
+parser = argparse.ArgumentParser(description="Chicken Coop Defense")
+parser.add_argument('--profile-waves', type=parse_wave_range, default=None, metavar='FIRST[-LAST]',
+                    help="cProfile these waves and write the results to profiles/ (F5 captures manually)")
+parser.add_argument('--spike-budget-ms', type=float, default=2000 / FPS,
+                    help="Frames whose work takes longer than this dump the flight recorder to spikes/ (default: 2 frames)")
+parser.add_argument('--gc-scheduling', action='store_true',
+                    help="Freeze long-lived objects, pause automatic GC during waves and collect between waves")
+parser.add_argument('--dirty-rects', action='store_true',
+                    help="Only restore and update the screen regions that changed (for slow software renderers)")
+parser.add_argument('--track-memory', metavar='CSV', default=None,
+                    help="Snapshot tracemalloc at every wave start and write per-wave retained sizes to CSV (slow)")
+options = parser.parse_args()
+profiler = WaveProfiler(*options.profile_waves) if options.profile_waves else WaveProfiler()
+
 # --- Game Setup ---
+configure_logging() # Hot-path subsystems stay quiet unless COOP_LOG turns them up
 pygame.init()
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption('Chicken Coop Defense') # Updated Title
 clock = pygame.time.Clock()
 
-# Fonts (Can be loaded after init)
-ui_font = pygame.font.Font(None, 36)
-game_font = pygame.font.Font(None, 90) # Larger font for larger screen
+# Fonts (Can be loaded after init; shared through the font registry)
+ui_font = get_font(36)
+game_font = get_font(90) # Larger font for larger screen
+debug_font = get_font(18, pygame.font.match_font('dejavusansmono,couriernew,consolas,monospace'))
+
+# Per-phase frame timers (always on) and their overlay (F3)
+FRAME_PHASES = ('events',) + SIM_PHASES + ('background', 'entities', 'ui', 'overlay', 'flip')
+frame_stats = FrameStats(FRAME_PHASES)
+gc_scheduler = GCScheduler(enabled=options.gc_scheduling)
+flight_recorder = FlightRecorder(FRAME_PHASES, budget_ns=int(options.spike_budget_ms * 1e6))
+stats_overlay = FrameStatsOverlay(frame_stats, debug_font, pos=(SCREEN_WIDTH - 330, 10)) # Top right, clear of the gold/health readout
 
 # --- Load Game Assets (AFTER display init) ---
 background_tile = load_image("grass.png", default_color=GREEN, alpha=False)
@@ -120,23 +160,34 @@ for enemy_type, fallback_color in [('raccoon', GRAY), ('cat', (200, 150, 100))]:
 # --- Load Coop Image (Moved Here) --- #
 try:
     original_coop_image = pygame.image.load('assets/coop.png').convert_alpha()
-    print("Loaded image: assets/coop.png")
+    asset_log.info("Loaded image: assets/coop.png")
 
     # --- Scale Coop Image (NEW) --- #
     target_coop_height = int(tower_img.get_height() * 1.2) # ~20% taller than tower
     coop_image = scale_image_aspect_ratio(original_coop_image, target_height=target_coop_height)
     coop_rect = coop_image.get_rect()
-    print(f"Scaled coop to height: {coop_image.get_height()}")
+    asset_log.info("Scaled coop to height: %d", coop_image.get_height())
     # --- End Scale Coop Image --- #
 
 except pygame.error as e:
-    print(f"Error loading coop.png: {e}")
+    asset_log.error("Error loading coop.png: %s", e)
     coop_image = pygame.Surface((50, 50)) # Keep placeholder size small
     coop_image.fill((139, 69, 19)) # Brown placeholder
     coop_rect = coop_image.get_rect()
-    print("Using placeholder for coop image.")
+    asset_log.warning("Using placeholder for coop image.")
 # --- End Coop Image Load ---
 
+# Static layers (grass, path, coop) are baked once per map instead of redrawn every frame
+background_cache = BackgroundCache(background_tile, (SCREEN_WIDTH, SCREEN_HEIGHT), PLAYABLE_HEIGHT, PATH_COLOR,
+                                   path_tile=path_tile if USE_PATH_TEXTURE else None,
+                                   below_playable_color=BOTTOM_BAR_COLOR[:3])
+render_queue = RenderQueue() # Entity sprites, refilled and flushed every frame
+# Optional: redraw and present only the regions that changed (--dirty-rects)
+dirty_renderer = DirtyRectRenderer((SCREEN_WIDTH, SCREEN_HEIGHT), enabled=options.dirty_rects)
+mark = dirty_renderer.add # Records a drawn rect; UI draw code wraps its blits in this
+game_base = None
+game_base_key = None
+
 # --- Define Tower Types (AFTER assets are loaded) ---
 TOWER_TYPES = { # Store info about available tower types
     'basic': {'name': 'Basic Chicken', 'cost': Tower.BASE_STATS['basic']['cost'], 'icon': tower_img},
@@ -145,24 +196,25 @@ TOWER_TYPES = { # Store info about available tower types
     'minigun': {'name': 'MiniGun Chicken', 'cost': Tower.BASE_STATS['minigun']['cost'], 'icon': tower_img},
 }
 
+def fit_icon(image, size):
+    """Scales image to fit a size x size square, keeping its aspect ratio (None for an empty image)."""
+    original_w, original_h = image.get_size()
+    if original_w == 0 or original_h == 0: return None
+    ratio = min(size / original_w, size / original_h)
+    return pygame.transform.smoothscale(image, (int(original_w * ratio), int(original_h * ratio)))
+
+# Build bar icons are scaled once here rather than every frame
+for info in TOWER_TYPES.values():
+    info['bar_icon'] = fit_icon(info['icon'], BAR_ICON_SIZE)
+
+# Sprites handed to the simulation (it only needs their sizes for rects)
+SIM_IMAGES = {'tower': tower_img, 'projectile': projectile_img, 'raccoon': ENEMY_IMAGES['raccoon'], 'cat': ENEMY_IMAGES['cat']}
+
 # --- Game Variables (initialized globally, reset in functions) ---
 state = MENU
 selected_option = 0 # Reintroduce
 selected_difficulty = 'Easy' # Default difficulty
-# difficulty_health = {'Easy': 20, 'Medium': 10, 'Hard': 5} # Kept for reset_game_state
-towers = []
-enemies = []
-projectiles = []
-current_path = []
-player_gold = 0
-player_health = 0
-score = 0
-wave_number = 0
-enemies_to_spawn_this_wave = 0
-enemies_spawned_this_wave = 0
-wave_timer = 0
-spawn_timer = 0
-time_scale = 1.0
+sim = None # Simulation for the current game, created in reset_game_state
 build_mode = False
 preview_tower = None
 selected_tower = None # Track the currently selected tower
@@ -172,13 +224,6 @@ upgrade_button_rects = {}
 bottom_bar_button_rects = {} # New dictionary for bottom bar
 menu_option_rects = {} # Reintroduce
 start_button_rect = None # Keep for initial start button
-boss_wave_incoming = False # Flag for boss warning UI
-
-# Wave Settings
-TIME_BETWEEN_WAVES = 5 * FPS # Changed from 10 * FPS
-SPAWN_INTERVAL_WITHIN_GROUP = 0.4 * FPS # Time between enemies in a group (seconds * FPS)
-GROUP_SIZE = 4 # Number of enemies per small group
-TIME_BETWEEN_GROUPS = 1.5 * FPS # Pause between groups (seconds * FPS)
 
 # Menu options
 menu_options = ['Easy', 'Medium', 'Hard'] # Reintroduce
@@ -189,104 +234,48 @@ menu_options = ['Easy', 'Medium', 'Hard'] # Reintroduce
 
 # --- Helper Functions ---
 def reset_game_state():
-    """Resets all variables for a new game."""
-    global towers, enemies, projectiles, current_path, player_gold, player_health
-    global score, wave_number, enemies_to_spawn_this_wave, enemies_spawned_this_wave
-    global wave_timer, spawn_timer, build_mode, preview_tower, time_scale, selected_tower, coop_rect
-    global enemies_spawned_this_group, is_waiting_between_groups, boss_wave_incoming
+    """Starts a new simulation and resets the front-end selection state."""
+    global sim, build_mode, preview_tower, selected_tower, coop_rect
     global selected_option # Need to reset selection potentially
 
-    towers = []
-    enemies = []
-    projectiles = []
-    current_path = get_path(SCREEN_WIDTH, PLAYABLE_HEIGHT)
-    player_gold = 200
-    # Use selected_difficulty (defaulted to 'Easy')
-    difficulty_health = {'Easy': 20, 'Medium': 10, 'Hard': 5}
-    player_health = difficulty_health.get(selected_difficulty, 20) # Default to 20 if key missing
-    score = 0
-    wave_number = 0 # Start at wave 0, will increment to 1 immediately
-    enemies_to_spawn_this_wave = 0
-    enemies_spawned_this_wave = 0
-    wave_timer = 0 # Start first wave immediately
-    spawn_timer = 0 # Reset within-wave spawn timer
-    time_scale = 1.0 # Reset time scale on new game
+    if sim is not None:
+        profiler.stop(sim) # A capture never spans two games
+    sim = Simulation(difficulty=selected_difficulty, images=SIM_IMAGES, width=SCREEN_WIDTH, playable_height=PLAYABLE_HEIGHT)
+    profiler.start_game()
+    gc_scheduler.start_game() # Assets, caches and the new map are all loaded by now
+    if options.track_memory:
+        MemoryTracker(options.track_memory).attach(sim) # A new game starts a new CSV
     build_mode = False
     preview_tower = None
     selected_tower = None # Reset selected tower
-
-    # Reset group spawn state
-    enemies_spawned_this_group = 0
-    is_waiting_between_groups = False
-    boss_wave_incoming = False # Reset boss incoming flag
     selected_option = 0 # Reset menu selection
 
-    start_next_wave() # Prepare the first wave
-
     # --- Position the Coop --- #
-    if current_path and coop_rect: # Check if path (list) and coop exist
-        end_point = current_path[-1] # Access last element of the list
+    if sim.path and coop_rect: # Check if path (list) and coop exist
+        end_point = sim.path[-1] # Access last element of the list
         end_x, end_y = int(end_point[0]), int(end_point[1])
         # Align bottom-center with path end, then move down slightly (1/8 height)
         coop_rect.midbottom = (end_x, end_y + coop_rect.height // 8)
     # --- End Coop Position --- #
 
-    print("Game reset with difficulty:", selected_difficulty)
-
-def start_next_wave():
-    """Sets up variables for the next wave and awards end-of-wave gold."""
-    global wave_number, enemies_to_spawn_this_wave, enemies_spawned_this_wave, wave_timer, player_gold
-    global enemies_spawned_this_group, is_waiting_between_groups, spawn_timer # Need spawn_timer
-
-    # Award gold for completing the previous wave (if wave_number > 0)
-    if wave_number > 0:
-        end_of_wave_bonus = 50
-        # Boss wave bonus?
-        if wave_number % 10 == 0:
-            end_of_wave_bonus *= 3 # Triple bonus for boss waves
-        player_gold += end_of_wave_bonus
-        print(f"Wave {wave_number} cleared! +${end_of_wave_bonus} gold.")
-
-    # Prepare next wave
-    wave_number += 1
-    print(f"--- Preparing Wave {wave_number} ---") # Debug Print
-
-    # --- Check for Boss Wave --- #
-    if wave_number % 10 == 0:
-        enemies_to_spawn_this_wave = 1 # Only one boss enemy
-        print(f"BOSS WAVE {wave_number}! Prepare for a tough fight!")
-    else:
-        # Standard wave enemy count
-        base_enemy_count = 5 + wave_number * 2
-        # Double enemies after wave 20
-        if wave_number > 20:
-            enemies_to_spawn_this_wave = base_enemy_count * 2
-            print(f"(Post-Wave 20 Double Spawn!)")
-        else:
-            enemies_to_spawn_this_wave = base_enemy_count
-        print(f"Calculated enemies for wave {wave_number}: {enemies_to_spawn_this_wave}") # Debug Print
-    # --- End Boss Wave Check ---
-
-    enemies_spawned_this_wave = 0
-    # Ensure wave timer uses the base time, time_scale applied during countdown
-    wave_timer = TIME_BETWEEN_WAVES
-    # Start the first group slightly delayed or immediately? Let's start immediately.
-    spawn_timer = SPAWN_INTERVAL_WITHIN_GROUP # Time until first enemy of first group
-    # Reset group spawn state for the new wave
-    enemies_spawned_this_group = 0
-    is_waiting_between_groups = False
-    print(f"New wave setup: wave_timer={wave_timer}, spawn_timer={spawn_timer}") # Debug Print
+    log.info("Game reset with difficulty: %s (seed %d)", selected_difficulty, sim.seed)
+
+def save_replay():
+    """Writes the current game's seed and commands so it can be replayed exactly."""
+    if sim is None or sim.tick_count == 0: return
+    try:
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        Replay.from_simulation(sim).save(os.path.join(REPLAY_DIR, "last_game.json"))
+    except OSError as e:
+        log.warning("Could not save replay: %s", e)
 
 def draw_menu():
     global start_button_rect, menu_option_rects # Need both now
 
     # --- Common Background and Title --- #
-    # Tile background
-    for y in range(0, SCREEN_HEIGHT, background_tile.get_height()):
-        for x in range(0, SCREEN_WIDTH, background_tile.get_width()):
-            screen.blit(background_tile, (x, y))
+    screen.blit(background_cache.tiled_layer(), (0, 0))
     # Draw Title
-    title_text = game_font.render('Chicken Coop Defense', True, WHITE)
+    title_text = render_text(game_font, 'Chicken Coop Defense', True, WHITE)
     title_bg = pygame.Surface((title_text.get_width() + 40, title_text.get_height() + 20))
     title_bg.set_alpha(180)
     title_bg.fill(BLACK)
@@ -296,8 +285,8 @@ def draw_menu():
 
     if state == MENU:
         # --- Draw Initial Start Button --- #
-        start_font = pygame.font.Font(None, 100)
-        start_text = start_font.render("Start", True, YELLOW)
+        start_font = get_font(100)
+        start_text = render_text(start_font, "Start", True, YELLOW)
         start_button_rect = start_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))
         screen.blit(start_text, start_button_rect)
         menu_option_rects = {} # Clear difficulty rects when showing start
@@ -305,99 +294,64 @@ def draw_menu():
     elif state == DIFFICULTY_SELECT:
         # --- Draw Difficulty Options --- #
         menu_option_rects = {} # Clear previous rects
-        option_font = pygame.font.Font(None, 74)
+        option_font = get_font(74)
         start_y = 350
         for i, option in enumerate(menu_options):
             color = YELLOW if i == selected_option else WHITE
-            text = option_font.render(option, True, color)
+            text = render_text(option_font, option, True, color)
             rect = text.get_rect(center=(SCREEN_WIDTH // 2, start_y + i * 80))
             screen.blit(text, rect)
             menu_option_rects[i] = rect # Store the rect with its index
         start_button_rect = None # Clear start button rect when showing difficulties
 
 def draw_game_over():
-    # Tile background
-    for y in range(0, SCREEN_HEIGHT, background_tile.get_height()):
-        for x in range(0, SCREEN_WIDTH, background_tile.get_width()):
-            screen.blit(background_tile, (x, y))
-
-    game_over_text = game_font.render('Game Over - Coop Overrun!', True, RED)
-    score_text = ui_font.render(f'Final Score: {score}', True, WHITE)
-    restart_text = ui_font.render('Press Enter to return to Menu', True, WHITE)
+    screen.blit(background_cache.tiled_layer(), (0, 0))
+
+    game_over_text = render_text(game_font, 'Game Over - Coop Overrun!', True, RED)
+    score_text = render_text(ui_font, f'Final Score: {sim.score}', True, WHITE)
+    restart_text = render_text(ui_font, 'Press Enter to return to Menu', True, WHITE)
     # Adjust positioning
     screen.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, 300))
     screen.blit(score_text, (SCREEN_WIDTH // 2 - score_text.get_width() // 2, 450))
     screen.blit(restart_text, (SCREEN_WIDTH // 2 - restart_text.get_width() // 2, 500))
 
-def is_on_path(pos, path_segments, buffer=25): # Increased buffer slightly
-    mouse_pos_vec = pygame.Vector2(pos)
-    for i in range(len(path_segments) - 1):
-        p1 = pygame.Vector2(path_segments[i])
-        p2 = pygame.Vector2(path_segments[i+1])
-        # Simple bounding box check first
-        if not (min(p1.x, p2.x) - buffer <= mouse_pos_vec.x <= max(p1.x, p2.x) + buffer and
-                min(p1.y, p2.y) - buffer <= mouse_pos_vec.y <= max(p1.y, p2.y) + buffer):
-            continue
-        # Line segment distance check
-        d = p2 - p1
-        if d.length_squared() == 0:
-            if (mouse_pos_vec - p1).length_squared() < buffer**2:
-                return True
-            continue
-        t = ((mouse_pos_vec.x - p1.x) * d.x + (mouse_pos_vec.y - p1.y) * d.y) / d.length_squared()
-        t = max(0, min(1, t))
-        closest_point = p1 + t * d
-        if (mouse_pos_vec - closest_point).length_squared() < buffer**2:
-            return True
-    return False
-
-def is_placement_valid(new_pos_tuple, existing_towers, min_separation):
-    """Checks if a new tower position is far enough from existing towers."""
-    new_pos = pygame.Vector2(new_pos_tuple)
-    for tower in existing_towers:
-        dist_sq = new_pos.distance_squared_to(tower.rect.center)
-        if dist_sq < min_separation ** 2:
-            print(f"Placement failed: Too close to existing tower at {tower.rect.center}. Dist sq: {dist_sq:.1f} < Min sq: {min_separation**2:.1f}")
-            return False # Too close
-    return True # Position is valid
-
 def draw_game_ui():
     # Gold
-    gold_text = ui_font.render(f'Gold: {player_gold}', True, YELLOW)
-    screen.blit(gold_text, (10, 10))
+    gold_text = render_text(ui_font, f'Gold: {sim.player_gold}', True, YELLOW)
+    mark(screen.blit(gold_text, (10, 10)))
     # Health
-    health_text = ui_font.render(f'Health: {player_health}', True, RED)
-    screen.blit(health_text, (10, 40))
+    health_text = render_text(ui_font, f'Health: {sim.player_health}', True, RED)
+    mark(screen.blit(health_text, (10, 40)))
     # Score
-    score_text = ui_font.render(f'Score: {score}', True, WHITE)
-    screen.blit(score_text, (10, 70))
+    score_text = render_text(ui_font, f'Score: {sim.score}', True, WHITE)
+    mark(screen.blit(score_text, (10, 70)))
     # Wave Info
     wave_info_y = 100
-    wave_num_text = ui_font.render(f'Wave: {wave_number}', True, WHITE)
-    screen.blit(wave_num_text, (10, wave_info_y))
+    wave_num_text = render_text(ui_font, f'Wave: {sim.wave_number}', True, WHITE)
+    mark(screen.blit(wave_num_text, (10, wave_info_y)))
     # Show timer or wave progress
     show_boss_warning = False # Flag to track if warning is displayed
-    if enemies_spawned_this_wave < enemies_to_spawn_this_wave or len(enemies) > 0:
+    if sim.is_wave_in_progress:
         # Wave in progress
-        remaining_text = ui_font.render(f'Enemies: {len(enemies)}/{enemies_spawned_this_wave}/{enemies_to_spawn_this_wave}', True, WHITE)
-        screen.blit(remaining_text, (10, wave_info_y + 30))
+        remaining_text = render_text(ui_font, f'Enemies: {len(sim.enemies)}/{sim.enemies_spawned_this_wave}/{sim.enemies_to_spawn_this_wave}', True, WHITE)
+        mark(screen.blit(remaining_text, (10, wave_info_y + 30)))
     else:
         # Between waves
-        timer_seconds = max(0, int(wave_timer / FPS)) # Ensure timer doesn't show negative, make int
-        next_wave_text = ui_font.render(f'Next wave in: {timer_seconds}s', True, CYAN)
+        timer_seconds = max(0, int(sim.wave_timer / FPS)) # Ensure timer doesn't show negative, make int
+        next_wave_text = render_text(ui_font, f'Next wave in: {timer_seconds}s', True, CYAN)
         next_wave_rect = next_wave_text.get_rect(topleft=(10, wave_info_y + 30))
-        screen.blit(next_wave_text, next_wave_rect)
+        mark(screen.blit(next_wave_text, next_wave_rect))
         # Boss Warning - Use the global flag set during the countdown
-        if boss_wave_incoming:
+        if sim.boss_wave_incoming:
             show_boss_warning = True # Still useful for layout adjustment
-            boss_warning_font = pygame.font.Font(None, 42) # Slightly larger font
-            boss_warning_text = boss_warning_font.render("BOSS INCOMING NEXT ROUND!", True, RED)
+            boss_warning_font = get_font(42) # Slightly larger font
+            boss_warning_text = render_text(boss_warning_font, "BOSS INCOMING NEXT ROUND!", True, RED)
             warning_rect = boss_warning_text.get_rect(topleft=(next_wave_rect.left, next_wave_rect.bottom + 5))
-            screen.blit(boss_warning_text, warning_rect)
+            mark(screen.blit(boss_warning_text, warning_rect))
 
     # --- Boss Health Bar --- #
     boss = None
-    for enemy in enemies:
+    for enemy in sim.enemies:
         if enemy.is_boss:
             boss = enemy
             break # Assume only one boss at a time
@@ -418,101 +372,98 @@ def draw_game_ui():
         pygame.draw.rect(screen, RED, fill_rect)
         # Border
         pygame.draw.rect(screen, WHITE, bg_rect, 2)
+        mark(bg_rect)
         # Text (optional: boss name/health values)
-        boss_label_font = pygame.font.Font(None, 24)
-        boss_label_text = boss_label_font.render(f"BOSS CAT: {int(boss.health)} / {int(boss.max_health)}", True, WHITE)
+        boss_label_font = get_font(24)
+        boss_label_text = render_text(boss_label_font, f"BOSS CAT: {int(boss.health)} / {int(boss.max_health)}", True, WHITE)
         label_rect = boss_label_text.get_rect(center=bg_rect.center)
-        screen.blit(boss_label_text, label_rect)
+        mark(screen.blit(boss_label_text, label_rect))
     # --- End Boss Health Bar --- #
 
     # Build Mode indicator
     ui_build_mode_y = wave_info_y + 60 # Adjust Y pos if boss warning pushed it down?
     # Let's shift build mode and speed down slightly if warning is present
-    if show_boss_warning and len(enemies) == 0 and enemies_spawned_this_wave >= enemies_to_spawn_this_wave:
+    if show_boss_warning and not sim.is_wave_in_progress:
          ui_build_mode_y += 30 # Shift down if warning is showing
 
     if build_mode:
-        build_mode_text = ui_font.render('Build Mode (B)', True, CYAN)
-        screen.blit(build_mode_text, (10, ui_build_mode_y))
+        build_mode_text = render_text(ui_font, 'Build Mode (B)', True, CYAN)
+        mark(screen.blit(build_mode_text, (10, ui_build_mode_y)))
 
     # Time Scale Display
-    speed_text = f'Speed: {time_scale:.1f}x (S/F)'
-    time_scale_text = ui_font.render(speed_text, True, WHITE)
-    screen.blit(time_scale_text, (10, ui_build_mode_y + 30))
+    speed_text = f'Speed: {sim.time_scale:.1f}x (S/F)'
+    time_scale_text = render_text(ui_font, speed_text, True, WHITE)
+    mark(screen.blit(time_scale_text, (10, ui_build_mode_y + 30)))
 
     # Draw Upgrade Panel if a tower is selected
     if selected_tower:
         draw_upgrade_panel(selected_tower)
 
-def draw_upgrade_panel(tower):
-    """Draws the upgrade panel, adapting for different tower type paths."""
-    global upgrade_button_rects
-    upgrade_button_rects = {}
-    panel_width = 350 # Increased from 300
-    panel_height = 320 # Keep height for now
-    panel_x = SCREEN_WIDTH - panel_width - 20 # Adjust X based on new width
-    panel_y = 20
-    panel_rect = pygame.Rect(panel_x, panel_y, panel_width, panel_height)
-    panel_surf = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
-    panel_surf.fill((50, 50, 50, 210))
-    screen.blit(panel_surf, panel_rect.topleft)
-    pygame.draw.rect(screen, WHITE, panel_rect, 2)
-    panel_font = pygame.font.Font(None, 36) # Decreased from 40
-    button_font = pygame.font.Font(None, 36)
-    small_font = pygame.font.Font(None, 28)
-
-    # Tower Type Name
-    type_name = TOWER_TYPES.get(tower.tower_type, {}).get('name', 'Unknown Tower')
-    type_surf = small_font.render(type_name, True, CYAN)
-    type_rect = type_surf.get_rect(centerx=panel_rect.centerx, top=panel_rect.top + 8)
-    screen.blit(type_surf, type_rect)
-
-    y_offset = panel_y + 40
+UPGRADE_PATHS = ('range', 'aoe', 'duration', 'damage', 'rate') # Every <path>_level a tower can have
 
-    # Determine stats to display based on tower type
-    stats_to_display = []
+def upgrade_rows(tower):
+    """(stat text, level text, path) for each upgrade path shown for this tower type."""
     if tower.tower_type == 'basic':
-        stats_to_display = [
+        return [
             (f"Range: {tower.range}", f"Lvl {tower.range_level}", 'range'),
             (f"Damage: {tower.damage}", f"Lvl {tower.damage_level}", 'damage'),
             (f"Rate: {60 / tower.fire_rate:.1f}/s", f"Lvl {tower.rate_level}", 'rate')
         ]
     elif tower.tower_type == 'bomb':
-        stats_to_display = [
+        return [
             (f"AoE: {tower.aoe_radius}", f"Lvl {tower.aoe_level}", 'aoe'), # Changed path
             (f"Damage: {tower.damage}", f"Lvl {tower.damage_level}", 'damage'),
             (f"Rate: {60 / tower.fire_rate:.1f}/s", f"Lvl {tower.rate_level}", 'rate')
         ]
     elif tower.tower_type == 'fire':
         dot_duration_sec = tower.dot_duration / FPS # Convert duration frames to seconds
-        stats_to_display = [
+        return [
             (f"Duration: {dot_duration_sec:.1f}s", f"Lvl {tower.duration_level}", 'duration'), # Changed path
             (f"Damage: {tower.damage}", f"Lvl {tower.damage_level}", 'damage'),
             (f"Rate: {60 / tower.fire_rate:.1f}/s", f"Lvl {tower.rate_level}", 'rate')
         ]
     elif tower.tower_type == 'minigun':
-        stats_to_display = [
+        return [
             (f"Range: {tower.range}", f"Lvl {tower.range_level}", 'range'),
             (f"Damage: {tower.damage}", f"Lvl {tower.damage_level}", 'damage'),
             (f"Rate: {60 / tower.fire_rate:.1f}/s", f"Lvl {tower.rate_level}", 'rate')
         ]
+    return []
+
+def build_upgrade_panel(panel, tower, costs, sell_value, player_gold):
+    """Composites the upgrade panel for tower onto panel; returns the button rects in screen coordinates."""
+    button_rects = {}
+    panel_width, panel_height = UPGRADE_PANEL_SIZE
+    panel_rect = panel.get_rect()
+    pygame.draw.rect(panel, WHITE, panel_rect, 2)
+    panel_font = get_font(36) # Decreased from 40
+    button_font = get_font(36)
+    small_font = get_font(28)
+
+    # Tower Type Name
+    type_name = TOWER_TYPES.get(tower.tower_type, {}).get('name', 'Unknown Tower')
+    type_surf = render_text(small_font, type_name, True, CYAN)
+    type_rect = type_surf.get_rect(centerx=panel_rect.centerx, top=panel_rect.top + 8)
+    panel.blit(type_surf, type_rect)
+
+    y_offset = 40
 
     button_width = 90
     button_height = 40
-    button_x = panel_x + panel_width - button_width - 15 # Adjust button X for wider panel
-    label_x = panel_x + 15 # Keep label X same?
+    button_x = panel_width - button_width - 15 # Adjust button X for wider panel
+    label_x = 15 # Keep label X same?
     level_text_offset = 160 # Increased offset for level text (from 140)
 
-    for i, (stat_text, level_text, stat_type) in enumerate(stats_to_display):
-        text = panel_font.render(stat_text, True, WHITE)
-        screen.blit(text, (label_x, y_offset))
-        level_t = panel_font.render(level_text, True, GRAY)
-        screen.blit(level_t, (label_x + level_text_offset, y_offset)) # Use new offset
+    for stat_text, level_text, stat_type in upgrade_rows(tower):
+        text = render_text(panel_font, stat_text, True, WHITE)
+        panel.blit(text, (label_x, y_offset))
+        level_t = render_text(panel_font, level_text, True, GRAY)
+        panel.blit(level_t, (label_x + level_text_offset, y_offset)) # Use new offset
 
-        cost = tower.get_upgrade_cost(stat_type)
+        cost = costs[stat_type]
         button_y = y_offset + text.get_height() // 2 - button_height // 2 + 5
         btn_rect = pygame.Rect(button_x, button_y, button_width, button_height)
-        upgrade_button_rects[stat_type] = btn_rect
+        button_rects[stat_type] = btn_rect.move(UPGRADE_PANEL_POS)
 
         # --- Determine button state (Max/Locked/Cost) ---
         max_level_for_path = Tower.SPECIAL_PATH_MAX_LEVEL if stat_type in {'aoe', 'duration'} else Tower.MAX_LEVEL
@@ -527,58 +478,61 @@ def draw_upgrade_panel(tower):
             btn_color = GREEN if can_afford else RED
             button_text = f"${cost}"
         # --- Render Button --- 
-        pygame.draw.rect(screen, btn_color, btn_rect, border_radius=5)
-        button_surf = button_font.render(button_text, True, BLACK if cost >= 0 and cost != -2 else WHITE) # White text for MAX/Locked
+        pygame.draw.rect(panel, btn_color, btn_rect, border_radius=5)
+        button_surf = render_text(button_font, button_text, True, BLACK if cost >= 0 and cost != -2 else WHITE) # White text for MAX/Locked
         button_text_rect = button_surf.get_rect(center=btn_rect.center)
-        screen.blit(button_surf, button_text_rect)
+        panel.blit(button_surf, button_text_rect)
         y_offset += 50
 
     # Sell Button
     y_offset += 15
-    sell_value = tower.get_sell_value()
     sell_button_text = f"Sell ${sell_value}"
     sell_button_width = panel_width - 30 # Adjust width to fit new panel size
     sell_button_height = 45
-    sell_button_x = panel_x + 15
-    sell_button_y = y_offset
-    sell_btn_rect = pygame.Rect(sell_button_x, sell_button_y, sell_button_width, sell_button_height)
-    upgrade_button_rects['sell'] = sell_btn_rect
-    pygame.draw.rect(screen, ORANGE, sell_btn_rect, border_radius=5)
-    sell_surf = button_font.render(sell_button_text, True, BLACK)
+    sell_btn_rect = pygame.Rect(15, y_offset, sell_button_width, sell_button_height)
+    button_rects['sell'] = sell_btn_rect.move(UPGRADE_PANEL_POS)
+    pygame.draw.rect(panel, ORANGE, sell_btn_rect, border_radius=5)
+    sell_surf = render_text(button_font, sell_button_text, True, BLACK)
     sell_rect = sell_surf.get_rect(center=sell_btn_rect.center)
-    screen.blit(sell_surf, sell_rect)
+    panel.blit(sell_surf, sell_rect)
+    return button_rects
 
-def draw_build_bar():
-    """Draws the build bar with multiple tower types."""
-    global bottom_bar_button_rects
-    bottom_bar_button_rects = {}
-    bar_rect = pygame.Rect(0, BOTTOM_BAR_Y, SCREEN_WIDTH, BOTTOM_BAR_HEIGHT)
-    bar_surf = pygame.Surface(bar_rect.size, pygame.SRCALPHA)
-    bar_surf.fill(BOTTOM_BAR_COLOR)
-    screen.blit(bar_surf, bar_rect.topleft)
-    pygame.draw.rect(screen, WHITE, bar_rect, 1)
-
-    target_icon_size = 70 # The maximum dimension for the icon
+def draw_upgrade_panel(tower):
+    """Draws the upgrade panel, adapting for different tower type paths.
+
+    The panel is composited once and reused until the tower, its levels or
+    the affordability of one of its upgrades changes, so costs and the sell
+    value are only recomputed then.
+    """
+    global upgrade_button_rects, upgrade_panel_inputs
+    tower_key = (tower, tuple(getattr(tower, path + '_level') for path in UPGRADE_PATHS))
+    if upgrade_panel_inputs is None or upgrade_panel_inputs[0] != tower_key:
+        costs = {stat_type: tower.get_upgrade_cost(stat_type) for _, _, stat_type in upgrade_rows(tower)}
+        upgrade_panel_inputs = (tower_key, costs, tower.get_sell_value())
+    _, costs, sell_value = upgrade_panel_inputs
+    affordable = tuple(sim.player_gold >= cost for cost in costs.values() if cost >= 0)
+    panel = upgrade_panel.get(tower_key + (affordable,), tower, costs, sell_value, sim.player_gold)
+    upgrade_button_rects = upgrade_panel.data
+    mark(screen.blit(panel, UPGRADE_PANEL_POS))
+
+def build_build_bar(bar, preview_type, player_gold):
+    """Composites the build bar onto bar; returns the icon rects in screen coordinates."""
+    button_rects = {}
+    pygame.draw.rect(bar, WHITE, bar.get_rect(), 1)
+
+    target_icon_size = BAR_ICON_SIZE # The maximum dimension for the icon
     padding = (BOTTOM_BAR_HEIGHT - target_icon_size - 25) // 2 # Keep overall padding
-    slot_y = BOTTOM_BAR_Y + padding # Top position for the icon slot
+    slot_y = padding # Top position for the icon slot
     current_slot_x = padding # Left position for the current icon slot
-    cost_font = pygame.font.Font(None, 24)
-    name_font = pygame.font.Font(None, 20)
+    cost_font = get_font(24)
+    name_font = get_font(20)
 
     for tower_key, info in TOWER_TYPES.items():
-        tower_icon = info['icon']
+        icon_display = info['bar_icon'] # Scaled once at load
+        if icon_display is None: continue # Skip if image invalid
         tower_cost = info['cost']
         tower_name = info['name']
 
-        # --- Aspect Ratio Scaling --- #
-        original_w, original_h = tower_icon.get_size()
-        if original_w == 0 or original_h == 0: continue # Skip if image invalid
-        ratio = min(target_icon_size / original_w, target_icon_size / original_h)
-        new_w = int(original_w * ratio)
-        new_h = int(original_h * ratio)
-        icon_display = pygame.transform.smoothscale(tower_icon, (new_w, new_h))
-        # --- End Scaling --- #
-
         # --- Positioning --- #
         # Center the scaled icon within the conceptual square slot
         slot_center_x = current_slot_x + target_icon_size / 2
@@ -587,75 +541,109 @@ def draw_build_bar():
         # --- End Positioning --- #
 
         # Store the rect of the actual displayed icon for click detection
-        bottom_bar_button_rects[tower_key] = icon_rect
+        button_rects[tower_key] = icon_rect.move(0, BOTTOM_BAR_Y)
 
         # Draw selection highlight around the slot
-        is_previewing_this = (preview_tower is not None and preview_tower.tower_type == tower_key)
-        if is_previewing_this:
+        if preview_type == tower_key:
             # Draw highlight around the conceptual slot boundary
             highlight_rect = pygame.Rect(current_slot_x, slot_y, target_icon_size, target_icon_size)
-            pygame.draw.rect(screen, YELLOW, highlight_rect.inflate(6, 6), 3, border_radius=5)
+            pygame.draw.rect(bar, YELLOW, highlight_rect.inflate(6, 6), 3, border_radius=5)
 
-        screen.blit(icon_display, icon_rect) # Blit the potentially non-square icon
+        bar.blit(icon_display, icon_rect) # Blit the potentially non-square icon
 
         # Position Name/Cost relative to the displayed icon's bottom-center
-        name_surf = name_font.render(tower_name, True, WHITE)
+        name_surf = render_text(name_font, tower_name, True, WHITE)
         name_rect = name_surf.get_rect(midtop=(icon_rect.centerx, icon_rect.bottom + 2))
-        screen.blit(name_surf, name_rect)
+        bar.blit(name_surf, name_rect)
         cost_text = f"${tower_cost}"
-        cost_surf = cost_font.render(cost_text, True, YELLOW if player_gold >= tower_cost else GRAY)
+        cost_surf = render_text(cost_font, cost_text, True, YELLOW if player_gold >= tower_cost else GRAY)
         cost_rect = cost_surf.get_rect(midtop=(icon_rect.centerx, name_rect.bottom + 1))
-        screen.blit(cost_surf, cost_rect)
+        bar.blit(cost_surf, cost_rect)
 
         # Move to the next slot position
         current_slot_x += target_icon_size + padding + 10 # Use target size for spacing
+    return button_rects
+
+def build_bar_key():
+    """Everything the build bar shows that can change: the previewed tower and which towers are affordable."""
+    return (preview_tower.tower_type if preview_tower else None,
+            tuple(sim.player_gold >= info['cost'] for info in TOWER_TYPES.values()))
 
-def draw_tiled_background_and_path(path_width=40):
-    """Tiles the background and draws the path only within the playable area."""
-    # Tile the main background up to PLAYABLE_HEIGHT
-    bg_w, bg_h = background_tile.get_size()
-    for y in range(0, PLAYABLE_HEIGHT, bg_h):
-        for x in range(0, SCREEN_WIDTH, bg_w):
-            # Check if tile bottom is above PLAYABLE_HEIGHT before blitting
-            if y + bg_h <= PLAYABLE_HEIGHT:
-                 screen.blit(background_tile, (x, y))
-            else:
-                 # Draw partial tile if it overlaps the boundary
-                 clip_height = PLAYABLE_HEIGHT - y
-                 if clip_height > 0:
-                      screen.blit(background_tile, (x, y), (0, 0, bg_w, clip_height))
-
-    # Draw the path (path points are already constrained to playable area)
-    if len(current_path) > 1:
-        pygame.draw.lines(screen, PATH_COLOR, False, current_path, path_width)
+def draw_build_bar(surface=None):
+    """Draws the build bar with multiple tower types (onto the screen unless surface is given)."""
+    global bottom_bar_button_rects
+    key = build_bar_key()
+    bar = build_bar.get(key, key[0], sim.player_gold)
+    bottom_bar_button_rects = build_bar.data
+    (screen if surface is None else surface).blit(bar, (0, BOTTOM_BAR_Y))
+
+# Retained UI panels: composited once, rebuilt only when what they show changes
+upgrade_panel = CachedPanel(UPGRADE_PANEL_SIZE, build_upgrade_panel, fill=(50, 50, 50, 210))
+upgrade_panel_inputs = None # ((tower, levels), costs, sell value) the cached costs were computed for
+build_bar = CachedPanel((SCREEN_WIDTH, BOTTOM_BAR_HEIGHT), build_build_bar, fill=BOTTOM_BAR_COLOR)
+
+def draw_tiled_background_and_path():
+    """Blits the cached grass + path + coop layer (rebuilt only when the map changes)."""
+    screen.blit(background_cache.game_layer(sim.path, coop_image, coop_rect), (0, 0))
+
+def game_base_layer():
+    """The game layer with the build bar baked in, for dirty-rect mode.
+
+    Rebuilt (forcing a full redraw) only when the map, the tower being
+    previewed or which towers are affordable changes.
+    """
+    global game_base, game_base_key
+    game_layer = background_cache.game_layer(sim.path, coop_image, coop_rect)
+    key = (id(game_layer),) + build_bar_key()
+    if key != game_base_key:
+        game_base = game_layer.copy()
+        draw_build_bar(game_base)
+        game_base_key = key
+        dirty_renderer.invalidate()
+    return game_base
 
 # --- Main Game Loop ---
 running = True
 while running:
     dt = clock.tick(FPS)
+    phase_start = time.perf_counter_ns() # Frame phases are timed from after the FPS wait
     mouse_pos = pygame.mouse.get_pos()
 
     # --- Event Handling ---
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+            profiler.stop(sim)
+            save_replay()
+            flight_recorder.close()
+            shutdown_logging()
             pygame.quit()
             sys.exit()
 
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            stats_overlay.toggle()
+            continue
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F5 and state == GAME:
+            # Start/stop a manual cProfile capture
+            if profiler.is_running: profiler.stop(sim)
+            else: profiler.start(sim)
+            continue
+
         if event.type == pygame.KEYDOWN:
             if state == GAME:
-                if event.key == pygame.K_f: time_scale = min(time_scale * 2, 16.0)
-                elif event.key == pygame.K_s: time_scale = max(1.0, time_scale / 2)
+                if event.key == pygame.K_f: sim.set_time_scale(sim.time_scale * 2)
+                elif event.key == pygame.K_s: sim.set_time_scale(sim.time_scale / 2)
                 elif event.key == pygame.K_ESCAPE:
                      if preview_tower: # If actively placing a tower
                          preview_tower = None
-                         print("Build cancelled.")
+                         log.info("Build cancelled.")
                      elif selected_tower: # If a tower is selected (showing upgrade panel)
-                         seleiiicted_tower = None
-                         print("Tower deselected.")
+                         selected_tower = None
+                         log.info("Tower deselected.")
                      else: # Otherwise, go back to the main menu
                          state = MENU
-                         print("Returning to Main Menu.")
+                         gc_scheduler.end_game()
+                         log.info("Returning to Main Menu.")
             elif state == GAME_OVER and event.key == pygame.K_RETURN: state = MENU
             elif state == MENU:
                 if event.key == pygame.K_RETURN:
@@ -701,7 +689,7 @@ while running:
                             clicked_handled = True
                             cost = TOWER_TYPES[tower_key]['cost']
                             icon_img = TOWER_TYPES[tower_key]['icon']
-                            if player_gold >= cost:
+                            if sim.player_gold >= cost:
                                 if current_preview_type == tower_key:
                                     preview_tower = None
                                 else:
@@ -709,7 +697,7 @@ while running:
                                     preview_tower = Tower(mouse_pos[0], mouse_pos[1], icon_img, tower_key)
                                     selected_tower = None
                             else:
-                                print(f"Not enough gold for {tower_key} (${cost})")
+                                log.info("Not enough gold for %s ($%d)", tower_key, cost)
                             break
                     # 2. Check Upgrade Panel Buttons
                     if not clicked_handled and selected_tower:
@@ -717,62 +705,25 @@ while running:
                             if rect.collidepoint(mouse_pos):
                                 clicked_handled = True
                                 if button_type == 'sell':
-                                    # Sell the tower
-                                    sell_value = selected_tower.get_sell_value()
-                                    player_gold += sell_value
-                                    towers.remove(selected_tower)
-                                    print(f"Sold tower for ${sell_value}. Gold: {player_gold}")
+                                    sim.sell_tower(selected_tower)
                                     selected_tower = None
                                 else: # It's an upgrade button
-                                    stat_type = button_type
-                                    cost = selected_tower.get_upgrade_cost(stat_type)
-                                    # Corrected Check: cost >= 0 means it's possible and not max/locked
-                                    if cost >= 0:
-                                        if player_gold >= cost:
-                                            # Attempt upgrade
-                                            success, actual_cost = selected_tower.upgrade(stat_type)
-                                            if success:
-                                                player_gold -= actual_cost
-                                                print(f"Upgraded {stat_type}! Gold left: {player_gold}")
-                                            # else: No need for internal fail message here
-                                        else:
-                                            print("Not enough gold!")
-                                    elif cost == -1:
-                                        print("Already at max level!")
-                                    elif cost == -2:
-                                        print(f"Cannot upgrade {stat_type}: Locked by specialization!")
-                                    # else: Should not happen
+                                    sim.upgrade_tower(selected_tower, button_type)
                                 break # Stop checking buttons
                     # 3. Check Game Area Clicks
                     if not clicked_handled and state == GAME:
                         if preview_tower: # If building
                             if mouse_pos[1] < BOTTOM_BAR_Y:
-                                # --- Proximity Check --- #
-                                min_tower_separation = preview_tower.rect.width * 0.75 # Min dist based on tower width
-                                placement_ok = is_placement_valid(mouse_pos, towers, min_tower_separation)
-                                # --- Original Checks --- #
-                                gold_ok = player_gold >= preview_tower.cost
-                                path_ok = not is_on_path(mouse_pos, current_path)
-
-                                if gold_ok and path_ok and placement_ok:
-                                    towers.append(Tower(mouse_pos[0], mouse_pos[1], preview_tower.image, preview_tower.tower_type))
-                                    player_gold -= preview_tower.cost
+                                if sim.place_tower(mouse_pos[0], mouse_pos[1], preview_tower.tower_type):
                                     preview_tower = None
-                                else:
-                                    # Give specific feedback
-                                    reason = []
-                                    if not gold_ok: reason.append("insufficient gold")
-                                    if not path_ok: reason.append("on path")
-                                    if not placement_ok: reason.append("too close to another tower")
-                                    print(f"Cannot place tower here ({', '.join(reason)}).")
                             else:
-                                 print("Cannot place tower in UI area.")
+                                 log.info("Cannot place tower in UI area.")
                         # If not building, try selecting existing tower
                         else:
                             # Check if click is outside the bottom bar area
                             if mouse_pos[1] < BOTTOM_BAR_Y:
                                 clicked_tower = None
-                                for tower in towers:
+                                for tower in sim.towers:
                                     if tower.rect.collidepoint(mouse_pos):
                                         clicked_tower = tower
                                         break
@@ -782,138 +733,72 @@ while running:
                                 else:
                                     selected_tower = clicked_tower # Select new or different tower
                                 if selected_tower:
-                                    print(f"Selected Tower at {selected_tower.rect.center}")
+                                    log.info("Selected Tower at %s", selected_tower.rect.center)
                             else:
                                 selected_tower = None # Clicking UI deselects tower
             # --- Right Click --- #
             elif event.button == 3:
-                 if preview_tower: preview_tower = None; print("Build cancelled.")
-                 elif selected_tower: selected_tower = None; print("Tower deselected.")
+                 if preview_tower: preview_tower = None; log.info("Build cancelled.")
+                 elif selected_tower: selected_tower = None; log.info("Tower deselected.")
+
+    phase_start = frame_stats.mark('events', phase_start)
 
-    # --- State Logic & Updates (Apply time_scale * BASE_GAME_SPEED) ---
+    # --- State Logic & Updates ---
+    ticks_this_frame = 0
     if state == GAME:
-        effective_time_scale = time_scale * BASE_GAME_SPEED
-
-        # Wave Management (apply effective time scale)
-        if enemies_spawned_this_wave < enemies_to_spawn_this_wave:
-            spawn_timer -= effective_time_scale # Countdown timer
-
-            if spawn_timer <= 0:
-                if is_waiting_between_groups:
-                    # Finished waiting, start next group
-                    is_waiting_between_groups = False
-                    enemies_spawned_this_group = 0
-                    # Set timer for the first enemy of this new group
-                    spawn_timer = SPAWN_INTERVAL_WITHIN_GROUP
-                    # Need to re-check timer in the same frame if interval is 0
-                    if spawn_timer <= 0: continue # Process the actual spawn below
-                else:
-                    # Spawn one enemy (within a group)
-                    # Determine enemy type and properties
-                    if wave_number % 10 == 0: # Boss Wave (still only 1 total)
-                        # ... (Boss spawning logic - unchanged)
-                        enemy_img = ENEMY_IMAGES['cat']
-                        num_previous_boss_waves = max(0, (wave_number // 10) - 1)
-                        dynamic_health_multiplier = 10.0 * (1.05 ** num_previous_boss_waves)
-                        if selected_difficulty == 'Medium': dynamic_health_multiplier *= 1.3
-                        elif selected_difficulty == 'Hard': dynamic_health_multiplier *= 1.5
-                        new_enemy = Enemy(current_path, wave_number, enemy_img, enemy_type='cat', scale=2.0, health_multiplier=dynamic_health_multiplier)
-                        enemies.append(new_enemy)
-                        print(f"Boss Cat Spawned! (Wave {wave_number}, Health Multi: {dynamic_health_multiplier:.2f}x, Difficulty: {selected_difficulty})")
-                    else: # Regular Wave
-                        enemy_type = 'raccoon' if random.random() < 0.7 else 'cat'
-                        enemy_img = ENEMY_IMAGES[enemy_type]
-                        new_enemy = Enemy(current_path, wave_number, enemy_img, enemy_type=enemy_type)
-                        enemies.append(new_enemy)
-
-                    # Increment counts
-                    enemies_spawned_this_wave += 1
-                    enemies_spawned_this_group += 1
-
-                    # Check if wave is fully spawned
-                    if enemies_spawned_this_wave >= enemies_to_spawn_this_wave:
-                        spawn_timer = float('inf') # Stop spawning
-                    # Check if current group is finished
-                    elif enemies_spawned_this_group >= GROUP_SIZE:
-                        is_waiting_between_groups = True
-                        spawn_timer = TIME_BETWEEN_GROUPS # Set wait time for next group
-                    else:
-                        # Continue current group
-                        spawn_timer = SPAWN_INTERVAL_WITHIN_GROUP # Timer for next enemy in group
-
-        elif len(enemies) == 0:
-            print(f"Between waves: wave_timer = {wave_timer:.1f}") # Debug Print
-            # --- Between waves ---
-            # --- Boss Warning Check (before timer runs out) ---
-            if wave_timer > 0:
-                if (wave_number + 1) % 10 == 0:
-                    boss_wave_incoming = True
-                else:
-                    boss_wave_incoming = False # Ensure it's false if next wave isn't boss
-            # --- End Boss Warning Check ---
-
-            wave_timer -= 1 # Decrement by 1 frame, independent of game speed
-            if wave_timer <= 0:
-                print("Wave timer reached zero, calling start_next_wave()") # Debug Print
-                start_next_wave()
-                boss_wave_incoming = False # Reset flag AFTER starting the next wave
-
-        # Update Enemies (pass effective time scale)
-        for enemy in enemies[:]:
-            reached_end = enemy.move(effective_time_scale)
-            if reached_end:
-                player_health -= 1
-            if enemy.is_dead:
-                print(f"Removing defeated enemy: {enemy.enemy_type}") # Debug Print
-                if not reached_end:
-                    player_gold += enemy.reward
-                    score += enemy.points_value
-                enemies.remove(enemy)
+        ticks_this_frame = sim.advance(dt / 1000) # Fixed-size ticks; several per frame at higher speeds
+        frame_stats.add(sim.reset_phase_times())
+        profiler.update(sim)
+        gc_scheduler.update(sim)
+        phase_start = time.perf_counter_ns()
 
         # Check for Game Over
-        if player_health <= 0:
+        if sim.is_game_over:
             state = GAME_OVER
+            profiler.stop(sim) # Auto captures already stopped in update(); this ends a manual one
+            gc_scheduler.end_game()
+            save_replay()
+            frame_stats.end_frame()
             continue
 
-        # Update Towers (pass effective time scale)
-        for tower in towers:
-            tower.update(enemies, projectiles, effective_time_scale, projectile_img)
-
-        # Update Projectiles (Pass enemies list)
-        for proj in projectiles[:]:
-            proj.move(effective_time_scale, enemies_list=enemies)
-            if not proj.is_active:
-                projectiles.remove(proj)
-
         # Update Preview Tower (unchanged)
         if build_mode and preview_tower:
             preview_tower.x, preview_tower.y = mouse_pos
             preview_tower.rect.center = mouse_pos
 
     # --- Drawing --- #
-    screen.blit(background_tile, (0, 0))
-
     if state == MENU or state == DIFFICULTY_SELECT: # Combined check
         draw_menu() # draw_menu now handles both states
     elif state == GAME:
-        # Draw tiled background and path first
-        draw_tiled_background_and_path()
-
-        # --- Draw Coop Here --- #
-        if coop_image and coop_rect:
-            screen.blit(coop_image, coop_rect)
-        # --- End Coop Draw --- #
-
-        # Draw Towers, Enemies, Projectiles
-        for tower in towers:
-            tower.draw(screen, is_selected=(tower == selected_tower))
-        for enemy in enemies:
-            enemy.draw(screen)
-        for proj in projectiles:
-            proj.draw(screen)
+        # Draw background, path and coop first (one cached blit, or just last frame's regions)
+        if dirty_renderer.enabled:
+            dirty_renderer.begin(screen, game_base_layer())
+        else:
+            draw_tiled_background_and_path()
+        phase_start = frame_stats.mark('background', phase_start)
+
+        # Draw Towers, Enemies, Projectiles (queued, then one blits call per layer)
+        for tower in sim.towers:
+            tower.queue_draw(render_queue)
+        for enemy in sim.enemies:
+            enemy.queue_draw(render_queue)
+        for proj in sim.projectiles:
+            proj.queue_draw(render_queue)
+        sim.effects.queue_draw(render_queue)
+        if dirty_renderer.enabled:
+            # The build bar is baked into the base layer, so keep entities off it
+            screen.set_clip((0, 0, SCREEN_WIDTH, PLAYABLE_HEIGHT))
+            render_queue.flush(screen, dirty_renderer.rects)
+            screen.set_clip(None)
+        else:
+            render_queue.flush(screen)
+        if selected_tower in sim.towers:
+            mark(selected_tower.draw_range(screen))
+        phase_start = frame_stats.mark('entities', phase_start)
 
         # Draw Build Bottom Bar (Call the new function)
-        draw_build_bar()
+        if not dirty_renderer.enabled:
+            draw_build_bar()
 
         # Draw Preview Tower (if building - UPDATED VISUALS)
         if preview_tower:
@@ -922,35 +807,51 @@ while running:
             preview_tower.rect.center = mouse_pos
 
             # --- Determine full placement validity for visual feedback --- #
-            gold_ok = player_gold >= preview_tower.cost
-            path_ok = not is_on_path(mouse_pos, current_path)
-            min_tower_separation = preview_tower.rect.width * 0.75
-            placement_proximity_ok = is_placement_valid(mouse_pos, towers, min_tower_separation)
-            is_valid_placement = gold_ok and path_ok and placement_proximity_ok
+            is_valid_placement = not sim.get_placement_problems(mouse_pos, preview_tower.tower_type)
             # --- End Validity Check --- #
 
             # Determine tint color based on overall validity
             tint_color = (0, 100, 255, 150) if is_valid_placement else (255, 0, 0, 150) # Blue or Red
 
-            # Draw semi-transparent range circle using the tint color
-            range_surface = pygame.Surface((preview_tower.range * 2, preview_tower.range * 2), pygame.SRCALPHA)
+            # Draw semi-transparent range circle using the tint color (both surfaces come from the sprite cache)
             range_circle_color = (tint_color[0], tint_color[1], tint_color[2], 50) # Lighter alpha for range
-            pygame.draw.circle(range_surface, range_circle_color, (preview_tower.range, preview_tower.range), preview_tower.range)
-            screen.blit(range_surface, (preview_tower.rect.centerx - preview_tower.range, preview_tower.rect.centery - preview_tower.range))
+            range_surface = sprite_cache.range_circle(preview_tower.range, range_circle_color)
+            mark(screen.blit(range_surface, (preview_tower.rect.centerx - preview_tower.range, preview_tower.rect.centery - preview_tower.range)))
 
             # Draw tinted tower image preview using the tint color
-            preview_img_copy = preview_tower.image.copy()
-            preview_img_copy.fill(tint_color, special_flags=pygame.BLEND_RGBA_MULT)
-            img_rect = preview_img_copy.get_rect(center=preview_tower.rect.center)
-            screen.blit(preview_img_copy, img_rect)
+            preview_img = sprite_cache.tinted(preview_tower.image, tint_color)
+            img_rect = preview_img.get_rect(center=preview_tower.rect.center)
+            mark(screen.blit(preview_img, img_rect))
 
         # Draw UI
         draw_game_ui()
 
     elif state == GAME_OVER:
         draw_game_over()
+    phase_start = frame_stats.mark('ui', phase_start) # Menus and game over count as UI
+
+    if stats_overlay.visible:
+        info_lines = [f"FPS: {clock.get_fps():.0f}"]
+        if sim is not None:
+            info_lines.append(f"enemies: {len(sim.enemies)}  projectiles: {len(sim.projectiles)}  towers: {len(sim.towers)}")
+            info_lines.append(gc_scheduler.summary_line())
+            info_lines.append(f"time scale: {sim.time_scale:.0f}x ({sim.time_scale * BASE_GAME_SPEED:.0f} units/frame, {ticks_this_frame} ticks)")
+        if dirty_renderer.enabled:
+            info_lines.append(dirty_renderer.summary_line())
+        mark(stats_overlay.draw(screen, info_lines))
+        phase_start = frame_stats.mark('overlay', phase_start)
+
+    if state == GAME and dirty_renderer.enabled:
+        dirty_renderer.present()
+    else:
+        pygame.display.flip()
+        dirty_renderer.invalidate() # Menus redraw everything; the next game frame must too
+    frame_stats.mark('flip', phase_start)
+    if state == GAME:
+        flight_recorder.record(frame_stats.current, sim, ticks_this_frame)
+    frame_stats.end_frame()
 
-    pygame.display.flip()
-
+flight_recorder.close()
+shutdown_logging()
 pygame.quit()
 sys.exit() 
\ No newline at end of file
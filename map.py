@@ -1,10 +1,84 @@
 import random
 import pygame
+from bisect import bisect_right
+from game_log import get_logger
 
-def get_path(screen_width=1920, playable_height=930, num_major_points=5, points_between=2, border_margin=75):
+log = get_logger('map')
+
+class Path:
+    """Waypoint list with a precomputed arc-length table.
+
+    Behaves like the plain list of (x, y) waypoints for drawing and placement
+    checks, and maps a distance travelled along the path to a position.
+    """
+
+    def __init__(self, waypoints):
+        self.waypoints = [tuple(point) for point in waypoints]
+        self.cumulative_lengths = [0.0] # Arc length at each waypoint
+        self.directions = [] # Unit vector of each segment
+        for (x1, y1), (x2, y2) in zip(self.waypoints, self.waypoints[1:]):
+            dx, dy = x2 - x1, y2 - y1
+            segment_length = (dx ** 2 + dy ** 2) ** 0.5
+            if segment_length > 0:
+                self.directions.append((dx / segment_length, dy / segment_length))
+            else:
+                self.directions.append((0.0, 0.0))
+            self.cumulative_lengths.append(self.cumulative_lengths[-1] + segment_length)
+        self.length = self.cumulative_lengths[-1]
+
+    def __len__(self):
+        return len(self.waypoints)
+
+    def __getitem__(self, index):
+        return self.waypoints[index]
+
+    def __iter__(self):
+        return iter(self.waypoints)
+
+    def segment_index_at(self, distance):
+        """Index of the waypoint that starts the segment containing distance."""
+        index = bisect_right(self.cumulative_lengths, distance) - 1
+        return max(0, min(index, len(self.waypoints) - 1))
+
+    def position_at(self, distance):
+        """Returns the (x, y) point reached after travelling distance along the path."""
+        index = self.segment_index_at(distance)
+        if index >= len(self.directions):
+            return self.waypoints[-1]
+        start_x, start_y = self.waypoints[index]
+        dir_x, dir_y = self.directions[index]
+        along = distance - self.cumulative_lengths[index]
+        return start_x + dir_x * along, start_y + dir_y * along
+
+    def coverage_intervals(self, center, radius):
+        """Returns the merged [(start, end), ...] distance ranges whose points lie within radius of center."""
+        cx, cy = center
+        intervals = []
+        for index, (dir_x, dir_y) in enumerate(self.directions):
+            start_x, start_y = self.waypoints[index]
+            segment_length = self.cumulative_lengths[index + 1] - self.cumulative_lengths[index]
+            # Solve |start + t * dir - center| <= radius for t along the segment
+            fx, fy = start_x - cx, start_y - cy
+            b = fx * dir_x + fy * dir_y
+            disc = b * b - (fx * fx + fy * fy - radius * radius)
+            if disc < 0: continue
+            root = disc ** 0.5
+            t0, t1 = max(0.0, -b - root), min(segment_length, -b + root)
+            if t0 > t1: continue
+            start, end = self.cumulative_lengths[index] + t0, self.cumulative_lengths[index] + t1
+            if intervals and start <= intervals[-1][1]:
+                intervals[-1] = (intervals[-1][0], max(intervals[-1][1], end))
+            else:
+                intervals.append((start, end))
+        return intervals
+
+def get_path(screen_width=1920, playable_height=930, num_major_points=5, points_between=2, border_margin=75, rng=None):
     """Generates a path within the specified screen_width and playable_height,
        with the end point forced into the lower-right quadrant.
+       rng is a random.Random (the global random module if omitted), so a seeded
+       game always gets the same path.
     """
+    if rng is None: rng = random
     waypoints = []
     min_dist_sq = 75**2 # Minimum squared distance between any points
 
@@ -20,7 +94,7 @@ def get_path(screen_width=1920, playable_height=930, num_major_points=5, points_
 
     # 1. Starting Point (use playable_height for Y)
     start_x = border_margin
-    start_y = random.randint(effective_border_margin_y, playable_height - effective_border_margin_y)
+    start_y = rng.randint(effective_border_margin_y, playable_height - effective_border_margin_y)
     waypoints.append((start_x, start_y))
 
     # 2. Major Waypoints across screen bands (use playable_height for Y)
@@ -32,8 +106,8 @@ def get_path(screen_width=1920, playable_height=930, num_major_points=5, points_
     for i in range(num_major_points - 1):
         band_start_x = border_margin + i * band_width
         band_end_x = border_margin + (i + 1) * band_width
-        major_x = random.randint(int(max(band_start_x, last_major_x + 50)), int(band_end_x))
-        major_y = random.randint(effective_border_margin_y, playable_height - effective_border_margin_y) # Use playable_height
+        major_x = rng.randint(int(max(band_start_x, last_major_x + 50)), int(band_end_x))
+        major_y = rng.randint(effective_border_margin_y, playable_height - effective_border_margin_y) # Use playable_height
         major_point = (major_x, major_y)
 
         # 3. Add Intermediate points (use playable_height for Y calculation and clamping)
@@ -44,8 +118,8 @@ def get_path(screen_width=1920, playable_height=930, num_major_points=5, points_
             inter_y_base = last_point[1] + (major_point[1] - last_point[1]) * t
             offset_range_x = band_width / 2
             offset_range_y = playable_height / 4 # Offset relative to playable height
-            inter_x = int(inter_x_base + random.uniform(-offset_range_x, offset_range_x))
-            inter_y = int(inter_y_base + random.uniform(-offset_range_y, offset_range_y))
+            inter_x = int(inter_x_base + rng.uniform(-offset_range_x, offset_range_x))
+            inter_y = int(inter_y_base + rng.uniform(-offset_range_y, offset_range_y))
             inter_x = max(border_margin, min(screen_width - border_margin, inter_x))
             inter_y = max(effective_border_margin_y, min(playable_height - effective_border_margin_y, inter_y)) # Clamp Y to playable area
             intermediate_point = (inter_x, inter_y)
@@ -65,12 +139,12 @@ def get_path(screen_width=1920, playable_height=930, num_major_points=5, points_
 
     # Force X coordinate towards the right half/third of the screen
     final_major_x_min = max(last_band_start_x, screen_width * 0.6) # Ensure it's in the right ~40%
-    final_major_x = random.randint(int(final_major_x_min), int(last_band_end_x))
+    final_major_x = rng.randint(int(final_major_x_min), int(last_band_end_x))
 
     # Force Y coordinate into the lower half of the playable area
     final_major_y_min = playable_height // 2
     final_major_y_max = playable_height - effective_border_margin_y
-    final_major_y = random.randint(int(final_major_y_min), int(final_major_y_max))
+    final_major_y = rng.randint(int(final_major_y_min), int(final_major_y_max))
 
     final_major_point = (final_major_x, final_major_y)
 
@@ -82,8 +156,8 @@ def get_path(screen_width=1920, playable_height=930, num_major_points=5, points_
         inter_y_base = last_point[1] + (final_major_point[1] - last_point[1]) * t
         offset_range_x = band_width / 2
         offset_range_y = playable_height / 4
-        inter_x = int(inter_x_base + random.uniform(-offset_range_x, offset_range_x))
-        inter_y = int(inter_y_base + random.uniform(-offset_range_y, offset_range_y))
+        inter_x = int(inter_x_base + rng.uniform(-offset_range_x, offset_range_x))
+        inter_y = int(inter_y_base + rng.uniform(-offset_range_y, offset_range_y))
         inter_x = max(border_margin, min(screen_width - border_margin, inter_x))
         inter_y = max(effective_border_margin_y, min(playable_height - effective_border_margin_y, inter_y))
         intermediate_point = (inter_x, inter_y)
@@ -102,17 +176,17 @@ def get_path(screen_width=1920, playable_height=930, num_major_points=5, points_
     final_point = waypoints[-1]
     if final_point[0] < screen_width - border_margin * 2 or final_point[1] < playable_height / 2:
         end_x = screen_width - border_margin
-        end_y = random.randint(int(playable_height / 2), int(playable_height - effective_border_margin_y))
-        print(f"Cleanup: Adjusting final point to ({end_x}, {end_y})")
+        end_y = rng.randint(int(playable_height / 2), int(playable_height - effective_border_margin_y))
+        log.debug("Cleanup: Adjusting final point to (%d, %d)", end_x, end_y)
         if not is_too_close((end_x, end_y), waypoints):
             # Replace last point if too far left/too high after forcing logic
             waypoints[-1] = (end_x, end_y)
 
     # Ensure at least 2 points
     if len(waypoints) < 2:
-        print("Warning: Path generation resulted in < 2 points. Using default.")
+        log.warning("Path generation resulted in < 2 points. Using default.")
         # Default path ending lower right
         return [(border_margin, playable_height // 2), (screen_width - border_margin, playable_height * 3 // 4)]
 
-    print(f"Generated Path ({len(waypoints)} points, ending lower-right): {waypoints[-1]}")
+    log.info("Generated Path (%d points, ending lower-right): %s", len(waypoints), waypoints[-1])
     return waypoints 
\ No newline at end of file
@@ -0,0 +1,106 @@
+import csv
+import os
+import tracemalloc
+from game_log import get_logger
+
+log = get_logger('memory')
+
+# Modules whose retained memory gets its own CSV column; everything else is 'other'
+DEFAULT_MODULES = ('enemy.py', 'enemy_pool.py', 'projectile.py', 'tower.py', 'simulation.py', 'main.py')
+DEFAULT_TOP_N = 5
+DEFAULT_WARMUP_WAVES = 2 # Early waves legitimately grow (caches, pools); growth checks start after these
+TRACE_FRAMES = 1 # Only the allocating line is needed to group by module
+
+class MemoryGrowthError(RuntimeError):
+    """Raised when retained memory grows faster per wave than allowed."""
+
+class MemoryTracker:
+    """tracemalloc snapshots at every wave start, for finding slow leaks in long runs.
+
+    attach(sim) starts tracing and registers on sim.wave_listeners. At each
+    new wave it compares a snapshot with the previous one, logs the top
+    allocation-site diffs per tracked module, and appends a CSV row with the
+    total and per-module retained size. When max_growth_bytes is set, a wave
+    (after the warmup waves) that grew by more than that is a failure;
+    with fail_fast it raises MemoryGrowthError out of the simulation step.
+    """
+
+    def __init__(self, csv_path, modules=DEFAULT_MODULES, top_n=DEFAULT_TOP_N, max_growth_bytes=None,
+                 fail_fast=False, warmup_waves=DEFAULT_WARMUP_WAVES):
+        self.csv_path = csv_path
+        self.modules = tuple(modules)
+        self.top_n = top_n
+        self.max_growth_bytes = max_growth_bytes
+        self.fail_fast = fail_fast
+        self.warmup_waves = warmup_waves
+        self.failures = [] # (wave, growth bytes)
+        self.waves_seen = 0
+        self._snapshot = None
+        self._retained = 0
+        self._filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        ]
+
+    def attach(self, sim):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        directory = os.path.dirname(self.csv_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.csv_path, 'w', newline='') as f:
+            csv.writer(f).writerow(['wave', 'tick', 'retained_bytes', 'growth_bytes', 'peak_bytes', 'enemies', 'projectiles']
+                                   + [f"{module}_bytes" for module in self.modules] + ['other_bytes'])
+        self._take_snapshot()
+        sim.wave_listeners.append(self.on_wave_start)
+
+    def detach(self, sim):
+        if self.on_wave_start in sim.wave_listeners:
+            sim.wave_listeners.remove(self.on_wave_start)
+
+    def _take_snapshot(self):
+        snapshot = tracemalloc.take_snapshot().filter_traces(self._filters)
+        previous, self._snapshot = self._snapshot, snapshot
+        return previous, snapshot
+
+    def _module_of(self, filename):
+        name = os.path.basename(filename)
+        return name if name in self.modules else 'other'
+
+    def on_wave_start(self, sim):
+        previous, snapshot = self._take_snapshot()
+        per_module = dict.fromkeys(self.modules + ('other',), 0)
+        for stat in snapshot.statistics('filename'):
+            per_module[self._module_of(stat.traceback[0].filename)] += stat.size
+        retained = sum(per_module.values())
+        growth = retained - self._retained
+        self._retained = retained
+        self.waves_seen += 1
+        peak = tracemalloc.get_traced_memory()[1]
+
+        with open(self.csv_path, 'a', newline='') as f:
+            csv.writer(f).writerow([sim.wave_number, sim.tick_count, retained, growth, peak, len(sim.enemies), len(sim.projectiles)]
+                                   + [per_module[module] for module in self.modules] + [per_module['other']])
+        log.info("Wave %d: %.1f KiB retained (%+.1f KiB since the last wave)", sim.wave_number, retained / 1024, growth / 1024)
+        self._log_top_sites(previous, snapshot)
+
+        if self.max_growth_bytes is not None and self.waves_seen > self.warmup_waves and growth > self.max_growth_bytes:
+            self.failures.append((sim.wave_number, growth))
+            message = f"Memory grew {growth / 1024:.1f} KiB before wave {sim.wave_number} (limit {self.max_growth_bytes / 1024:.1f} KiB)"
+            log.warning(message)
+            if self.fail_fast:
+                raise MemoryGrowthError(message)
+
+    def _log_top_sites(self, previous, snapshot):
+        if previous is None: return
+        shown = dict.fromkeys(self.modules, 0)
+        for diff in snapshot.compare_to(previous, 'lineno'):
+            if diff.size_diff <= 0: continue
+            frame = diff.traceback[0]
+            module = self._module_of(frame.filename)
+            if module == 'other' or shown[module] >= self.top_n: continue
+            shown[module] += 1
+            log.info("  %s:%d %+.1f KiB (%+d blocks)", module, frame.lineno, diff.size_diff / 1024, diff.count_diff)
+
+    def stop(self):
+        tracemalloc.stop()
@@ -0,0 +1,175 @@
+import cProfile
+import io
+import os
+import pstats
+from collections import defaultdict
+from game_log import get_logger
+
+log = get_logger('profiling')
+
+DEFAULT_OUTPUT_DIR = 'profiles'
+DEFAULT_TOP_N = 30
+MIN_STACK_SECONDS = 1e-6 # Caller paths carrying less time than this are not expanded further
+MAX_STACK_DEPTH = 64
+
+def parse_wave_range(text):
+    """Parses '20' or '20-22' into (first_wave, last_wave)."""
+    first, _, last = text.partition('-')
+    first = int(first)
+    last = int(last) if last else first
+    if last < first:
+        raise ValueError(f"Wave range {text!r} ends before it starts")
+    return first, last
+
+def _frame_label(func):
+    filename, lineno, name = func
+    if filename == '~': # Builtins
+        label = name
+    else:
+        label = f"{os.path.basename(filename)}:{name}:{lineno}"
+    # ';' separates frames and the last space separates the count in collapsed stacks
+    return label.replace(';', ',').replace(' ', '_')
+
+def collapsed_stacks(stats):
+    """Converts pstats data into collapsed stacks ('root;...;leaf microseconds' lines).
+
+    cProfile only records caller -> callee pairs, not whole stacks, so each
+    function's own time is split across its callers in proportion to the time
+    each caller accounted for, recursively up to the roots. Shapes are
+    therefore approximate where one function is reached along several paths,
+    but totals per function are exact.
+    """
+    raw = stats.stats # func -> (primitive calls, calls, own time, cumulative time, callers)
+    weights = defaultdict(float)
+
+    def walk(func, seconds, path, on_path):
+        callers = raw.get(func, (0, 0, 0, 0, {}))[4]
+        callers = {caller: info for caller, info in callers.items() if caller not in on_path}
+        if not callers or len(path) >= MAX_STACK_DEPTH or seconds < MIN_STACK_SECONDS:
+            weights[';'.join(_frame_label(f) for f in reversed(path))] += seconds
+            return
+        total = sum(info[3] for info in callers.values())
+        for caller, info in callers.items():
+            share = info[3] / total if total > 0 else 1 / len(callers)
+            walk(caller, seconds * share, path + [caller], on_path | {caller})
+
+    for func, (cc, nc, own_time, cumulative, callers) in raw.items():
+        if own_time <= 0: continue
+        if not callers:
+            walk(func, own_time, [func], {func})
+            continue
+        # The first step up splits by own time spent per caller, not cumulative time
+        total = sum(info[2] for info in callers.values())
+        for caller, info in callers.items():
+            share = info[2] / total if total > 0 else 1 / len(callers)
+            if caller == func: # Direct recursion: keep the time on this frame
+                walk(func, own_time * share, [func], {func})
+            else:
+                walk(caller, own_time * share, [func, caller], {func, caller})
+
+    lines = []
+    for stack, seconds in sorted(weights.items()):
+        micros = int(round(seconds * 1e6))
+        if micros > 0:
+            lines.append(f"{stack} {micros}")
+    return lines
+
+class WaveProfiler:
+    """Runs cProfile while the simulation is inside a wave range, then dumps the results.
+
+    Call update(sim) after each step/frame: profiling starts when the sim is
+    on first_wave..last_wave and stops (and writes its files) once it moves
+    past last_wave or the game ends; start_game() re-arms the range for the
+    next game. start()/stop() capture manually instead, e.g. from a hotkey.
+    The profiler only reads simulation state, so a profiled run plays out
+    exactly like an unprofiled one.
+
+    Each capture writes, named after the waves and seed:
+      .collapsed  collapsed stacks in microseconds (flamegraph.pl, speedscope, ...)
+      .txt        the capture's tags plus the top-N functions by own and cumulative time
+      .prof       raw pstats data (snakeviz, pstats)
+    """
+
+    def __init__(self, first_wave=None, last_wave=None, output_dir=DEFAULT_OUTPUT_DIR, top_n=DEFAULT_TOP_N):
+        self.first_wave = first_wave
+        self.last_wave = last_wave if last_wave is not None else first_wave
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.profile = None
+        self.captures = [] # Tags of every capture written so far
+        self._tags = None
+        self._range_captured = False
+
+    @property
+    def is_running(self):
+        return self.profile is not None
+
+    def start_game(self):
+        """Re-arms the wave range, so a new game in the same session gets its own capture."""
+        self._range_captured = False
+
+    def update(self, sim):
+        if self.first_wave is not None:
+            in_range = self.first_wave <= sim.wave_number <= self.last_wave and not sim.is_game_over
+            if in_range and not self.is_running and not self._range_captured:
+                self.start(sim, auto=True)
+            elif not in_range and self.is_running and self._tags['auto']:
+                self.stop(sim)
+        if self.is_running:
+            tags = self._tags
+            tags['last_wave'] = max(tags['last_wave'], sim.wave_number)
+            tags['max_enemies'] = max(tags['max_enemies'], len(sim.enemies))
+            tags['max_projectiles'] = max(tags['max_projectiles'], len(sim.projectiles))
+
+    def start(self, sim, auto=False):
+        if self.is_running: return
+        self._tags = {
+            'auto': auto,
+            'seed': sim.seed,
+            'difficulty': sim.difficulty,
+            'first_wave': sim.wave_number,
+            'last_wave': sim.wave_number,
+            'start_tick': sim.tick_count,
+            'max_enemies': len(sim.enemies),
+            'max_projectiles': len(sim.projectiles),
+            'towers_at_start': len(sim.towers),
+        }
+        log.info("Profiling started at wave %d (tick %d, seed %d)", sim.wave_number, sim.tick_count, sim.seed)
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self, sim):
+        """Stops the capture and writes its files. Returns the summary path."""
+        if not self.is_running: return None
+        self.profile.disable()
+        profile, self.profile = self.profile, None
+        tags = self._tags
+        if tags['auto']: self._range_captured = True
+        tags.update(end_tick=sim.tick_count, ticks=sim.tick_count - tags['start_tick'],
+                    towers_at_end=len(sim.towers), enemies_at_end=len(sim.enemies),
+                    projectiles_at_end=len(sim.projectiles))
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"wave{tags['first_wave']}-{tags['last_wave']}_seed{tags['seed']}_tick{tags['start_tick']}")
+        stats = pstats.Stats(profile)
+        stats.dump_stats(base + '.prof')
+        with open(base + '.collapsed', 'w') as f:
+            f.write('\n'.join(collapsed_stacks(stats)) + '\n')
+        with open(base + '.txt', 'w') as f:
+            f.write(self._summary(stats, tags))
+        tags['summary'] = base + '.txt'
+        self.captures.append(tags)
+        log.info("Profile for waves %d-%d (%d ticks) written to %s.*", tags['first_wave'], tags['last_wave'], tags['ticks'], base)
+        return base + '.txt'
+
+    def _summary(self, stats, tags):
+        out = io.StringIO()
+        stats.stream = out
+        out.write(f"Waves {tags['first_wave']}-{tags['last_wave']}, seed {tags['seed']} ({tags['difficulty']}), "
+                  f"ticks {tags['start_tick']}-{tags['end_tick']} ({tags['ticks']})\n")
+        out.write(f"Towers: {tags['towers_at_start']} -> {tags['towers_at_end']}, "
+                  f"max enemies: {tags['max_enemies']}, max projectiles: {tags['max_projectiles']}\n\n")
+        for sort_key, title in (('tottime', 'own time'), ('cumulative', 'cumulative time')):
+            out.write(f"--- Top {self.top_n} by {title} ---\n")
+            stats.sort_stats(sort_key).print_stats(self.top_n)
+        return out.getvalue()
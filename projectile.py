@@ -1,4 +1,7 @@
 import pygame
+from game_log import get_logger
+from sprite_cache import sprite_cache
+from render_queue import draw_now
 # import random # Removed random import
 
 # Constants
@@ -6,18 +9,40 @@ DEFAULT_SPEED = 500 # Pixels per second
 # Define constants for DoT effects (if not defined elsewhere)
 DOT_TICK_RATE = 60 # How often DoT damage is applied per second (matches FPS)
 
+log = get_logger('projectile')
+
+DEFAULT_POOL_CAPACITY = 512 # Enough for several fully upgraded miniguns at max speed
+
 class Projectile:
+    __slots__ = ('image', 'float_x', 'float_y', 'rect', 'target_pool', 'target_handle', 'damage', 'base_speed', 'is_active',
+                 'projectile_type', 'aoe_radius', 'dot_damage', 'dot_duration',
+                 'base_damage', 'dot_damage_per_second', 'dot_duration_seconds', 'tower_ref', 'handle')
+
     def __init__(self, start_x, start_y, target_enemy, damage, image=None,
                  projectile_type='basic', aoe_radius=0, dot_damage=0, dot_duration=0, tower_ref=None):
+        self.rect = pygame.Rect(0, 0, 4, 4)
+        self.reset(start_x, start_y, target_enemy, damage, image, projectile_type, aoe_radius, dot_damage, dot_duration, tower_ref)
+
+    def reset(self, start_x, start_y, target_enemy, damage, image=None,
+              projectile_type='basic', aoe_radius=0, dot_damage=0, dot_duration=0, tower_ref=None):
+        """(Re)initializes every field so a pooled instance can be reused for a new shot."""
         self.image = image
         self.float_x = start_x
         self.float_y = start_y
+        # Reuse the existing Rect instead of allocating a new one
         if self.image:
-            self.rect = self.image.get_rect(center=(self.float_x, self.float_y))
+            self.rect.size = self.image.get_size()
+            self.rect.center = (self.float_x, self.float_y)
         else:
-            self.rect = pygame.Rect(start_x - 2, start_y - 2, 4, 4)
+            self.rect.update(start_x - 2, start_y - 2, 4, 4)
 
-        self.target = target_enemy
+        # Keep a generation-tagged handle, not the enemy itself, so removed enemies aren't kept alive
+        if target_enemy is not None and target_enemy.handle is not None:
+            self.target_pool = target_enemy.pool
+            self.target_handle = target_enemy.handle
+        else:
+            self.target_pool = None
+            self.target_handle = None
         self.damage = damage # Direct hit damage
         self.base_speed = 8
         self.is_active = True
@@ -28,11 +53,6 @@ class Projectile:
         self.dot_damage = dot_damage
         self.dot_duration = dot_duration
 
-        # Bomb specific visual effect timer
-        self.explosion_timer = 0
-        self.explosion_duration = 8 # Frames for explosion visual (Halved from 15)
-        self.explosion_pos = None
-
         # --- Type-Specific Attributes (Calculated from tower) ---
         self.base_damage = 0
         self.dot_damage_per_second = 0 # New: Store damage per second
@@ -40,10 +60,17 @@ class Projectile:
         self.tower_ref = tower_ref # Keep a reference to the tower for stats
         self._derive_stats_from_tower()
 
+    @property
+    def target(self):
+        """The targeted enemy, or None once it has been removed from its pool."""
+        if self.target_pool is None:
+            return None
+        return self.target_pool.get(self.target_handle)
+
     def _derive_stats_from_tower(self):
         """Gets damage, AoE, DoT stats from the referenced tower."""
         if not self.tower_ref:
-            print("Warning: Projectile created without tower reference!")
+            log.warning("Projectile created without tower reference!")
             return
 
         self.base_damage = self.tower_ref.damage # Use tower's current damage
@@ -68,21 +95,17 @@ class Projectile:
             self.dot_damage_per_second = 10
             self.dot_duration_seconds = 5
 
-    def move(self, time_scale=1.0, enemies_list=None):
+    def move(self, time_scale=1.0, enemies_list=None, enemy_grid=None, effects=None):
         if not self.is_active: return
-        if self.explosion_timer > 0: # Handle explosion visual countdown
-            self.explosion_timer -= time_scale # Reverted: Scales with game speed
-            if self.explosion_timer <= 0:
-                self.is_active = False # Deactivate after explosion visual ends
-            return # Don't move during explosion visual
 
-        if not self.target or self.target.is_dead:
+        target = self.target # Resolve the handle once per tick
+        if not target or target.is_dead:
             # If target gone, deactivate (bomb could optionally explode here)
             self.is_active = False
             return
 
         current_speed = self.base_speed * time_scale
-        target_x, target_y = self.target.rect.centerx, self.target.rect.centery
+        target_x, target_y = target.rect.centerx, target.rect.centery
         direction_x = target_x - self.float_x
         direction_y = target_y - self.float_y
         distance = (direction_x ** 2 + direction_y ** 2) ** 0.5
@@ -101,58 +124,109 @@ class Projectile:
             hit_target = True
 
         if hit_target:
-            self.handle_impact(enemies_list)
+            self.handle_impact(enemies_list, enemy_grid, effects)
 
-    def handle_impact(self, enemies_list):
-        """Handles damage application based on projectile type."""
+    def handle_impact(self, enemies_list, enemy_grid=None, effects=None):
+        """Handles damage application based on projectile type (bomb explosions go to effects, an EffectsLayer)."""
         impact_pos = pygame.Vector2(self.rect.center) # Use projectile pos at impact
+        target = self.target
 
         if self.projectile_type == 'basic':
-            if self.target and not self.target.is_dead:
-                self.target.take_damage(self.base_damage)
+            if target and not target.is_dead:
+                target.take_damage(self.base_damage)
             self.is_active = False # Basic projectile disappears on hit
 
         elif self.projectile_type == 'bomb':
-            print(f"Bomb impacted at {impact_pos}! AoE: {self.aoe_radius}")
-            if enemies_list:
+            log.debug("Bomb impacted at %s! AoE: %s", impact_pos, self.aoe_radius)
+            if enemy_grid is not None:
+                 # Only the grid cells overlapping the blast (distance check done by the query)
+                 for enemy in enemy_grid.query_radius(impact_pos.x, impact_pos.y, self.aoe_radius):
+                      if not enemy.is_dead:
+                           log.debug("Hitting enemy %s in AoE.", enemy.enemy_type)
+                           enemy.take_damage(self.base_damage)
+            elif enemies_list:
                  for enemy in enemies_list:
                       if not enemy.is_dead:
                           enemy_pos = pygame.Vector2(enemy.rect.center)
                           dist_sq = (impact_pos - enemy_pos).length_squared()
                           if dist_sq <= self.aoe_radius ** 2:
-                               print(f"  Hitting enemy {enemy.enemy_type} in AoE.")
+                               log.debug("Hitting enemy %s in AoE.", enemy.enemy_type)
                                enemy.take_damage(self.base_damage)
-            # Start explosion visual, don't deactivate immediately
-            self.explosion_timer = self.explosion_duration
-            self.explosion_pos = impact_pos
-            # Stop rendering the projectile image itself during explosion
-            self.image = None # Or set a flag
+            # The explosion visual lives on in the effects layer; the projectile itself is done
+            if effects is not None:
+                effects.spawn_explosion(impact_pos.x, impact_pos.y, self.aoe_radius)
+            self.is_active = False
 
         elif self.projectile_type == 'fire':
-            if self.target and not self.target.is_dead:
-                self.target.take_damage(self.base_damage)
-                self.target.apply_dot(self.dot_damage_per_second, self.dot_duration_seconds)
-                print(f"Applied Fire DoT: {self.dot_damage_per_second:.1f} dmg/sec for {self.dot_duration_seconds} sec.")
+            if target and not target.is_dead:
+                target.take_damage(self.base_damage)
+                target.apply_dot(self.dot_damage_per_second, self.dot_duration_seconds)
+                log.debug("Applied Fire DoT: %.1f dmg/sec for %s sec.", self.dot_damage_per_second, self.dot_duration_seconds)
             self.is_active = False # Fire projectile disappears on hit
         elif self.projectile_type == 'minigun': # Added handling for minigun
-             if self.target and not self.target.is_dead:
-                 self.target.take_damage(self.base_damage)
+             if target and not target.is_dead:
+                 target.take_damage(self.base_damage)
              self.is_active = False # Minigun projectile disappears on hit
 
     def draw(self, screen):
+        draw_now(screen, self)
+
+    def queue_draw(self, queue):
         if not self.is_active: return
 
-        if self.explosion_timer > 0 and self.explosion_pos: # Draw explosion visual
-            progress = 1.0 - (self.explosion_timer / self.explosion_duration)
-            current_radius = int(self.aoe_radius * progress)
-            alpha = int(200 * (1.0 - progress)) # Fade out
-            if current_radius > 0 and alpha > 0:
-                # Draw expanding orange circle
-                explosion_surf = pygame.Surface((current_radius*2, current_radius*2), pygame.SRCALPHA)
-                pygame.draw.circle(explosion_surf, (255, 150, 0, alpha), (current_radius, current_radius), current_radius)
-                screen.blit(explosion_surf, self.explosion_pos - pygame.Vector2(current_radius, current_radius))
-
-        elif self.image: # Draw projectile image if not exploding
-            screen.blit(self.image, self.rect)
-        elif self.projectile_type != 'bomb': # Fallback draw if no image and not bomb explosion
-            pygame.draw.rect(screen, (255, 255, 0), self.rect) 
\ No newline at end of file
+        if self.image:
+            queue.push('projectiles', self.image, self.rect.topleft)
+        else: # Fallback draw if no image
+            queue.push('projectiles', sprite_cache.solid(self.rect.width, self.rect.height, (255, 255, 0)), self.rect.topleft)
+
+class ProjectilePool:
+    """Fixed-capacity free list of Projectile instances.
+
+    Towers acquire() a recycled projectile instead of constructing one, and
+    the simulation release()s it when it deactivates. Both are O(1). When the
+    free list is empty a new instance is built and counted as a miss.
+    """
+
+    def __init__(self, capacity=DEFAULT_POOL_CAPACITY):
+        self.capacity = capacity
+        self._free = []
+        for _ in range(capacity):
+            projectile = Projectile.__new__(Projectile)
+            projectile.rect = pygame.Rect(0, 0, 4, 4)
+            self._free.append(projectile)
+        self.acquired = 0
+        self.released = 0
+        self.misses = 0 # Acquires that found the free list empty
+        self.dropped = 0 # Releases that found the free list full
+
+    def acquire(self, start_x, start_y, target_enemy, damage, image=None, **kwargs):
+        if self._free:
+            projectile = self._free.pop()
+            projectile.reset(start_x, start_y, target_enemy, damage, image, **kwargs)
+        else:
+            self.misses += 1
+            projectile = Projectile(start_x, start_y, target_enemy, damage, image, **kwargs)
+        self.acquired += 1
+        return projectile
+
+    def release(self, projectile):
+        self.released += 1
+        # Drop references so a pooled instance doesn't keep enemies or towers alive
+        projectile.target_pool = None
+        projectile.target_handle = None
+        projectile.tower_ref = None
+        if len(self._free) < self.capacity:
+            self._free.append(projectile)
+        else:
+            self.dropped += 1
+
+    def stats(self):
+        """Returns pool size and usage counters."""
+        return {
+            'capacity': self.capacity,
+            'free': len(self._free),
+            'in_use': self.acquired - self.released,
+            'acquired': self.acquired,
+            'misses': self.misses,
+            'dropped': self.dropped,
+        }
@@ -0,0 +1,55 @@
+# Draw order, back to front
+LAYERS = ('towers', 'enemies', 'health_bars', 'projectiles', 'effects')
+
+class RenderQueue:
+    """Collects sprite blits per layer and draws each layer with one Surface.blits call.
+
+    Entities push (surface, dest) or (surface, dest, area) entries through
+    their queue_draw methods instead of blitting one by one; flush() then
+    hands every layer to SDL in a single call, in LAYERS order, and empties
+    the queue so it can be refilled next frame. Within a layer, entries keep
+    the order they were pushed in.
+    """
+
+    def __init__(self, layers=LAYERS):
+        self.layers = {name: [] for name in layers}
+        self.queued = 0 # Entries pushed since the last flush
+
+    def push(self, layer, surface, dest, area=None):
+        entries = self.layers[layer]
+        entries.append((surface, dest) if area is None else (surface, dest, area))
+        self.queued += 1
+
+    def extend(self, layer, entries):
+        """Pushes several (surface, dest[, area]) entries at once."""
+        entries = list(entries)
+        self.layers[layer].extend(entries)
+        self.queued += len(entries)
+
+    def flush(self, screen, rects=None):
+        """Draws and clears every layer; returns the number of entries drawn.
+
+        If rects is a list, the screen area each entry covered is appended to
+        it (for DirtyRectRenderer).
+        """
+        drawn = self.queued
+        for entries in self.layers.values():
+            if entries:
+                if rects is None:
+                    screen.blits(entries, doreturn=False)
+                else:
+                    rects.extend(screen.blits(entries))
+                entries.clear()
+        self.queued = 0
+        return drawn
+
+    def clear(self):
+        for entries in self.layers.values():
+            entries.clear()
+        self.queued = 0
+
+def draw_now(screen, entity, *args):
+    """Draws a single entity right away through its queue_draw method."""
+    queue = RenderQueue()
+    entity.queue_draw(queue, *args)
+    queue.flush(screen)
@@ -0,0 +1,137 @@
+import argparse
+import json
+import logging
+import sys
+import time
+from simulation import Simulation, make_placeholder_images
+from profiling import WaveProfiler, parse_wave_range
+from memory_tracker import MemoryTracker, MemoryGrowthError
+from game_log import get_logger, configure_logging, shutdown_logging
+
+log = get_logger('replay')
+
+REPLAY_VERSION = 1
+
+class Replay:
+    """Everything needed to rerun a game exactly: seed, settings and player commands.
+
+    The simulation is deterministic given its seed, so the commands (each
+    stamped with the tick it was issued on) are the only other input.
+    """
+
+    def __init__(self, seed, difficulty, width, playable_height, sprite_sizes, commands, end_tick):
+        self.seed = seed
+        self.difficulty = difficulty
+        self.width = width
+        self.playable_height = playable_height
+        self.sprite_sizes = sprite_sizes # Placement spacing depends on the tower sprite width
+        self.commands = commands # [tick, command, *args]
+        self.end_tick = end_tick
+
+    @classmethod
+    def from_simulation(cls, sim):
+        sprite_sizes = {key: list(image.get_size()) for key, image in sim.images.items()}
+        return cls(sim.seed, sim.difficulty, sim.width, sim.playable_height, sprite_sizes,
+                   [list(entry) for entry in sim.command_log], sim.tick_count)
+
+    def save(self, filename):
+        data = {
+            'version': REPLAY_VERSION,
+            'seed': self.seed,
+            'difficulty': self.difficulty,
+            'width': self.width,
+            'playable_height': self.playable_height,
+            'sprite_sizes': self.sprite_sizes,
+            'end_tick': self.end_tick,
+            'commands': self.commands,
+        }
+        with open(filename, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        log.info("Saved replay (%d commands, %d ticks) to %s", len(self.commands), self.end_tick, filename)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename) as f:
+            data = json.load(f)
+        if data.get('version') != REPLAY_VERSION:
+            raise ValueError(f"Unsupported replay version: {data.get('version')}")
+        return cls(data['seed'], data['difficulty'], data['width'], data['playable_height'],
+                   data['sprite_sizes'], data['commands'], data['end_tick'])
+
+def _apply_command(sim, command, args):
+    if command == 'place':
+        sim.place_tower(*args)
+    elif command == 'upgrade':
+        sim.upgrade_tower(sim.towers[args[0]], args[1])
+    elif command == 'sell':
+        sim.sell_tower(sim.towers[args[0]])
+    elif command == 'speed':
+        sim.set_time_scale(args[0])
+    else:
+        raise ValueError(f"Unknown replay command: {command}")
+
+def _run_to(sim, tick, on_tick):
+    if on_tick is None:
+        sim.step(tick - sim.tick_count)
+        return
+    while sim.tick_count < tick and sim.step(1):
+        on_tick(sim)
+
+def play_replay(replay, until_tick=None, on_tick=None, on_start=None):
+    """Reruns a replay headlessly, as fast as the CPU allows. Returns the finished Simulation.
+
+    Nothing is rendered and time_scale only matters for the commands that
+    depend on it; ticks are stepped directly up to each command's tick.
+    until_tick may lie past the end of the recording, to keep the game
+    running without further commands (e.g. for long soak runs).
+    on_start(sim) is called once before the first tick (e.g. MemoryTracker.attach);
+    on_tick(sim), if given, after every tick (e.g. WaveProfiler.update).
+    """
+    end_tick = replay.end_tick if until_tick is None else until_tick
+    sim = Simulation(replay.difficulty, images=make_placeholder_images(replay.sprite_sizes),
+                     width=replay.width, playable_height=replay.playable_height, seed=replay.seed)
+    if on_start: on_start(sim)
+    for tick, command, *args in replay.commands:
+        if tick > end_tick: break
+        _run_to(sim, tick, on_tick)
+        _apply_command(sim, command, args)
+    _run_to(sim, end_tick, on_tick)
+    return sim
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replays a recorded game headlessly at full speed.")
+    parser.add_argument('replay', help="Replay file written by the game (e.g. replays/last_game.json)")
+    parser.add_argument('--until-tick', type=int, default=None, help="Stop at this tick instead of the end of the recording (may be later)")
+    parser.add_argument('--profile-waves', type=parse_wave_range, default=None, metavar='FIRST[-LAST]',
+                        help="cProfile this wave range and write the results to profiles/")
+    parser.add_argument('--track-memory', metavar='CSV', default=None,
+                        help="Snapshot tracemalloc at every wave start and write per-wave retained sizes to CSV")
+    parser.add_argument('--max-growth-kb', type=float, default=None,
+                        help="With --track-memory: fail (exit code 1) as soon as a wave grows retained memory by more than this")
+    options = parser.parse_args()
+
+    # Per-wave and per-command chatter off; replay, profiling and memory reports on
+    configure_logging({'waves': logging.WARNING, 'tower': logging.WARNING, 'placement': logging.WARNING})
+    replay = Replay.load(options.replay)
+    profiler = WaveProfiler(*options.profile_waves) if options.profile_waves else None
+    tracker = None
+    if options.track_memory:
+        max_growth = options.max_growth_kb * 1024 if options.max_growth_kb is not None else None
+        tracker = MemoryTracker(options.track_memory, max_growth_bytes=max_growth, fail_fast=True)
+    start = time.perf_counter()
+    try:
+        sim = play_replay(replay, options.until_tick, on_tick=profiler.update if profiler else None,
+                          on_start=tracker.attach if tracker else None)
+    except MemoryGrowthError as e:
+        shutdown_logging()
+        print(f"FAILED: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    if profiler:
+        profiler.stop(sim) # Range still open when the recording ended
+        for capture in profiler.captures:
+            print(f"Profile: {capture['summary']}")
+    print(f"Seed {replay.seed} ({replay.difficulty}): wave {sim.wave_number}, health {sim.player_health}, "
+          f"gold {sim.player_gold}, score {sim.score}, game over: {sim.is_game_over}")
+    print(f"{sim.tick_count} ticks in {elapsed:.2f}s ({sim.tick_count / max(elapsed, 1e-9):.0f} ticks/s)")
+    shutdown_logging()
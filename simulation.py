@@ -0,0 +1,406 @@
+import random
+import time
+import pygame
+from tower import Tower
+from enemy import Enemy
+from enemy_pool import EnemyPool
+from map import get_path, Path
+from spatial_hash import SpatialHash
+from targeting import select_targets, select_targets_by_coverage, ProgressIndex
+from tower_scheduler import TowerScheduler
+from projectile import ProjectilePool
+from effects import EffectsLayer
+from arena import Arena
+from game_log import get_logger
+
+wave_log = get_logger('waves')
+tower_log = get_logger('tower')
+placement_log = get_logger('placement')
+enemy_log = get_logger('enemy')
+
+# --- Simulation Constants ---
+FPS = 60 # Simulation ticks per second of game time at 1x
+BASE_GAME_SPEED = 5.0 # Fixed step size: movement/cooldown units advanced per tick
+MIN_TIME_SCALE = 1.0
+MAX_TIME_SCALE = 16.0
+MAX_SUBSTEPS_PER_FRAME = 32 # Cap on ticks run per advance() call (2 frames' worth at 16x)
+
+# Default playfield (matches the front end's screen minus the bottom bar)
+DEFAULT_WIDTH = 1920
+DEFAULT_PLAYABLE_HEIGHT = 930
+
+# Wave Settings
+TIME_BETWEEN_WAVES = 5 * FPS
+SPAWN_INTERVAL_WITHIN_GROUP = 0.4 * FPS # Time between enemies in a group (seconds * FPS)
+GROUP_SIZE = 4 # Number of enemies per small group
+TIME_BETWEEN_GROUPS = 1.5 * FPS # Pause between groups (seconds * FPS)
+
+# Tick phases timed into Simulation.phase_ns
+SIM_PHASES = ('waves', 'enemies', 'towers', 'projectiles')
+
+# Targeting: 'coverage' bisects each tower's path intervals; 'matrix' tests every tower against every enemy
+TARGETING_MODES = ('coverage', 'matrix')
+
+STARTING_GOLD = 200
+DIFFICULTY_HEALTH = {'Easy': 20, 'Medium': 10, 'Hard': 5}
+
+PLACEHOLDER_SIZES = {'tower': (64, 64), 'projectile': (12, 12), 'raccoon': (60, 60), 'cat': (60, 60)}
+
+def make_placeholder_images(sizes=None):
+    """Builds plain surfaces sized like the real sprites, for running without a display."""
+    sizes = sizes or PLACEHOLDER_SIZES
+    return {key: pygame.Surface(size) for key, size in sizes.items()}
+
+def is_on_path(pos, path_segments, buffer=25): # Increased buffer slightly
+    mouse_pos_vec = pygame.Vector2(pos)
+    for i in range(len(path_segments) - 1):
+        p1 = pygame.Vector2(path_segments[i])
+        p2 = pygame.Vector2(path_segments[i+1])
+        # Simple bounding box check first
+        if not (min(p1.x, p2.x) - buffer <= mouse_pos_vec.x <= max(p1.x, p2.x) + buffer and
+                min(p1.y, p2.y) - buffer <= mouse_pos_vec.y <= max(p1.y, p2.y) + buffer):
+            continue
+        # Line segment distance check
+        d = p2 - p1
+        if d.length_squared() == 0:
+            if (mouse_pos_vec - p1).length_squared() < buffer**2:
+                return True
+            continue
+        t = ((mouse_pos_vec.x - p1.x) * d.x + (mouse_pos_vec.y - p1.y) * d.y) / d.length_squared()
+        t = max(0, min(1, t))
+        closest_point = p1 + t * d
+        if (mouse_pos_vec - closest_point).length_squared() < buffer**2:
+            return True
+    return False
+
+def is_placement_valid(new_pos_tuple, existing_towers, min_separation):
+    """Checks if a new tower position is far enough from existing towers."""
+    new_pos = pygame.Vector2(new_pos_tuple)
+    for tower in existing_towers:
+        dist_sq = new_pos.distance_squared_to(tower.rect.center)
+        if dist_sq < min_separation ** 2:
+            placement_log.debug("Placement failed: Too close to existing tower at %s. Dist sq: %.1f < Min sq: %.1f", tower.rect.center, dist_sq, min_separation**2)
+            return False # Too close
+    return True # Position is valid
+
+class Simulation:
+    """Owns all game state (towers, enemies, projectiles, gold, health, waves).
+
+    Needs no display: the pygame front end only turns input into the command
+    methods below and draws the state after each step().
+    """
+
+    def __init__(self, difficulty='Easy', images=None, width=DEFAULT_WIDTH, playable_height=DEFAULT_PLAYABLE_HEIGHT,
+                 max_substeps=MAX_SUBSTEPS_PER_FRAME, seed=None, targeting='coverage'):
+        if targeting not in TARGETING_MODES:
+            raise ValueError(f"Unknown targeting mode: {targeting}")
+        self.difficulty = difficulty
+        self.targeting = targeting
+        self.images = images if images is not None else make_placeholder_images()
+        self.width = width
+        self.playable_height = playable_height
+
+        # All game randomness (path layout, enemy types) comes from this one seeded RNG
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.command_log = [] # [tick, command, *args] for every player command, for replays
+
+        self.path = Path(get_path(width, playable_height, rng=self.rng))
+        self.towers = []
+        self.tower_scheduler = TowerScheduler(self.path, BASE_GAME_SPEED) # Which towers need targeting each tick
+        self.enemies = EnemyPool(self.path) # List-like; iterates Enemy views
+        self.projectiles = Arena() # List-like; finished projectiles are removed in one ordered pass
+        self.projectile_pool = ProjectilePool()
+        self.effects = EffectsLayer() # Explosions outlive the projectile that caused them
+        self.enemy_grid = SpatialHash() # Rebuilt by the first bomb impact after enemies move
+        self.player_gold = STARTING_GOLD
+        self.player_health = DIFFICULTY_HEALTH.get(difficulty, 20) # Default to 20 if key missing
+        self.score = 0
+        self.time_scale = 1.0
+        self.tick_count = 0
+        self.max_substeps = max_substeps
+        self.accumulator = 0.0 # Ticks owed but not yet run (fractional)
+        self.dropped_ticks = 0 # Ticks skipped because advance() hit max_substeps
+        self.phase_ns = dict.fromkeys(SIM_PHASES, 0) # Time spent per tick phase; callers read and reset it
+        # Running totals, for per-frame deltas (see flight_recorder.py)
+        self.enemies_spawned_total = 0
+        self.enemies_killed_total = 0
+        self.enemies_leaked_total = 0
+        self.is_game_over = False
+
+        # Wave state
+        self.wave_number = 0 # Start at wave 0, will increment to 1 immediately
+        self.enemies_to_spawn_this_wave = 0
+        self.enemies_spawned_this_wave = 0
+        self.wave_timer = 0
+        self.spawn_timer = 0
+        self.enemies_spawned_this_group = 0
+        self.is_waiting_between_groups = False
+        self.boss_wave_incoming = False # Flag for boss warning UI
+        self.wave_listeners = [] # Called with the simulation after each start_next_wave()
+
+        self.start_next_wave() # Prepare the first wave
+
+    @property
+    def is_wave_in_progress(self):
+        return self.enemies_spawned_this_wave < self.enemies_to_spawn_this_wave or len(self.enemies) > 0
+
+    # --- Commands --- #
+    def _record(self, command, *args):
+        self.command_log.append([self.tick_count, command, *args])
+
+    def set_time_scale(self, time_scale):
+        self._record('speed', time_scale)
+        self.time_scale = max(MIN_TIME_SCALE, min(time_scale, MAX_TIME_SCALE))
+
+    def get_placement_problems(self, pos, tower_type='basic'):
+        """Returns the reasons a tower can't be placed at pos (empty list if valid)."""
+        reason = []
+        cost = Tower.BASE_STATS.get(tower_type, Tower.BASE_STATS['basic'])['cost']
+        min_tower_separation = self.images['tower'].get_width() * 0.75 # Min dist based on tower width
+        if self.player_gold < cost: reason.append("insufficient gold")
+        if is_on_path(pos, self.path): reason.append("on path")
+        if not is_placement_valid(pos, self.towers, min_tower_separation): reason.append("too close to another tower")
+        return reason
+
+    def place_tower(self, x, y, tower_type='basic'):
+        """Builds a tower if the spot is valid and affordable. Returns the tower or None."""
+        self._record('place', x, y, tower_type)
+        reason = self.get_placement_problems((x, y), tower_type)
+        if reason:
+            placement_log.info("Cannot place tower here (%s).", ', '.join(reason))
+            return None
+        tower = Tower(x, y, self.images['tower'], tower_type)
+        self.towers.append(tower)
+        self.tower_scheduler.add(tower)
+        self.player_gold -= tower.cost
+        return tower
+
+    def upgrade_tower(self, tower, stat_type):
+        """Upgrades one stat path of a tower if affordable. Returns True on success."""
+        self._record('upgrade', self.towers.index(tower), stat_type)
+        cost = tower.get_upgrade_cost(stat_type)
+        # cost >= 0 means it's possible and not max/locked
+        if cost == -1:
+            tower_log.info("Already at max level!")
+            return False
+        if cost == -2:
+            tower_log.info("Cannot upgrade %s: Locked by specialization!", stat_type)
+            return False
+        if self.player_gold < cost:
+            tower_log.info("Not enough gold!")
+            return False
+        success, actual_cost = tower.upgrade(stat_type)
+        if success:
+            self.tower_scheduler.refresh(tower) # Range may have changed
+            self.player_gold -= actual_cost
+            tower_log.info("Upgraded %s! Gold left: %d", stat_type, self.player_gold)
+        return success
+
+    def sell_tower(self, tower):
+        """Removes a tower and refunds its sell value. Returns the gold refunded."""
+        self._record('sell', self.towers.index(tower))
+        sell_value = tower.get_sell_value()
+        self.player_gold += sell_value
+        self.towers.remove(tower)
+        self.tower_scheduler.remove(tower)
+        tower_log.info("Sold tower for $%d. Gold: %d", sell_value, self.player_gold)
+        return sell_value
+
+    # --- Waves --- #
+    def start_next_wave(self):
+        """Sets up variables for the next wave and awards end-of-wave gold."""
+        # Award gold for completing the previous wave (if wave_number > 0)
+        if self.wave_number > 0:
+            end_of_wave_bonus = 50
+            # Boss wave bonus?
+            if self.wave_number % 10 == 0:
+                end_of_wave_bonus *= 3 # Triple bonus for boss waves
+            self.player_gold += end_of_wave_bonus
+            wave_log.info("Wave %d cleared! +$%d gold.", self.wave_number, end_of_wave_bonus)
+
+        # Prepare next wave
+        self.wave_number += 1
+        wave_log.info("--- Preparing Wave %d ---", self.wave_number)
+
+        # --- Check for Boss Wave --- #
+        if self.wave_number % 10 == 0:
+            self.enemies_to_spawn_this_wave = 1 # Only one boss enemy
+            wave_log.info("BOSS WAVE %d! Prepare for a tough fight!", self.wave_number)
+        else:
+            # Standard wave enemy count
+            base_enemy_count = 5 + self.wave_number * 2
+            # Double enemies after wave 20
+            if self.wave_number > 20:
+                self.enemies_to_spawn_this_wave = base_enemy_count * 2
+                wave_log.info("(Post-Wave 20 Double Spawn!)")
+            else:
+                self.enemies_to_spawn_this_wave = base_enemy_count
+            wave_log.debug("Calculated enemies for wave %d: %d", self.wave_number, self.enemies_to_spawn_this_wave)
+        # --- End Boss Wave Check ---
+
+        self.enemies_spawned_this_wave = 0
+        # Wave timer uses the base time, counted down once per tick between waves
+        self.wave_timer = TIME_BETWEEN_WAVES
+        self.spawn_timer = SPAWN_INTERVAL_WITHIN_GROUP # Time until first enemy of first group
+        # Reset group spawn state for the new wave
+        self.enemies_spawned_this_group = 0
+        self.is_waiting_between_groups = False
+        wave_log.debug("New wave setup: wave_timer=%s, spawn_timer=%s", self.wave_timer, self.spawn_timer)
+        for listener in self.wave_listeners:
+            listener(self)
+
+    def _spawn_enemy(self):
+        """Creates one enemy for the current wave (a boss cat on every 10th wave)."""
+        if self.wave_number % 10 == 0: # Boss Wave (still only 1 total)
+            num_previous_boss_waves = max(0, (self.wave_number // 10) - 1)
+            dynamic_health_multiplier = 10.0 * (1.05 ** num_previous_boss_waves)
+            if self.difficulty == 'Medium': dynamic_health_multiplier *= 1.3
+            elif self.difficulty == 'Hard': dynamic_health_multiplier *= 1.5
+            Enemy(self.path, self.wave_number, self.images['cat'], enemy_type='cat', scale=2.0, health_multiplier=dynamic_health_multiplier, pool=self.enemies)
+            wave_log.info("Boss Cat Spawned! (Wave %d, Health Multi: %.2fx, Difficulty: %s)", self.wave_number, dynamic_health_multiplier, self.difficulty)
+        else: # Regular Wave
+            enemy_type = 'raccoon' if self.rng.random() < 0.7 else 'cat'
+            Enemy(self.path, self.wave_number, self.images[enemy_type], enemy_type=enemy_type, pool=self.enemies)
+
+    def _update_waves(self, effective_time_scale):
+        if self.enemies_spawned_this_wave < self.enemies_to_spawn_this_wave:
+            self.spawn_timer -= effective_time_scale # Countdown timer
+
+            if self.spawn_timer <= 0:
+                if self.is_waiting_between_groups:
+                    # Finished waiting, start next group
+                    self.is_waiting_between_groups = False
+                    self.enemies_spawned_this_group = 0
+                    # Set timer for the first enemy of this new group
+                    self.spawn_timer = SPAWN_INTERVAL_WITHIN_GROUP
+                else:
+                    # Spawn one enemy (within a group)
+                    self._spawn_enemy()
+                    self.enemies_spawned_total += 1
+                    self.enemies_spawned_this_wave += 1
+                    self.enemies_spawned_this_group += 1
+
+                    # Check if wave is fully spawned
+                    if self.enemies_spawned_this_wave >= self.enemies_to_spawn_this_wave:
+                        self.spawn_timer = float('inf') # Stop spawning
+                    # Check if current group is finished
+                    elif self.enemies_spawned_this_group >= GROUP_SIZE:
+                        self.is_waiting_between_groups = True
+                        self.spawn_timer = TIME_BETWEEN_GROUPS # Set wait time for next group
+                    else:
+                        # Continue current group
+                        self.spawn_timer = SPAWN_INTERVAL_WITHIN_GROUP # Timer for next enemy in group
+
+        elif len(self.enemies) == 0:
+            wave_log.debug("Between waves: wave_timer = %.1f", self.wave_timer)
+            # --- Boss Warning Check (before timer runs out) ---
+            if self.wave_timer > 0:
+                self.boss_wave_incoming = (self.wave_number + 1) % 10 == 0
+
+            # Ticks run time_scale times as often, so this keeps the pause the same length in real time
+            self.wave_timer -= 1 / self.time_scale
+            if self.wave_timer <= 0:
+                wave_log.debug("Wave timer reached zero, calling start_next_wave()")
+                self.start_next_wave()
+                self.boss_wave_incoming = False # Reset flag AFTER starting the next wave
+
+    # --- Ticking --- #
+    def step(self, n_ticks=1):
+        """Advances the simulation by n_ticks. Returns the number of ticks actually run."""
+        ticks_run = 0
+        while ticks_run < n_ticks and not self.is_game_over:
+            self._tick()
+            ticks_run += 1
+        return ticks_run
+
+    def advance(self, elapsed_seconds):
+        """Runs the fixed ticks owed for elapsed_seconds of real time at the current time_scale.
+
+        Time accumulates at FPS * time_scale ticks per second; whole ticks are
+        run and the fraction carries over to the next call. At most
+        max_substeps ticks run per call. Anything beyond that is dropped (and
+        counted in dropped_ticks), so a slow frame can't snowball into ever
+        longer catch-up frames. Returns the number of ticks run.
+        """
+        self.accumulator += elapsed_seconds * FPS * self.time_scale
+        owed = int(self.accumulator)
+        ticks_run = self.step(min(owed, self.max_substeps))
+        if owed > self.max_substeps:
+            self.dropped_ticks += owed - self.max_substeps
+        self.accumulator -= owed # Keep only the fractional part
+        return ticks_run
+
+    def _tick(self):
+        # Every tick is the same size; time_scale changes how many run per frame (see advance)
+        effective_time_scale = BASE_GAME_SPEED
+        self.tick_count += 1
+
+        phase_ns = self.phase_ns
+        clock = time.perf_counter_ns
+        start = clock()
+
+        # Wave Management (apply effective time scale)
+        self._update_waves(effective_time_scale)
+        now = clock(); phase_ns['waves'] += now - start; start = now
+        self._update_enemies(effective_time_scale)
+        now = clock(); phase_ns['enemies'] += now - start; start = now
+
+        # Check for Game Over
+        if self.player_health <= 0:
+            self.is_game_over = True
+            return
+
+        self._update_towers(effective_time_scale)
+        now = clock(); phase_ns['towers'] += now - start; start = now
+        self._update_projectiles(effective_time_scale)
+        phase_ns['projectiles'] += clock() - start
+
+    def reset_phase_times(self):
+        """Returns phase_ns and starts a fresh one."""
+        phase_ns = self.phase_ns
+        self.phase_ns = dict.fromkeys(SIM_PHASES, 0)
+        return phase_ns
+
+    # --- Tick phases --- #
+    def _update_enemies(self, effective_time_scale):
+        # One vectorized pass moves, burns and removes them
+        # Ticks run time_scale times as often, so the hit flash counts down 1 / time_scale per tick
+        for enemy, reached_end in self.enemies.update(effective_time_scale, 1 / self.time_scale):
+            if reached_end:
+                self.player_health -= 1
+                self.enemies_leaked_total += 1
+            enemy_log.debug("Removing defeated enemy: %s", enemy.enemy_type)
+            if not reached_end:
+                self.enemies_killed_total += 1
+                self.player_gold += enemy.reward
+                self.score += enemy.points_value
+        # Enemies don't move again this tick; the first bomb impact rebuilds the grid for all AoE queries
+        self.enemy_grid.mark_stale(self.enemies)
+
+    def _update_towers(self, effective_time_scale):
+        # Only ready towers with an enemy near their stretch of path get a (batched) targeting pass
+        progress = ProgressIndex(self.enemies) # Live enemies by path progress, shared by both steps
+        ready_towers = self.tower_scheduler.ready_towers(self.tick_count, progress)
+        if self.targeting == 'coverage':
+            targets = select_targets_by_coverage(ready_towers, self.enemies, progress)
+        else:
+            targets = select_targets(ready_towers, self.enemies)
+        for tower, target in zip(ready_towers, targets):
+            if target is not None:
+                tower.fire(target, self.projectiles, self.images['projectile'], self.projectile_pool)
+                self.tower_scheduler.fired(tower, self.tick_count)
+
+    def _update_projectiles(self, effective_time_scale):
+        self.effects.update(effective_time_scale) # Before impacts, so new explosions start at age 0
+        # Move every projectile in firing order, then drop the finished ones in one
+        # pass that keeps that order (the order impacts land in affects outcomes)
+        finished = []
+        for proj in self.projectiles:
+            proj.move(effective_time_scale, enemies_list=self.enemies, enemy_grid=self.enemy_grid, effects=self.effects)
+            if not proj.is_active:
+                finished.append(proj)
+        if finished:
+            self.projectiles.remove_many(finished)
+            for proj in finished:
+                self.projectile_pool.release(proj)
@@ -0,0 +1,63 @@
+DEFAULT_CELL_SIZE = 128 # Pixels; close to the smallest tower range so queries touch ~9-16 cells
+
+class SpatialHash:
+    """Uniform grid of enemy positions, built on demand at most once per tick.
+
+    Range checks (bomb AoE) only look at the cells their circle overlaps
+    instead of scanning every enemy. mark_stale() is called whenever enemies
+    move; the cells are then rebuilt by the first query_radius(), so a tick
+    without a bomb impact never pays for bucketing every enemy.
+    """
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {} # (cell_x, cell_y) -> list of indices into self.enemies
+        self.enemies = []
+        self._stale = False
+        self.rebuilds = 0
+
+    def mark_stale(self, enemies):
+        """Points the grid at enemies, whose positions changed; the next query rebuilds it."""
+        self.enemies = enemies
+        self._stale = True
+
+    def rebuild(self, enemies):
+        """Re-buckets every enemy by its rect center."""
+        cells = {}
+        cell_size = self.cell_size
+        for index, enemy in enumerate(enemies):
+            x, y = enemy.rect.center
+            key = (x // cell_size, y // cell_size)
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [index]
+            else:
+                bucket.append(index)
+        self.cells = cells
+        self.enemies = enemies
+        self._stale = False
+        self.rebuilds += 1
+
+    def query_radius(self, x, y, radius):
+        """Returns enemies whose center is within radius of (x, y), in the order they were added."""
+        if self._stale:
+            self.rebuild(self.enemies)
+        cell_size = self.cell_size
+        min_cx, max_cx = int((x - radius) // cell_size), int((x + radius) // cell_size)
+        min_cy, max_cy = int((y - radius) // cell_size), int((y + radius) // cell_size)
+        radius_sq = radius * radius
+        cells = self.cells
+        enemies = self.enemies
+
+        found = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = cells.get((cx, cy))
+                if not bucket: continue
+                for index in bucket:
+                    ex, ey = enemies[index].rect.center
+                    if (ex - x) ** 2 + (ey - y) ** 2 <= radius_sq:
+                        found.append(index)
+        # Keep list order so callers pick the same enemy a full scan would on ties
+        found.sort()
+        return [enemies[index] for index in found]
@@ -0,0 +1,59 @@
+import pygame
+from lru import LRUCache
+
+DEFAULT_MAX_ENTRIES = 256 # A few tints per sprite, headbands and preview circles; far fewer are live at once
+
+class SpriteCache(LRUCache):
+    """Bounded LRU cache of derived sprite surfaces (tinted copies, headbands, range circles).
+
+    Each variant is built once from its key and shared afterwards, so
+    drawing a burning enemy or the build preview no longer copies and
+    fills a surface every frame. Keys hold the base surface itself (not
+    its id), which keeps it alive while cached and can't collide with a
+    newer surface reusing the id. The returned surfaces are shared;
+    callers must not draw onto them.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        super().__init__(max_entries)
+
+    def tinted(self, image, color):
+        """image multiplied by an RGBA color (BLEND_RGBA_MULT), as used for burn/flash/preview tints."""
+        color = tuple(color)
+        def build():
+            surface = image.copy()
+            surface.fill(color, special_flags=pygame.BLEND_RGBA_MULT)
+            return surface
+        return self.get(('tint', image, color), build)
+
+    def solid(self, width, height, color):
+        """A plain filled rectangle (e.g. a health bar, drawn partially through a blit area)."""
+        color = tuple(color)
+        def build():
+            surface = pygame.Surface((width, height))
+            surface.fill(color)
+            return surface
+        return self.get(('solid', width, height, color), build)
+
+    def headband(self, width, height, color, border_color=(50, 50, 50), border_radius=2):
+        """A filled, outlined rounded rectangle on a transparent surface."""
+        color = tuple(color)
+        def build():
+            surface = pygame.Surface((width, height), pygame.SRCALPHA)
+            rect = surface.get_rect()
+            pygame.draw.rect(surface, color, rect, border_radius=border_radius)
+            pygame.draw.rect(surface, border_color, rect, 1, border_radius=border_radius)
+            return surface
+        return self.get(('headband', width, height, color), build)
+
+    def range_circle(self, radius, color):
+        """A filled circle of the given radius on a transparent (2 * radius)-wide surface."""
+        color = tuple(color)
+        def build():
+            surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, color, (radius, radius), radius)
+            return surface
+        return self.get(('circle', radius, color), build)
+
+# Shared cache for all sprite variants
+sprite_cache = SpriteCache()
@@ -0,0 +1,113 @@
+import numpy as np
+
+def _round_like_rect(values):
+    """Rounds half away from zero, the way pygame.Rect converts float centers."""
+    return np.trunc(values + np.copysign(0.5, values))
+
+class ProgressIndex:
+    """Live enemies ordered by path progress, furthest along first, built once per tick.
+
+    Ties keep pool order (the earlier enemy first), which is the targeting
+    tie-break. neg_distance is ascending, so distance ranges are found with
+    searchsorted.
+    """
+
+    def __init__(self, pool):
+        n = len(pool)
+        alive = np.flatnonzero(~pool.is_dead[:n])
+        distance = pool.distance[alive]
+        order = np.argsort(-distance, kind='stable')
+        self.indices = alive[order] # Pool indices
+        self.neg_distance = -distance[order]
+
+    def __len__(self):
+        return len(self.indices)
+
+    def count_between(self, starts, ends):
+        """Number of enemies with start <= distance <= end, for arrays of ranges."""
+        return (np.searchsorted(self.neg_distance, -starts, side='right')
+                - np.searchsorted(self.neg_distance, -ends, side='left'))
+
+    def first_between(self, starts, ends):
+        """Position (in this order) of the furthest enemy in each range; len(self) where there is none."""
+        neg = self.neg_distance
+        positions = np.searchsorted(neg, -ends, side='left')
+        found = positions < len(neg)
+        found[found] = neg[positions[found]] <= -starts[found]
+        return np.where(found, positions, len(neg))
+
+def select_targets(towers, pool):
+    """Picks a target for every tower in one array pass over the enemy pool.
+
+    Builds the tower x enemy squared-distance matrix, masks it by each
+    tower's range and takes the furthest-along enemy per row (ties go to
+    the earlier enemy in the pool).
+    Returns a list with one Enemy or None per tower.
+    """
+    n = len(pool)
+    if not towers or n == 0:
+        return [None] * len(towers)
+
+    tower_x = np.array([tower.rect.centerx for tower in towers], dtype=np.float64)
+    tower_y = np.array([tower.rect.centery for tower in towers], dtype=np.float64)
+    ranges = np.array([tower.range for tower in towers], dtype=np.float64)
+
+    # Range is measured between integer rect centers, as it always was
+    enemy_x = _round_like_rect(pool.float_x[:n])
+    enemy_y = _round_like_rect(pool.float_y[:n])
+    dist_sq = (tower_x[:, None] - enemy_x[None, :]) ** 2 + (tower_y[:, None] - enemy_y[None, :]) ** 2
+    in_range = (dist_sq <= (ranges ** 2)[:, None]) & ~pool.is_dead[:n][None, :]
+
+    # Furthest along wins; out-of-range enemies can never be picked
+    progress = np.where(in_range, pool.distance[:n][None, :], -np.inf)
+    best = np.argmax(progress, axis=1)
+    has_target = in_range[np.arange(len(towers)), best]
+
+    enemies = pool.enemies
+    return [enemies[index] if found else None for index, found in zip(best.tolist(), has_target.tolist())]
+
+def select_targets_by_coverage(towers, pool, progress):
+    """Same result as select_targets, but looks enemies up by path distance instead of testing them all.
+
+    Each tower carries coverage_intervals: the path-distance ranges within
+    its range, slightly widened (see TowerScheduler.refresh). The furthest
+    live enemy inside them is found by binary search in progress, then
+    checked with the exact rounded-center range test. That test can only
+    fail right at a range's edge, where the widening admits enemies that
+    are out of range; those few towers fall back to select_targets.
+    """
+    if not towers or len(progress) == 0:
+        return [None] * len(towers)
+
+    starts, ends, owners = [], [], []
+    for i, tower in enumerate(towers):
+        for start, end in tower.coverage_intervals:
+            starts.append(start)
+            ends.append(end)
+            owners.append(i)
+    targets = [None] * len(towers)
+    if not owners:
+        return targets
+
+    m = len(progress)
+    positions = progress.first_between(np.array(starts), np.array(ends))
+    best = np.full(len(towers), m)
+    np.minimum.at(best, np.array(owners), positions) # Furthest along across each tower's intervals
+    found = best < m
+    candidates = progress.indices[np.minimum(best, m - 1)]
+
+    tower_x = np.array([tower.rect.centerx for tower in towers], dtype=np.float64)
+    tower_y = np.array([tower.rect.centery for tower in towers], dtype=np.float64)
+    ranges = np.array([tower.range for tower in towers], dtype=np.float64)
+    dist_sq = ((tower_x - _round_like_rect(pool.float_x[candidates])) ** 2
+               + (tower_y - _round_like_rect(pool.float_y[candidates])) ** 2)
+    in_range = found & (dist_sq <= ranges ** 2)
+
+    enemies = pool.enemies
+    for i, (ok, index) in enumerate(zip(in_range.tolist(), candidates.tolist())):
+        if ok: targets[i] = enemies[index]
+    edge_cases = np.flatnonzero(found & ~in_range).tolist()
+    if edge_cases:
+        for i, target in zip(edge_cases, select_targets([towers[i] for i in edge_cases], pool)):
+            targets[i] = target
+    return targets
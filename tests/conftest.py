@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Modules live at the repo root; pygame needs no window for the simulation
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,49 @@
+from arena import Arena
+
+class Item:
+    def __init__(self, name):
+        self.name = name
+        self.handle = None
+
+def make_arena(count):
+    arena = Arena()
+    items = [Item(i) for i in range(count)]
+    handles = [arena.add(item) for item in items]
+    return arena, items, handles
+
+def test_handles_resolve_to_their_items():
+    arena, items, handles = make_arena(5)
+    for item, handle in zip(items, handles):
+        assert arena.get(handle) is item
+        assert item.handle == handle
+
+def test_stale_handle_resolves_to_none_after_remove():
+    arena, items, handles = make_arena(5)
+    arena.remove_many([items[1]])
+    assert arena.get(handles[1]) is None
+    assert items[1].handle is None
+    # The freed slot is reused with a new generation; the old handle stays dead
+    new_item = Item('new')
+    new_handle = arena.add(new_item)
+    assert new_handle[0] == handles[1][0]
+    assert arena.get(handles[1]) is None
+    assert arena.get(new_handle) is new_item
+
+def test_remove_many_matches_list_filter():
+    arena, items, handles = make_arena(10)
+    removed = [items[i] for i in (7, 0, 4, 5)]
+    expected = [item for item in items if item not in removed]
+    assert arena.remove_many(removed) == 0 # Everything from the first removed item shifted
+    assert list(arena) == expected
+    for item in expected:
+        assert arena.get(item.handle) is item
+    for i in (7, 0, 4, 5):
+        assert arena.get(handles[i]) is None
+
+def test_remove_many_keeps_shared_items_list():
+    arena, items, _ = make_arena(3)
+    shared = arena.items
+    assert arena.remove_many([]) == 3
+    assert arena.remove_many([items[1]]) == 1
+    assert shared is arena.items
+    assert shared == [items[0], items[2]]
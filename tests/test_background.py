@@ -0,0 +1,24 @@
+import random
+import pygame
+from background import BackgroundCache
+from map import Path, get_path
+
+def make_cache():
+    return BackgroundCache(pygame.Surface((64, 64)), (1920, 1080), 930, (101, 67, 33))
+
+def test_game_layer_is_rebuilt_only_for_a_new_map():
+    cache = make_cache()
+    path = Path(get_path(rng=random.Random(1)))
+    layer = cache.game_layer(path)
+    assert cache.game_layer(path) is layer
+    assert cache.rebuilds == 1
+    cache.game_layer(Path(get_path(rng=random.Random(2))))
+    assert cache.rebuilds == 2
+
+def test_freed_path_is_not_mistaken_for_a_new_one():
+    cache = make_cache()
+    cache.game_layer(Path(get_path(rng=random.Random(1))))
+    # The first path is dropped before the next game builds its own, which may reuse its id
+    for seed in range(2, 6):
+        cache.game_layer(Path(get_path(rng=random.Random(seed))))
+        assert cache.rebuilds == seed
@@ -0,0 +1,114 @@
+import pygame
+import pytest
+from enemy import Enemy
+from enemy_pool import EnemyPool
+from map import Path
+
+TIME_SCALE = 5.0 # BASE_GAME_SPEED
+DT_SECONDS = TIME_SCALE / 60
+
+class OldEnemy:
+    """Per-enemy reference: the move/update_effects/die logic EnemyPool.update replaced."""
+
+    def __init__(self, enemy):
+        self.name = enemy.enemy_type
+        self.path = enemy.path
+        self.distance = enemy.distance
+        self.float_x, self.float_y = enemy.float_x, enemy.float_y
+        self.speed = enemy.speed
+        self.health = enemy.health
+        self.damage_taken_timer = enemy.damage_taken_timer
+        self.is_dead = bool(enemy.is_dead)
+        self.dot_effects = [(enemy.dot_dps, enemy.dot_remaining)] if enemy.dot_remaining > 0 else []
+
+    def update_effects(self, dt_seconds):
+        total = 0
+        remaining_effects = []
+        for dps, remaining in self.dot_effects:
+            total += dps * dt_seconds
+            if remaining - dt_seconds > 0:
+                remaining_effects.append((dps, remaining - dt_seconds))
+        self.dot_effects = remaining_effects
+        if total > 0:
+            self.health -= total
+            if self.health <= 0:
+                self.is_dead = True
+
+    def move(self, time_scale):
+        self.update_effects(time_scale / 60)
+        if self.is_dead: return False
+        if self.damage_taken_timer > 0:
+            self.damage_taken_timer -= 1
+        self.distance += self.speed * time_scale
+        reached_end = self.distance >= self.path.length
+        if reached_end:
+            self.distance = self.path.length
+        self.float_x, self.float_y = self.path.position_at(self.distance)
+        if reached_end:
+            self.is_dead = True
+            self.dot_effects = []
+        return reached_end
+
+def old_update(enemies, time_scale):
+    """The old simulation loop: move each enemy in list order and drop the dead ones."""
+    removed = []
+    for enemy in enemies[:]:
+        reached_end = enemy.move(time_scale)
+        if enemy.is_dead:
+            removed.append((enemy.name, reached_end))
+            enemies.remove(enemy)
+    return removed
+
+@pytest.fixture
+def pool_and_reference():
+    path = Path([(0, 0), (100, 0), (100, 100), (300, 100)])
+    pool = EnemyPool(path, capacity=2) # Grows while adding
+    image = pygame.Surface((30, 30))
+    def spawn(name, distance, health=None):
+        enemy = Enemy(path, 1, image, enemy_type=name, pool=pool)
+        enemy.distance = distance
+        enemy.float_x, enemy.float_y = path.position_at(distance)
+        if health is not None:
+            enemy.health = health
+        return enemy
+
+    spawn('walker', 0)
+    spawn('burning', 10, health=25).apply_dot(120, 2.0) # 10 damage per tick: dies on the third, like the two below
+    spawn('cornering', 95) # Crosses the (100, 0) waypoint on the second tick
+    spawn('warm', 40).apply_dot(12, 0.2) # Expires after three ticks without killing
+    spawn('leaker', path.length - 6) # Reaches the end on the third tick
+    flashing = spawn('flashing', 50)
+    flashing.take_damage(5)
+    spawn('late', 200, health=15).apply_dot(60, 5.0) # Burns to death on the leaker's tick
+    spawn('shot', 20).take_damage(1000) # Killed by a tower before the next update
+
+    reference = [OldEnemy(enemy) for enemy in pool]
+    return pool, reference
+
+def test_update_matches_per_enemy_semantics(pool_and_reference):
+    pool, reference = pool_and_reference
+    removals = []
+    for _ in range(12):
+        removed = [(enemy.enemy_type, reached_end) for enemy, reached_end in pool.update(TIME_SCALE)]
+        expected = old_update(reference, TIME_SCALE)
+        assert removed == expected
+        removals.extend(removed)
+        assert [enemy.enemy_type for enemy in pool] == [enemy.name for enemy in reference]
+        for enemy, old in zip(pool, reference):
+            assert enemy.health == pytest.approx(old.health)
+            assert enemy.distance == pytest.approx(old.distance)
+            assert (enemy.float_x, enemy.float_y) == pytest.approx((old.float_x, old.float_y))
+            assert enemy.damage_taken_timer == old.damage_taken_timer
+            assert enemy.is_burning == bool(old.dot_effects)
+    # A kill, then DoT deaths and a leak on one tick, removed in pool order
+    assert removals == [('shot', False), ('burning', False), ('leaker', True), ('late', False)]
+
+def test_removed_enemies_keep_their_last_values(pool_and_reference):
+    pool, _ = pool_and_reference
+    for _ in range(3):
+        for enemy, reached_end in pool.update(TIME_SCALE):
+            assert enemy.handle is None
+            assert pool.get(enemy.handle) is None
+            if reached_end:
+                assert enemy.distance == pool.path.length
+    assert [enemy.slot for enemy in pool] == list(range(len(pool)))
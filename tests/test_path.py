@@ -0,0 +1,48 @@
+import random
+import pytest
+from map import Path, get_path
+
+def walk_segments(waypoints, distance):
+    """Reference: walks the path one segment at a time, like enemies moved before the arc-length table."""
+    x, y = waypoints[0]
+    for (x1, y1), (x2, y2) in zip(waypoints, waypoints[1:]):
+        dx, dy = x2 - x1, y2 - y1
+        segment_length = (dx ** 2 + dy ** 2) ** 0.5
+        if distance <= segment_length:
+            if segment_length == 0:
+                return x1, y1
+            return x1 + dx * distance / segment_length, y1 + dy * distance / segment_length
+        distance -= segment_length
+        x, y = x2, y2
+    return x, y
+
+def make_path(seed):
+    return Path(get_path(rng=random.Random(seed)))
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_position_at_matches_segment_walk(seed):
+    path = make_path(seed)
+    rng = random.Random(seed)
+    distances = [rng.uniform(0, path.length) for _ in range(200)]
+    distances += list(path.cumulative_lengths) + [0.0, path.length, path.length + 50]
+    for distance in distances:
+        assert path.position_at(distance) == pytest.approx(walk_segments(path.waypoints, distance), abs=1e-6)
+
+def test_position_at_waypoints():
+    path = make_path(4)
+    for waypoint, distance in zip(path.waypoints, path.cumulative_lengths):
+        assert path.position_at(distance) == pytest.approx(waypoint, abs=1e-6)
+
+def test_zero_length_segment():
+    path = Path([(0, 0), (10, 0), (10, 0), (10, 5)])
+    assert path.length == 15
+    assert path.position_at(10) == pytest.approx((10, 0))
+    assert path.position_at(12) == pytest.approx((10, 2))
+
+def test_behaves_like_waypoint_list():
+    waypoints = [(0, 0), (3, 4), (3, 10)]
+    path = Path(waypoints)
+    assert len(path) == 3
+    assert path[1] == (3, 4)
+    assert list(path) == waypoints
+    assert path.length == 11
@@ -0,0 +1,20 @@
+from profiling import WaveProfiler
+from simulation import Simulation
+
+def play_through(profiler, sim, waves):
+    while sim.wave_number <= waves and not sim.is_game_over:
+        sim.start_next_wave() # Skip ahead; the profiler only watches wave_number
+        sim.step(1)
+        profiler.update(sim)
+
+def test_wave_range_is_captured_once_per_game(tmp_path):
+    profiler = WaveProfiler(2, 3, output_dir=str(tmp_path))
+    for game in range(1, 3):
+        profiler.start_game()
+        sim = Simulation(seed=game)
+        play_through(profiler, sim, 5)
+        play_through(profiler, sim, 5) # Still past the range: no second capture
+        assert not profiler.is_running
+        assert len(profiler.captures) == game
+    assert [capture['seed'] for capture in profiler.captures] == [1, 2]
+    assert [(capture['first_wave'], capture['last_wave']) for capture in profiler.captures] == [(2, 3), (2, 3)]
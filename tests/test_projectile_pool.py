@@ -0,0 +1,56 @@
+import pygame
+from enemy import Enemy
+from map import Path
+from projectile import Projectile, ProjectilePool
+from tower import Tower
+
+def make_enemy():
+    return Enemy(Path([(0, 0), (500, 0)]), 1, pygame.Surface((30, 30)))
+
+def test_acquire_after_release_reuses_the_instance():
+    pool = ProjectilePool(capacity=2)
+    first = pool.acquire(10, 20, make_enemy(), 15)
+    second = pool.acquire(10, 20, make_enemy(), 15)
+    pool.release(first)
+    again = pool.acquire(30, 40, make_enemy(), 25)
+    assert again is first
+    assert pool.misses == 0
+    assert pool.stats()['in_use'] == 2
+    # Nothing left to recycle: a fresh instance is built and counted
+    extra = pool.acquire(0, 0, None, 1)
+    assert extra is not first and extra is not second
+    assert isinstance(extra, Projectile)
+    assert pool.misses == 1
+
+def test_release_drops_references_and_acquire_resets_fields():
+    pool = ProjectilePool(capacity=4)
+    enemy = make_enemy()
+    tower = Tower(100, 100, pygame.Surface((64, 64)), 'bomb')
+    projectile = pool.acquire(100, 100, enemy, 30, projectile_type='bomb', aoe_radius=160, tower_ref=tower)
+    assert projectile.target_pool is enemy.pool
+    assert projectile.target_handle == enemy.handle
+    projectile.is_active = False
+    pool.release(projectile)
+    assert projectile.target_pool is None
+    assert projectile.target_handle is None
+    assert projectile.tower_ref is None
+
+    reused = pool.acquire(5, 6, None, 7)
+    assert reused is projectile
+    assert reused.target_pool is None and reused.target_handle is None
+    assert reused.is_active
+    assert (reused.float_x, reused.float_y, reused.damage) == (5, 6, 7)
+    assert (reused.projectile_type, reused.aoe_radius, reused.tower_ref) == ('basic', 0, None)
+    assert reused.rect.center == (5, 6)
+
+def test_removed_target_is_not_held():
+    enemy = make_enemy()
+    enemy.pool.arena.remove_many([enemy]) # Gone before the shot was fired
+    projectile = ProjectilePool().acquire(0, 0, enemy, 10)
+    assert projectile.target_pool is None and projectile.target_handle is None
+
+def test_release_past_capacity_is_dropped():
+    pool = ProjectilePool(capacity=1)
+    pool.release(Projectile(0, 0, None, 1))
+    assert pool.stats()['free'] == 1
+    assert pool.dropped == 1
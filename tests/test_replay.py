@@ -0,0 +1,65 @@
+import random
+from replay import Replay, play_replay
+from simulation import FPS, Simulation
+from tower import Tower
+
+def outcome(sim):
+    return (sim.wave_number, sim.player_health, sim.player_gold, sim.score, sim.tick_count)
+
+def play(sim, frames):
+    for _ in range(frames):
+        sim.advance(1 / FPS)
+
+def place_somewhere(sim, rng, tower_type):
+    """Waits for the gold, then places on a random valid spot (checked the way the build preview does)."""
+    while sim.player_gold < Tower.BASE_STATS[tower_type]['cost'] and not sim.is_game_over:
+        play(sim, 60)
+    assert not sim.is_game_over
+    while True:
+        pos = (rng.randint(50, 1870), rng.randint(50, 880))
+        if not sim.get_placement_problems(pos, tower_type):
+            return sim.place_tower(*pos, tower_type)
+
+def record_game(seed):
+    """Plays a short game through the front end's entry points: commands plus advance() at varying speed."""
+    sim = Simulation(seed=seed)
+    rng = random.Random(seed)
+    place_somewhere(sim, rng, 'basic')
+    place_somewhere(sim, rng, 'basic') # Spends the starting gold
+    play(sim, 300)
+    sim.set_time_scale(4)
+    play(sim, 300)
+    sim.upgrade_tower(sim.towers[0], 'damage')
+    sim.sell_tower(sim.towers[1])
+    place_somewhere(sim, rng, 'fire')
+    sim.place_tower(*sim.towers[0].rect.center, 'basic') # Rejected (too close), but still recorded
+    sim.set_time_scale(16)
+    play(sim, 200)
+    sim.set_time_scale(2)
+    sim.upgrade_tower(sim.towers[-1], 'duration')
+    play(sim, 200)
+    return sim
+
+def test_replay_round_trip_is_deterministic(tmp_path):
+    sim = record_game(11)
+    commands = {command for _, command, *_ in sim.command_log}
+    assert commands == {'place', 'upgrade', 'sell', 'speed'}
+
+    filename = tmp_path / 'game.json'
+    Replay.from_simulation(sim).save(filename)
+    replay = Replay.load(filename)
+    assert replay.commands == [list(entry) for entry in sim.command_log]
+
+    first = play_replay(replay)
+    second = play_replay(replay)
+    assert outcome(first) == outcome(second) == outcome(sim)
+    assert [tower.rect.center for tower in first.towers] == [tower.rect.center for tower in sim.towers]
+
+def test_replay_can_run_past_the_recording(tmp_path):
+    filename = tmp_path / 'game.json'
+    Replay.from_simulation(record_game(12)).save(filename)
+    replay = Replay.load(filename)
+    first = play_replay(replay, until_tick=replay.end_tick + 500)
+    second = play_replay(replay, until_tick=replay.end_tick + 500)
+    assert outcome(first) == outcome(second)
+    assert first.tick_count == replay.end_tick + 500 or first.is_game_over
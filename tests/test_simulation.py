@@ -0,0 +1,40 @@
+import pytest
+from simulation import FPS, MAX_SUBSTEPS_PER_FRAME, Simulation
+
+FRAME = 1 / FPS
+
+@pytest.mark.parametrize('time_scale', [1, 2, 4, 16])
+def test_advance_runs_time_scale_ticks_per_frame(time_scale):
+    sim = Simulation(seed=1)
+    sim.set_time_scale(time_scale)
+    for frame in range(1, 11):
+        assert sim.advance(FRAME) == time_scale
+        assert sim.tick_count == frame * time_scale
+    assert sim.dropped_ticks == 0
+
+def test_advance_carries_the_leftover_fraction():
+    sim = Simulation(seed=1)
+    sim.set_time_scale(1.5)
+    assert sim.advance(FRAME) == 1 # 1.5 owed, 0.5 carried
+    assert sim.accumulator == pytest.approx(0.5)
+    assert sim.advance(FRAME) == 2 # 0.5 + 1.5
+    assert sim.accumulator == pytest.approx(0.0)
+    sim.set_time_scale(1)
+    assert sim.advance(FRAME / 4) == 0 # Too short for a tick, but not lost
+    assert sim.advance(FRAME / 4) == 0
+    assert sim.advance(FRAME / 2) == 1
+    assert sim.tick_count == 4
+
+def test_advance_clamps_long_frames_and_counts_dropped_ticks():
+    sim = Simulation(seed=1)
+    assert sim.advance(10.0) == MAX_SUBSTEPS_PER_FRAME # A 10 s stall owes 600 ticks
+    assert sim.tick_count == MAX_SUBSTEPS_PER_FRAME
+    assert sim.dropped_ticks == 10 * FPS - MAX_SUBSTEPS_PER_FRAME
+    assert sim.accumulator == pytest.approx(0.0) # Dropped ticks aren't owed later
+    assert sim.advance(FRAME) == 1
+
+def test_advance_respects_max_substeps():
+    sim = Simulation(seed=1, max_substeps=4)
+    sim.set_time_scale(16)
+    assert sim.advance(FRAME) == 4
+    assert sim.dropped_ticks == 12
@@ -0,0 +1,29 @@
+import pygame
+from spatial_hash import SpatialHash
+
+class Dot:
+    def __init__(self, x, y):
+        self.rect = pygame.Rect(0, 0, 4, 4)
+        self.rect.center = (x, y)
+
+def test_query_matches_full_scan():
+    dots = [Dot(x, y) for x in range(0, 1000, 37) for y in range(0, 600, 41)]
+    grid = SpatialHash()
+    grid.mark_stale(dots)
+    for x, y, radius in [(500, 300, 160), (0, 0, 90), (990, 590, 300), (250, 40, 5)]:
+        expected = [dot for dot in dots if (dot.rect.centerx - x) ** 2 + (dot.rect.centery - y) ** 2 <= radius ** 2]
+        assert grid.query_radius(x, y, radius) == expected
+
+def test_rebuilds_only_when_queried_after_a_move():
+    dots = [Dot(10, 10), Dot(300, 300)]
+    grid = SpatialHash()
+    for _ in range(5):
+        grid.mark_stale(dots) # A tick with no bomb impact
+    assert grid.rebuilds == 0
+    assert grid.query_radius(10, 10, 20) == [dots[0]]
+    assert grid.query_radius(300, 300, 20) == [dots[1]]
+    assert grid.rebuilds == 1 # One rebuild serves every query until the next move
+    dots[0].rect.center = (300, 290)
+    grid.mark_stale(dots)
+    assert grid.query_radius(300, 300, 20) == dots
+    assert grid.rebuilds == 2
@@ -0,0 +1,35 @@
+import random
+from simulation import Simulation
+from targeting import ProgressIndex
+
+def place_towers(sim, count, rng):
+    while len(sim.towers) < count:
+        sim.player_gold = 10 ** 6
+        sim.place_tower(rng.randint(50, 1870), rng.randint(50, 880))
+
+def test_sold_towers_free_their_slots():
+    sim = Simulation(seed=1)
+    rng = random.Random(1)
+    scheduler = sim.tower_scheduler
+    for _ in range(10):
+        place_towers(sim, 8, rng)
+        sim.step(50) # Let some towers fire, so their slots sit in the reload heap
+        for tower in rng.sample(sim.towers, 3):
+            sim.sell_tower(tower)
+            assert tower.scheduler_slot is None
+        assert scheduler.towers == sim.towers
+        assert [tower.scheduler_slot for tower in sim.towers] == list(range(len(sim.towers)))
+        assert all(slot < len(scheduler.towers) for _, slot in scheduler._reloading)
+    assert len(scheduler.towers) == 5 # Only the towers still standing hold slots
+
+def test_ready_towers_are_idle_and_in_list_order():
+    sim = Simulation(seed=2)
+    place_towers(sim, 12, random.Random(2))
+    sim.sell_tower(sim.towers[4])
+    scheduler = sim.tower_scheduler
+    for _ in range(100):
+        sim.step(10)
+        ready = scheduler.ready_towers(sim.tick_count, ProgressIndex(sim.enemies))
+        slots = [tower.scheduler_slot for tower in ready]
+        assert slots == sorted(slots)
+        assert all(scheduler.idle[slot] for slot in slots)
@@ -0,0 +1,42 @@
+import pygame
+from lru import LRUCache
+
+DEFAULT_MAX_ENTRIES = 512 # Rendered labels kept; UI shows well under a hundred at once
+
+_fonts = {} # (name, size) -> pygame.font.Font
+
+def get_font(size, name=None):
+    """Returns a shared Font, constructing it only the first time (name=None is pygame's default font)."""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.Font(name, size)
+        _fonts[key] = font
+    return font
+
+class TextCache(LRUCache):
+    """Bounded LRU cache of rendered text surfaces.
+
+    Keyed by (font, text, color, antialias), so a label is only rasterized
+    again when its text or color changes. The returned surfaces are shared;
+    callers must not draw onto them.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        super().__init__(max_entries)
+
+    def render(self, font, text, antialias, color):
+        """Same arguments as Font.render, but returns a cached surface when possible."""
+        return self.get((font, text, tuple(color), antialias), lambda: font.render(text, antialias, color))
+
+    def stats(self):
+        """Returns hit/miss counters, current size and the number of shared fonts."""
+        stats = super().stats()
+        stats['fonts'] = len(_fonts)
+        return stats
+
+# Shared cache for all UI text
+text_cache = TextCache()
+
+def render_text(font, text, antialias, color):
+    return text_cache.render(font, text, antialias, color)
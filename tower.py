@@ -1,6 +1,11 @@
 from projectile import Projectile
 import pygame
 import math # For upgrade cost calculation
+from game_log import get_logger
+from sprite_cache import sprite_cache
+from render_queue import draw_now
+
+log = get_logger('tower')
 
 class Tower:
     MAX_LEVEL = 5 # Maximum level for any stat
@@ -54,7 +59,6 @@ class Tower:
         self.dot_duration = 0 # Calculated DoT duration
         self._update_stats()
 
-        self.fire_cooldown = 0
         self.cost = self.base_cost # Initial placement cost
 
     def _get_relevant_paths(self):
@@ -115,7 +119,7 @@ class Tower:
             if hasattr(self, level_attr):
                  current_level = getattr(self, level_attr)
             else:
-                print(f"Error: Tower missing level attribute '{level_attr}'")
+                log.error("Tower missing level attribute '%s'", level_attr)
                 return -1
 
         # --- Locking Logic (ONLY for Basic & Minigun Tower) --- #
@@ -172,23 +176,23 @@ class Tower:
         """Attempts to upgrade, sets specialization on reaching max level."""
         cost = self.get_upgrade_cost(stat_type)
         if cost < 0:
-            print(f"Cannot upgrade {stat_type}: {'Max level' if cost == -1 else 'Locked'}.")
+            log.info("Cannot upgrade %s: %s.", stat_type, 'Max level' if cost == -1 else 'Locked')
             return False, 0
 
         level_attr = stat_type + '_level'
         if not hasattr(self, level_attr):
-             print(f"Error: Cannot upgrade invalid stat '{stat_type}'")
+             log.error("Cannot upgrade invalid stat '%s'", stat_type)
              return False, 0
         current_level = getattr(self, level_attr)
         max_level_for_path = Tower.SPECIAL_PATH_MAX_LEVEL if stat_type in {'aoe', 'duration'} else Tower.MAX_LEVEL
         if current_level >= max_level_for_path:
-            print(f"Cannot upgrade {stat_type}: Already at max level {max_level_for_path}.")
+            log.info("Cannot upgrade %s: Already at max level %d.", stat_type, max_level_for_path)
             return False, 0
 
         setattr(self, level_attr, current_level + 1)
         new_level = current_level + 1
         self._update_stats()
-        print(f"Upgraded {stat_type} to level {new_level}. Cost: {cost}")
+        log.info("Upgraded %s to level %d. Cost: %d", stat_type, new_level, cost)
 
         # --- Set Primary Path (Applies to all types, used for headband) --- #
         available_paths = self._get_relevant_paths()
@@ -198,7 +202,7 @@ class Tower:
             # Ensure the stat being upgraded is a valid primary path for this tower
             if stat_type in available_paths:
                 self.primary_path = stat_type
-                print(f"Primary path chosen: {stat_type.upper()} (Determines headband)")
+                log.info("Primary path chosen: %s (Determines headband)", stat_type.upper())
 
         # --- Locking Logic (ONLY for Basic & Minigun Tower) --- #
         # --- Generalized Locking Logic (Applies to all tower types with 3 paths) --- #
@@ -209,7 +213,7 @@ class Tower:
                 third_path = list(available_paths - paths_at_lvl_2_or_more)[0]
                 if third_path not in self.locked_paths:
                     self.locked_paths.add(third_path)
-                    print(f"Locked third path: {third_path.upper()} at Level 1.")
+                    log.info("Locked third path: %s at Level 1.", third_path.upper())
 
             # 2. Lock secondary path when primary is chosen at level 3
             # Removed this section - locking happens when two paths hit L2
@@ -225,60 +229,36 @@ class Tower:
         # --- Set Specialization (Applies to all types) --- #
         if new_level == max_level_for_path and self.specialization is None and self.primary_path == stat_type:
              self.specialization = stat_type
-             print(f"Tower specialized in {stat_type.upper()}! (Headband set)")
+             log.info("Tower specialized in %s! (Headband set)", stat_type.upper())
         # --- End Set Specialization --- #
 
         return True, cost
 
-    def update(self, enemies, projectiles, time_scale=1.0, projectile_img=None):
-        # Cooldown timer - decrease by time_scale
-        if self.fire_cooldown > 0:
-            self.fire_cooldown -= time_scale
-            # Ensure cooldown doesn't go significantly negative
-            if self.fire_cooldown < 0: self.fire_cooldown = 0
-
-        # Find target and shoot if cooldown is ready
-        if self.fire_cooldown <= 0:
-            target = self.find_target(enemies)
-            if target:
-                # Create projectile, passing its image and a reference to this tower
-                if projectile_img:
-                    # Pass self (the tower instance) as tower_ref
-                    projectiles.append(Projectile(self.rect.centerx, self.rect.centery, target, self.damage, projectile_img, tower_ref=self))
-                else: # Fallback if no image provided
-                     # Pass self (the tower instance) as tower_ref
-                    projectiles.append(Projectile(self.rect.centerx, self.rect.centery, target, self.damage, tower_ref=self))
-                self.fire_cooldown = self.fire_rate # Reset cooldown fully
-
-    def find_target(self, enemies):
-        # Find the enemy closest to the end of the path within range
-        target = None
-        max_path_index = -1
-
-        for enemy in enemies:
-            if self.in_range(enemy):
-                # Prioritize enemy further along the path
-                if enemy.path_index > max_path_index:
-                    max_path_index = enemy.path_index
-                    target = enemy
-                # Optional: If same path index, target closest to tower?
-                # elif enemy.path_index == max_path_index:
-                #     dist_sq = (self.x - enemy.x)**2 + (self.y - enemy.y)**2
-                #     if dist_sq < min_dist_sq_to_end:
-                #         min_dist_sq_to_end = dist_sq
-                #         target = enemy
-        return target
-
-    def in_range(self, enemy):
-        # Use rect center for distance calculation
-        enemy_pos = pygame.Vector2(enemy.rect.center)
-        tower_pos = pygame.Vector2(self.rect.center)
-        return (tower_pos - enemy_pos).length_squared() <= self.range**2
+    def fire(self, target, projectiles, projectile_img=None, projectile_pool=None):
+        """Launches a projectile at target (the simulation's TowerScheduler tracks the reload)."""
+        # Create projectile, passing its image and a reference to this tower
+        if projectile_pool is not None:
+            # Recycle a pooled instance instead of allocating a new one
+            projectiles.append(projectile_pool.acquire(self.rect.centerx, self.rect.centery, target, self.damage, projectile_img, tower_ref=self))
+        elif projectile_img:
+            # Pass self (the tower instance) as tower_ref
+            projectiles.append(Projectile(self.rect.centerx, self.rect.centery, target, self.damage, projectile_img, tower_ref=self))
+        else: # Fallback if no image provided
+             # Pass self (the tower instance) as tower_ref
+            projectiles.append(Projectile(self.rect.centerx, self.rect.centery, target, self.damage, tower_ref=self))
 
     def draw(self, screen, is_selected=False):
-        screen.blit(self.image, self.rect)
+        draw_now(screen, self)
         if is_selected:
-            pygame.draw.circle(screen, (255, 255, 255, 100), self.rect.center, self.range, 2)
+            self.draw_range(screen)
+
+    def draw_range(self, screen):
+        """Outlines the tower's range (for the selected tower); returns the rect drawn."""
+        return pygame.draw.circle(screen, (255, 255, 255, 100), self.rect.center, self.range, 2)
+
+    def queue_draw(self, queue):
+        """Pushes the tower sprite and its headband (if any) onto a RenderQueue."""
+        queue.push('towers', self.image, self.rect.topleft)
 
         # --- Draw Headband (Consolidated Logic) --- #
         draw_headband = False
@@ -308,11 +288,10 @@ class Tower:
                 else:
                     headband_color = (0, 255, 0) # Green
 
-            # Draw a small rectangle near the top-center, lowered further
+            # Draw a small rectangle near the top-center, lowered further (pre-rendered once per size and color)
             headband_width = self.rect.width * 0.6
             headband_height = 6
             headband_x = self.rect.centerx - headband_width / 2
             headband_y = self.rect.top + 18 # Lowered further from +8
             headband_rect = pygame.Rect(headband_x, headband_y, headband_width, headband_height)
-            pygame.draw.rect(screen, headband_color, headband_rect, border_radius=2)
-            pygame.draw.rect(screen, (50, 50, 50), headband_rect, 1, border_radius=2) 
\ No newline at end of file
+            queue.push('towers', sprite_cache.headband(headband_rect.width, headband_rect.height, headband_color), headband_rect.topleft) 
\ No newline at end of file
@@ -0,0 +1,108 @@
+import heapq
+import math
+import numpy as np
+
+COVERAGE_MARGIN = 1.0 # Extra radius: targeting compares rounded rect centers, which can sit ~0.7px off the path
+
+class TowerScheduler:
+    """Decides which towers need a targeting pass this tick, instead of polling every tower.
+
+    Reloading towers wait in a min-heap keyed on the tick they are ready
+    again (with fixed-size ticks that is exactly ceil(fire_rate / tick_size)
+    ticks after firing, matching the old per-tick cooldown countdown).
+    Ready towers that haven't fired yet are idle. An idle tower sleeps
+    while no enemy's path distance lies inside its coverage hull: the
+    smallest distance range holding every path point within its range.
+    Each tick, one vectorized searchsorted over the tick's ProgressIndex
+    wakes the idle towers whose hull holds an enemy. Only those go on to
+    targeting.
+
+    A tower's slot is its index in placement order among the towers still
+    standing: remove() closes the gap and shifts later slots down, so the
+    arrays never hold dead slots and sorting by slot keeps the towers' list
+    order (and firing order) unchanged. The scheduler is the only place a
+    tower's reload is tracked.
+    """
+
+    def __init__(self, path, tick_size, capacity=64):
+        self.path = path
+        self.tick_size = tick_size
+        self.towers = [] # Slot -> tower
+        self.hull_start = np.zeros(capacity)
+        self.hull_end = np.zeros(capacity)
+        self.idle = np.zeros(capacity, dtype=bool) # Ready to fire, waiting for a target
+        self._reloading = [] # Heap of (ready tick, slot)
+        self.awake_count = 0 # Towers handed to targeting on the last tick
+
+    def _grow(self):
+        capacity = len(self.idle) * 2
+        for name in ('hull_start', 'hull_end', 'idle'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, tower):
+        """Starts scheduling a newly placed tower; it is ready immediately."""
+        slot = len(self.towers)
+        if slot == len(self.idle):
+            self._grow()
+        self.towers.append(tower)
+        tower.scheduler_slot = slot
+        self.refresh(tower)
+        self.idle[slot] = True
+
+    def remove(self, tower):
+        """Stops scheduling a sold tower; later towers move down one slot."""
+        slot = tower.scheduler_slot
+        del self.towers[slot]
+        n = len(self.towers)
+        for name in ('hull_start', 'hull_end', 'idle'):
+            values = getattr(self, name)
+            values[slot:n] = values[slot + 1:n + 1]
+            values[n] = 0
+        for later in self.towers[slot:]:
+            later.scheduler_slot -= 1
+        # Drop its reload entry and renumber the rest (the mapping keeps their order, but re-heapify anyway)
+        self._reloading = [(ready_tick, s - (s > slot)) for ready_tick, s in self._reloading if s != slot]
+        heapq.heapify(self._reloading)
+        tower.scheduler_slot = None
+
+    def refresh(self, tower):
+        """Recomputes a tower's coverage intervals and hull (after placement or a range upgrade)."""
+        slot = tower.scheduler_slot
+        intervals = self.path.coverage_intervals(tower.rect.center, tower.range + COVERAGE_MARGIN)
+        tower.coverage_intervals = intervals # Used by select_targets_by_coverage
+        if intervals:
+            self.hull_start[slot] = intervals[0][0]
+            self.hull_end[slot] = intervals[-1][1]
+        else:
+            # The path never comes within range: the tower can sleep for good
+            self.hull_start[slot] = math.inf
+            self.hull_end[slot] = -math.inf
+
+    def fired(self, tower, tick):
+        """Puts a tower that fired on this tick back to reloading."""
+        slot = tower.scheduler_slot
+        self.idle[slot] = False
+        ready_tick = tick + max(1, math.ceil(tower.fire_rate / self.tick_size))
+        heapq.heappush(self._reloading, (ready_tick, slot))
+
+    def ready_towers(self, tick, progress):
+        """Returns the towers that are ready and have an enemy inside their coverage hull, in list order."""
+        reloading = self._reloading
+        while reloading and reloading[0][0] <= tick:
+            self.idle[heapq.heappop(reloading)[1]] = True
+
+        if len(progress) == 0:
+            self.awake_count = 0
+            return []
+        idle_slots = np.flatnonzero(self.idle[:len(self.towers)])
+        if len(idle_slots) == 0:
+            self.awake_count = 0
+            return []
+        inside = progress.count_between(self.hull_start[idle_slots], self.hull_end[idle_slots])
+        towers = self.towers
+        awake = [towers[slot] for slot in idle_slots[inside > 0].tolist()]
+        self.awake_count = len(awake)
+        return awake
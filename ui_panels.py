@@ -0,0 +1,33 @@
+import pygame
+
+class CachedPanel:
+    """A UI panel composited once into its own surface and rebuilt only when its inputs change.
+
+    build(surface, *args) draws the panel in panel-local coordinates and may
+    return extra data (e.g. button rects), kept in self.data. get(key, *args)
+    returns the cached surface, calling build again only when key differs
+    from the last one; the key should capture everything the panel shows.
+    """
+
+    def __init__(self, size, build, fill=None):
+        self.size = size
+        self.build = build
+        self.fill = fill # Background color (RGBA for a translucent panel)
+        self.surface = None
+        self.key = None
+        self.data = None
+        self.rebuilds = 0
+
+    def get(self, key, *args):
+        if self.surface is None or key != self.key:
+            self.surface = pygame.Surface(self.size, pygame.SRCALPHA)
+            if self.fill is not None:
+                self.surface.fill(self.fill)
+            self.data = self.build(self.surface, *args)
+            self.key = key
+            self.rebuilds += 1
+        return self.surface
+
+    def invalidate(self):
+        self.surface = None
+        self.key = None